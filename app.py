@@ -1,62 +1,209 @@
-from flask import Flask, render_template, request, jsonify, send_file
-
-
-from scheduler import Subject, calculate_penalty
-from solvers import simulated_annealing, genetic_algorithm
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, render_template, request, jsonify, send_file
+
+
+from jobs import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    FINISHED,
+    QUEUED,
+    RUNNING,
+    Job,
+    JobQueue,
+    JobQueueFull,
+)
+from scheduler import Schedule, Subject
+from parallel import run_portfolio
+from solvers import SOLVER_NAMES
+from incremental import reoptimize
+from penalty_cache import PenaltyCache
+from result_cache import ResultCache, result_key
+from session_store import SessionStore
 from forms_integration import FormsManager
 from export import generate_word_schedule
 
 app = Flask(__name__)
 
-# Global State (In-memory for simplicity, normally DB)
-STATE = {
+# Settings of a session that has not set them (see SessionStore)
+DEFAULT_CONFIG = {
     "num_days": 20,
     "holidays": [],  # List of day indices
     "allowed_emails": [],
     "form_id": "",
     "subjects": ["Math", "Physics", "Chemistry", "Biology", "History"],
-    "last_schedule": None,  # Store the Schedule object
-    "last_scheduler_output": {},  # Store output like input list, etc.
     "start_date": "2025-01-01",  # Default start date
+    "sa_chains": 1,  # >1 runs multi-start SA across processes
+    "ga_islands": 1,  # >1 runs the island-model GA across processes
+    "decompose": False,  # Solve independent subject clusters in parallel
+    "repair": False,  # Repair clashes in SA moves and GA children
+    "time_budget": None,  # Shared wall-clock budget (seconds) for the solvers
+    "target_penalty": None,  # Stop the other solvers once one reaches this
+    "gap_tolerance": None,  # Stop once within this relative gap of the bound
+    "stagnation": None,  # SA/tabu moves without a new best before stopping
+    "ga_stagnation": None,  # GA generations without a new best before stopping
+    "incremental": False,  # Re-solve from the last schedule instead of from scratch
+    "fidelity": None,  # Fraction of students SA/GA moves are scored on
 }
 
+# Sessions (exam periods) are picked by the X-Session-ID header or the
+# ?session= query parameter; requests without one use DEFAULT_SESSION
+DEFAULT_SESSION = "default"
+SESSION_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.db")
+
+# Background solves: at most SOLVE_WORKERS run at once (each runs all solvers
+# in their own processes) and at most SOLVE_QUEUE_DEPTH more wait for a worker
+SOLVE_WORKERS = 2
+SOLVE_QUEUE_DEPTH = 8
+
+# Job status lives in SESSIONS too, so any worker process of a multi-process
+# deployment can serve the job endpoints. Each process writes its own jobs
+# there every JOB_SYNC_PERIOD seconds (at least every JOB_HEARTBEAT seconds
+# while they run) and applies the cancel/accept requests other processes left
+# for them; an unfinished job not written for JOB_STALE seconds belonged to a
+# process that has stopped.
+JOB_SYNC_PERIOD = 0.5
+JOB_HEARTBEAT = 5.0
+JOB_STALE = 30.0
+
+# Live progress: each solver reports at most every PROGRESS_PERIOD seconds and
+# event streams check for changes every STREAM_PERIOD seconds
+PROGRESS_PERIOD = 1.0
+STREAM_PERIOD = 0.5
+STREAM_KEEPALIVE = 15.0
+
+# Results of finished runs, on disk so they survive restarts (see _solve)
+RESULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".results")
+RESULT_CACHE_BYTES = 64 * 1024 * 1024
+# Settings that change what a run returns (part of the result cache key)
+RESULT_PARAMS = (
+    "sa_chains",
+    "ga_islands",
+    "decompose",
+    "repair",
+    "time_budget",
+    "target_penalty",
+    "gap_tolerance",
+    "stagnation",
+    "ga_stagnation",
+    "incremental",
+    "fidelity",
+)
+
+# Session store, job queue and result cache, set up by _init_services before
+# the first request: importing this module opens no database, creates no
+# directory and starts no thread
+SESSIONS: SessionStore
+JOBS: JobQueue
+RESULTS: ResultCache
+_SERVICES_LOCK = threading.Lock()
+_services_ready = False
+
+
+def _session_id() -> str:
+    session_id = request.headers.get("X-Session-ID") or request.args.get("session")
+    return (session_id or DEFAULT_SESSION).strip()
+
 
 @app.route("/")
 def index():
     return render_template("index.html")
 
 
+def _parse_config(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The settings given in a POST /api/config body. Empty optional numbers mean
+    none; a value of the wrong type or format raises.
+    """
+    changes: Dict[str, Any] = {}
+    if "num_days" in data:
+        changes["num_days"] = int(data["num_days"])
+    if "holidays" in data:
+        changes["holidays"] = [int(d) for d in data["holidays"]]
+    if "allowed_emails" in data:
+        if isinstance(data["allowed_emails"], str):
+            changes["allowed_emails"] = [
+                e.strip() for e in data["allowed_emails"].split("\n") if e.strip()
+            ]
+        else:
+            changes["allowed_emails"] = data["allowed_emails"]
+    if "subjects" in data:
+        changes["subjects"] = [s.strip() for s in data["subjects"] if s.strip()]
+    if "form_id" in data:
+        changes["form_id"] = data["form_id"].strip()
+    if "start_date" in data:
+        changes["start_date"] = data["start_date"]
+    if "sa_chains" in data:
+        changes["sa_chains"] = max(1, int(data["sa_chains"]))
+    if "ga_islands" in data:
+        changes["ga_islands"] = max(1, int(data["ga_islands"]))
+    if "decompose" in data:
+        changes["decompose"] = bool(data["decompose"])
+    if "repair" in data:
+        changes["repair"] = bool(data["repair"])
+    if "time_budget" in data:
+        budget = data["time_budget"]
+        changes["time_budget"] = float(budget) if budget else None
+    # 0 is a valid target and tolerance, so only missing values mean none
+    for key in ("target_penalty", "gap_tolerance"):
+        if key in data:
+            value = data[key]
+            changes[key] = float(value) if value not in (None, "") else None
+    for key in ("stagnation", "ga_stagnation"):
+        if key in data:
+            changes[key] = int(data[key]) if data[key] else None
+    if "incremental" in data:
+        changes["incremental"] = bool(data["incremental"])
+    if "fidelity" in data:
+        fidelity = data["fidelity"]
+        changes["fidelity"] = float(fidelity) if fidelity else None
+    return changes
+
+
 @app.route("/api/config", methods=["GET", "POST"])
 def config():
+    """
+    GET: the session's config. POST: sets the given settings and returns
+    only those (as stored).
+    """
+    session_id = _session_id()
     if request.method == "POST":
         data = request.json
-        if "num_days" in data:
-            STATE["num_days"] = int(data["num_days"])
-        if "holidays" in data:
-            STATE["holidays"] = [int(d) for d in data["holidays"]]
-        if "allowed_emails" in data:
-            if isinstance(data["allowed_emails"], str):
-                STATE["allowed_emails"] = [
-                    e.strip() for e in data["allowed_emails"].split("\n") if e.strip()
-                ]
-            else:
-                STATE["allowed_emails"] = data["allowed_emails"]
-        if "subjects" in data:
-            STATE["subjects"] = [s.strip() for s in data["subjects"] if s.strip()]
-        if "form_id" in data:
-            STATE["form_id"] = data["form_id"].strip()
-        if "start_date" in data:
-            STATE["start_date"] = data["start_date"]
-
-        return jsonify({"status": "success", "state": STATE})
-    return jsonify(STATE)
+        try:
+            changes = _parse_config(data)
+        except (AttributeError, TypeError, ValueError) as e:
+            message = f"Invalid config: {e}"
+            return jsonify({"status": "error", "message": message}), 400
+
+        SESSIONS.update_config(session_id, changes)
+        return jsonify({"status": "success", "session": session_id, "config": changes})
+    return jsonify(SESSIONS.get_config(session_id))
+
+
+@app.route("/api/sessions", methods=["GET"])
+def list_sessions():
+    return jsonify(SESSIONS.sessions())
+
+
+@app.route("/api/sessions/<session_id>", methods=["DELETE"])
+def delete_session(session_id):
+    if not SESSIONS.delete_session(session_id):
+        return jsonify({"status": "error", "message": "Unknown session."}), 404
+    return jsonify({"status": "success"})
 
 
 @app.route("/api/create_form", methods=["POST"])
 def create_form():
     data = request.json
     title = data.get("title", "Exam Schedule Form")
-    subjects = [Subject(n) for n in STATE["subjects"]]
+    session_id = _session_id()
+    subjects = [Subject(n) for n in SESSIONS.get_config(session_id)["subjects"]]
 
     try:
         manager = FormsManager()
@@ -77,85 +224,406 @@ def create_form():
                 form_id = form_id.split("?")[0]
 
         if form_id:
-            STATE["form_id"] = form_id
+            SESSIONS.update_config(session_id, {"form_id": form_id})
 
-        return jsonify(
-            {"status": "success", "url": url, "form_id": STATE.get("form_id")}
-        )
+        return jsonify({"status": "success", "url": url, "form_id": form_id})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
-@app.route("/api/run_schedule", methods=["POST"])
-def run_schedule():
-    # 1. Poll Responses
-    form_id = STATE["form_id"]
-    if not form_id:
-        return jsonify({"status": "error", "message": "No Form ID provided."}), 400
-
-    try:
-        manager = FormsManager()
-        allowed_emails = (
-            set(STATE["allowed_emails"]) if STATE["allowed_emails"] else None
+def _schedule_rows(assignments: Dict[str, int]) -> List[Dict[str, Any]]:
+    # Format for Frontend
+    # List of { day: X, subject: Y }
+    return [{"day": day, "subject": name} for name, day in assignments.items()]
+
+
+def _solve(
+    job: Job, session_id: str, config: Dict[str, Any], force: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Background solve job: polls the form responses and runs the solvers on a
+    snapshot of the session's config. Returns the schedule response, or None
+    when the job was cancelled. The students and the schedule of a finished
+    run are saved to the session (a cancelled job leaves it alone). While the
+    solvers run, job.progress holds each solver's latest telemetry record
+    ("solvers") and the best schedule streamed so far ("best"), which a job
+    finished early returns.
+
+    Results are cached in RESULTS under a hash of the responses, subjects,
+    days, holidays and solver settings; a repeated run returns the cached
+    result ("cached": true) unless `force` is set. Runs accepted early are
+    not cached.
+    """
+    job.set_stage("fetching")
+    manager = FormsManager()
+    allowed_emails = set(config["allowed_emails"]) if config["allowed_emails"] else None
+    subjects_objs = [Subject(n) for n in config["subjects"]]
+
+    students = manager.fetch_and_parse(config["form_id"], allowed_emails, subjects_objs)
+    if not students:
+        raise ValueError("No valid student responses found.")
+    if job.stopping:
+        return None
+
+    holidays_set = set(config["holidays"])
+    num_days = config["num_days"]
+    previous = previous_students = None
+    if config["incremental"]:
+        previous = SESSIONS.latest_schedule(session_id)
+        previous_students = SESSIONS.load_students(session_id)
+    incremental = bool(previous and previous_students)
+
+    params = {key: config[key] for key in RESULT_PARAMS}
+    if incremental:
+        # A warm-started run also depends on the schedule it starts from
+        params["warm_start"] = {
+            subj.name: day for subj, day in previous.assignments.items()
+        }
+    key = result_key(subjects_objs, students, num_days, holidays_set, params)
+    cached = None if force else RESULTS.get(key)
+    if cached is not None:
+        by_name = {subj.name: subj for subj in subjects_objs}
+        best = Schedule(
+            {by_name[row["subject"]]: row["day"] for row in cached["schedule"]},
+            num_days,
         )
-        subjects_objs = [Subject(n) for n in STATE["subjects"]]
-
-        students = manager.fetch_and_parse(form_id, allowed_emails, subjects_objs)
-
-        if not students:
-            return jsonify(
-                {"status": "error", "message": "No valid student responses found."}
-            ), 400
-
-        # 2. Run Solvers
-        holidays_set = set(STATE["holidays"])
-        num_days = STATE["num_days"]
-
-        # Run Genetic Algorithm (usually faster/better in test) or SA
-        # Let's run SA for speed if small, or GA.
-        # User prompt said "compare... and choose highest".
-        # We can run both.
-
-        sa_schedule = simulated_annealing(
-            subjects_objs, students, num_days, holidays_set
+        SESSIONS.save_run(session_id, students, best, cached["algo"], cached["penalty"])
+        return dict(cached, cached=True)
+
+    job.set_stage("solving", students=len(students), time_budget=config["time_budget"])
+
+    # Holds the penalties of the returned schedules (each portfolio solver has
+    # its own cache, see "cache" in its stats)
+    cache = PenaltyCache(subjects_objs)
+    complete = True
+    if incremental:
+        # Warm start: repair the subjects touched by new or changed
+        # submissions, then a short improvement run
+        best, solver_stats = reoptimize(
+            subjects_objs,
+            students,
+            num_days,
+            holidays_set,
+            previous,
+            previous_students,
+            time_limit=config["time_budget"],
+            cache=cache,
         )
-        sa_penalty = calculate_penalty(sa_schedule, students)
+        best_algo = "Incremental Re-optimization"
+        best_penalty = best.penalty
+        if job.stopping and not job.early:
+            return None
+    else:
+        # All solvers run concurrently; latency is the slowest, not the sum
+        decompose = config["decompose"]
+        options = {
+            "sa": {
+                "decompose": decompose,
+                "chains": config["sa_chains"],
+                "repair": config["repair"],
+            },
+            "ga": {
+                "decompose": decompose,
+                "islands": config["ga_islands"],
+                "repair": config["repair"],
+            },
+            "tabu": {"decompose": decompose},
+        }
+        if config["stagnation"]:
+            options["sa"]["stagnation"] = config["stagnation"]
+            options["tabu"]["stagnation"] = config["stagnation"]
+        if config["ga_stagnation"]:
+            options["ga"]["stagnation"] = config["ga_stagnation"]
+        if config["fidelity"]:
+            options["sa"]["fidelity"] = config["fidelity"]
+            options["ga"]["fidelity"] = config["fidelity"]
+
+        latest: Dict[str, Dict[str, Any]] = {}
+        live_best: Dict[str, Any] = {}
+
+        def on_progress(record: Dict[str, Any]):
+            schedule = record.pop("schedule", None)
+            latest[record["solver"]] = record
+            update: Dict[str, Any] = {"solvers": dict(latest)}
+            if schedule is not None and (
+                not live_best or record["best"] < live_best["penalty"]
+            ):
+                live_best.update(
+                    solver=record["solver"], penalty=record["best"], days=schedule
+                )
+                update["best"] = {
+                    "algo": SOLVER_NAMES[record["solver"]],
+                    "penalty": record["best"],
+                    "schedule": _schedule_rows(schedule),
+                }
+            job.update(**update)
+
+        best_key, best, solver_stats = run_portfolio(
+            subjects_objs,
+            students,
+            num_days,
+            holidays_set,
+            time_budget=config["time_budget"],
+            target_penalty=config["target_penalty"],
+            options=options,
+            cache=cache,
+            gap_tolerance=config["gap_tolerance"],
+            cancel=job.stop_event,
+            progress=on_progress,
+            progress_period=PROGRESS_PERIOD,
+        )
+        if job.stopping and not job.early:
+            return None
+        if (
+            job.early
+            and live_best
+            and (best is None or live_best["penalty"] < best.penalty)
+        ):
+            # Accepted early: the streamed best of a solver that was stopped
+            by_name = {subj.name: subj for subj in subjects_objs}
+            best = Schedule(
+                {by_name[name]: day for name, day in live_best["days"].items()},
+                num_days,
+            )
+            best_algo = f"{SOLVER_NAMES[live_best['solver']]} (accepted early)"
+            best_penalty = cache.penalty(best, students)
+            complete = False
+        elif best is None:
+            raise RuntimeError("No solver returned a schedule.")
+        else:
+            best_algo = SOLVER_NAMES[best_key]
+            best_penalty = solver_stats[best_key]["penalty"]
+
+    SESSIONS.save_run(session_id, students, best, best_algo, best_penalty)
+
+    result = {
+        "algo": best_algo,
+        "penalty": best_penalty,
+        "solvers": solver_stats,
+        "schedule": _schedule_rows(
+            {subj.name: day for subj, day in best.assignments.items()}
+        ),
+    }
+    if complete:
+        RESULTS.put(key, result)
+    return dict(result, cached=False)
+
+
+def _job_response(job: Job) -> Dict[str, Any]:
+    response = job.to_dict(JOBS.position(job))
+    if job.status == DONE:
+        response["result"] = job.result
+    return response
+
+
+def _find_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Status of a job (as _job_response): live if this process runs it, else as
+    last stored by the process that does. None for unknown jobs.
+    """
+    job = JOBS.get(job_id)
+    if job is not None:
+        return _job_response(job)
+    response = SESSIONS.load_job(job_id)
+    if response is None:
+        return None
+    del response["session"]
+    updated = response.pop("updated")
+    if response["status"] not in FINISHED:
+        if time.time() - updated > JOB_STALE:
+            response["status"] = FAILED
+            response["error"] = "The server process running the job stopped."
+        elif response["started"] is not None:
+            response["elapsed"] = time.time() - response["started"]
+    return response
+
+
+def _sync_jobs():
+    """Background loop of every process: see JOB_SYNC_PERIOD."""
+    written: Dict[str, Tuple[Tuple[Any, ...], float]] = {}
+    while True:
+        time.sleep(JOB_SYNC_PERIOD)
+        try:
+            _sync_jobs_once(written)
+        except sqlite3.Error as e:
+            print(f"Error syncing jobs: {e}")
+
+
+def _sync_jobs_once(written: Dict[str, Tuple[Tuple[Any, ...], float]]):
+    jobs = JOBS.jobs()
+    for job in jobs:
+        position = JOBS.position(job)
+        state = (job.status, job.version, position)
+        last = written.get(job.id)
+        if (
+            last is not None
+            and last[0] == state
+            and (job.status in FINISHED or time.time() - last[1] < JOB_HEARTBEAT)
+        ):
+            continue
+        result = job.result if job.status == DONE else None
+        if SESSIONS.update_job(job.to_dict(position), result):
+            written[job.id] = (state, time.time())
+
+    running = [job.id for job in jobs if job.status not in FINISHED]
+    for job_id, action in SESSIONS.pop_job_flags(running).items():
+        if action == "cancel":
+            JOBS.cancel(job_id)
+        else:
+            JOBS.finish_early(job_id)
+
+    known = {job.id for job in jobs}
+    for job_id in [j for j in written if j not in known]:
+        del written[job_id]
+
+
+@app.before_request
+def _init_services():
+    """Creates SESSIONS, JOBS and RESULTS and starts the job sync, once."""
+    global SESSIONS, JOBS, RESULTS, _services_ready
+    if _services_ready:
+        return
+    with _SERVICES_LOCK:
+        if _services_ready:
+            return
+        SESSIONS = SessionStore(SESSION_DB, DEFAULT_CONFIG)
+        JOBS = JobQueue(SOLVE_WORKERS, SOLVE_QUEUE_DEPTH)
+        RESULTS = ResultCache(RESULT_CACHE_DIR, RESULT_CACHE_BYTES)
+        threading.Thread(target=_sync_jobs, name="job-sync", daemon=True).start()
+        _services_ready = True
 
-        ga_schedule = genetic_algorithm(subjects_objs, students, num_days, holidays_set)
-        ga_penalty = calculate_penalty(ga_schedule, students)
 
-        best = sa_schedule if sa_penalty < ga_penalty else ga_schedule
-        best_algo = (
-            "Simulated Annealing" if sa_penalty < ga_penalty else "Genetic Algorithm"
-        )
+@app.route("/api/run_schedule", methods=["POST"])
+def run_schedule():
+    """
+    Queues a solve and returns its job ID; poll /api/jobs/<id> for it.
+    {"force": true} re-solves even if the result of the same run is cached.
+    """
+    session_id = _session_id()
+    config = SESSIONS.get_config(session_id)
+    if not config["form_id"]:
+        return jsonify({"status": "error", "message": "No Form ID provided."}), 400
 
-        STATE["last_schedule"] = best
+    data = request.get_json(silent=True) or {}
+    try:
+        job = JOBS.submit(_solve, session_id, config, force=bool(data.get("force")))
+    except JobQueueFull as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    response = _job_response(job)
+    SESSIONS.create_job(session_id, response)
+    return jsonify({"status": "queued", "job_id": job.id, "job": response}), 202
+
+
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    return jsonify(
+        {
+            "workers": JOBS.workers,
+            "max_queued": JOBS.max_queued,
+            "jobs": JOBS.counts(),
+            "result_cache": RESULTS.stats(),
+        }
+    )
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = _find_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job."}), 404
+    return jsonify(job)
+
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    job = _find_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job."}), 404
+    if job["status"] == DONE:
+        return jsonify(dict(job["result"], status="success"))
+    if job["status"] == FAILED:
+        return jsonify({"status": "error", "message": job["error"]}), 500
+    if job["status"] == CANCELLED:
+        return jsonify({"status": "error", "message": "The job was cancelled."}), 410
+    return jsonify(
+        {"status": job["status"], "message": "The job has not finished."}
+    ), 409
+
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """
+    Server-sent events: the job status (as /api/jobs/<id>) whenever its
+    progress changes, checked every STREAM_PERIOD seconds, until it finishes.
+    """
+    job = _find_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job."}), 404
+
+    def stream():
+        state = None
+        last_sent = time.time()
+        response = job
+        while response is not None:
+            finished = response["status"] in FINISHED
+            if finished or (response["status"], response["version"]) != state:
+                state = (response["status"], response["version"])
+                yield f"data: {json.dumps(response)}\n\n"
+                last_sent = time.time()
+            elif time.time() - last_sent >= STREAM_KEEPALIVE:
+                # Keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                last_sent = time.time()
+            if finished:
+                return
+            time.sleep(STREAM_PERIOD)
+            response = _find_job(job_id)
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/api/jobs/<job_id>/accept", methods=["POST"])
+def accept_job(job_id):
+    """
+    Stops a running job and keeps the best schedule found so far. A job of
+    another server process stops once that process sees the request.
+    """
+    if JOBS.get(job_id) is not None:
+        accepted = JOBS.finish_early(job_id)
+    else:
+        accepted = SESSIONS.flag_job(job_id, "accept", (RUNNING,))
+    if not accepted:
+        return jsonify({"status": "error", "message": "The job is not running."}), 409
+    return jsonify({"status": "success", "job": _find_job(job_id)})
 
-        # Format for Frontend
-        # List of { day: X, subject: Y }
-        schedule_list = []
-        for subj, day in best.assignments.items():
-            schedule_list.append({"day": day, "subject": subj.name})
 
+@app.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    """Cancels a job; like accept, across server processes."""
+    if JOBS.get(job_id) is not None:
+        cancelled = JOBS.cancel(job_id)
+    else:
+        cancelled = SESSIONS.flag_job(job_id, "cancel", (QUEUED, RUNNING))
+    if not cancelled:
         return jsonify(
-            {
-                "status": "success",
-                "algo": best_algo,
-                "penalty": min(sa_penalty, ga_penalty),
-                "schedule": schedule_list,
-            }
-        )
-
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+            {"status": "error", "message": "Unknown or already finished job."}
+        ), 404
+    return jsonify({"status": "success", "job": _find_job(job_id)})
 
 
 @app.route("/export/word", methods=["GET"])
 def export_word():
-    if not STATE["last_schedule"]:
+    session_id = _session_id()
+    schedule = SESSIONS.latest_schedule(session_id)
+    if schedule is None:
         return "No schedule generated yet.", 400
 
-    filename = generate_word_schedule(STATE["last_schedule"], STATE["start_date"])
+    start_date = SESSIONS.get_config(session_id)["start_date"]
+    filename = generate_word_schedule(schedule, start_date)
     if filename:
         return send_file(filename, as_attachment=True)
     else:
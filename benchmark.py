@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from instance import CompactSchedule, ProblemInstance
+from sampling import StratifiedSample
+from scheduler import CONFLICT_PENALTY, Student, Subject, calculate_penalty
+from solvers import SOLVERS
+from test_solvers import ENROLLMENT_DISTRIBUTIONS, generate_instance
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Solvers that take a fidelity (see solvers.simulated_annealing)
+SAMPLED_SOLVERS = ("sa", "ga")
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """'1000x40' -> (1000 students, 40 subjects)."""
+    try:
+        students, subjects = text.lower().split("x")
+        return int(students), int(subjects)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Expected STUDENTSxSUBJECTS, got {text!r}"
+        ) from None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(
+    solver: str,
+    subjects: List[Subject],
+    students: List[Student],
+    num_days: int,
+    holidays: Set[int],
+    seed: int,
+    solver_kwargs: Dict[str, Any],
+) -> Dict[str, Any]:
+    """One solver run, in its own process so its peak memory is its own."""
+    random.seed(seed)
+    baseline = _peak_rss_mb()
+    search_stats: Dict[str, Any] = {}
+    if solver_kwargs.get("fidelity") is not None:
+        solver_kwargs = dict(solver_kwargs, sampling_stats={})
+    start_time = time.time()
+    schedule = SOLVERS[solver](
+        subjects,
+        students,
+        num_days,
+        holidays,
+        search_stats=search_stats,
+        **solver_kwargs,
+    )
+    elapsed = time.time() - start_time
+    # Reported penalties are always re-checked against the reference function
+    penalty = calculate_penalty(schedule, students)
+
+    result = {
+        "time": elapsed,
+        "penalty": penalty,
+        "feasible": penalty < CONFLICT_PENALTY,
+        "iterations": search_stats.get("iterations"),
+        "evaluations": search_stats.get("evaluations"),
+        "evaluations_per_sec": (
+            search_stats.get("evaluations", 0) / elapsed if elapsed > 0 else None
+        ),
+        "time_to_first_feasible": search_stats.get("first_feasible"),
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    if "sampling_stats" in solver_kwargs:
+        result["sampling"] = solver_kwargs["sampling_stats"]
+    return result
+
+
+def measure_fidelity(
+    instance: ProblemInstance,
+    num_days: int,
+    holidays: Set[int],
+    fidelity: float,
+    schedules: int = 20,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Accuracy and speed of sampled evaluation alone: scores random schedules
+    exactly and with StratifiedSample.estimate. Errors are relative, for the
+    whole penalty and for its sampled part (the gap penalty) alone.
+    """
+    rng = random.Random(seed)
+    sample = StratifiedSample(instance, fidelity, rng)
+    available_days = [d for d in range(num_days) if d not in holidays]
+
+    exact_time = sample_time = 0.0
+    errors = []
+    gap_errors = []
+    for _ in range(schedules):
+        days = [rng.choice(available_days) for _ in range(instance.num_scheduled)]
+        schedule = CompactSchedule.from_days(days, num_days, instance)
+        start = time.perf_counter()
+        exact = instance.penalty(schedule)
+        exact_time += time.perf_counter() - start
+        start = time.perf_counter()
+        estimate = sample.estimate(schedule)
+        sample_time += time.perf_counter() - start
+        errors.append(abs(estimate - exact) / exact if exact > 0 else 0.0)
+
+        gaps = instance.penalty(schedule, conflict_penalty=0)
+        sampled_gaps = sample.instance.penalty(schedule, conflict_penalty=0)
+        gap_errors.append(abs(sampled_gaps - gaps) / gaps if gaps > 0 else 0.0)
+
+    return {
+        "fidelity": fidelity,
+        "sampled_students": sample.sampled_students,
+        "total_students": sample.total_students,
+        "mean_relative_error": sum(errors) / len(errors),
+        "max_relative_error": max(errors),
+        "mean_gap_relative_error": sum(gap_errors) / len(gap_errors),
+        "max_gap_relative_error": max(gap_errors),
+        "speedup": exact_time / sample_time if sample_time > 0 else None,
+    }
+
+
+def run_benchmark(
+    sizes: Sequence[Tuple[int, int]],
+    solvers: Sequence[str] = ("sa", "ga", "tabu"),
+    num_days: int = 20,
+    fidelities: Sequence[float] = (),
+    time_limit: Optional[float] = None,
+    repeats: int = 1,
+    seed: int = 0,
+    generator_kwargs: Optional[Dict[str, Any]] = None,
+    solver_kwargs: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Runs every solver `repeats` times on a generated instance of each
+    (students, subjects) size, plus the SA/GA runs at every fidelity.
+    Returns {"cases": [...], "fidelity": [...]}; every case row holds the
+    instance size, solver, fidelity, repeat and the _run_case metrics.
+    """
+    generator_kwargs = generator_kwargs or {}
+    solver_kwargs = solver_kwargs or {}
+    rng = random.Random(seed)
+    cases = []
+    accuracy = []
+    for num_students, num_subjects in sizes:
+        subjects, students, holidays = generate_instance(
+            num_students,
+            num_subjects,
+            num_days,
+            seed=rng.randrange(2**31),
+            **generator_kwargs,
+        )
+        instance = ProblemInstance.from_students(subjects, students)
+        size = {
+            "students": num_students,
+            "subjects": num_subjects,
+            "profiles": instance.num_students,
+            "enrollments": len(instance.subject_ids),
+            "days": num_days,
+            "holidays": len(holidays),
+        }
+        for fidelity in fidelities:
+            row = measure_fidelity(
+                instance, num_days, holidays, fidelity, seed=rng.randrange(2**31)
+            )
+            accuracy.append(dict(size, **row))
+
+        runs = [(solver, None) for solver in solvers]
+        runs += [
+            (solver, fidelity)
+            for fidelity in fidelities
+            for solver in solvers
+            if solver in SAMPLED_SOLVERS
+        ]
+        for solver, fidelity in runs:
+            kwargs = dict(solver_kwargs.get(solver, {}))
+            if time_limit is not None:
+                kwargs.setdefault("time_limit", time_limit)
+            if fidelity is not None:
+                kwargs["fidelity"] = fidelity
+            for repeat in range(repeats):
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    result = pool.submit(
+                        _run_case,
+                        solver,
+                        subjects,
+                        students,
+                        num_days,
+                        holidays,
+                        rng.randrange(2**31),
+                        kwargs,
+                    ).result()
+                row = dict(size, solver=solver, fidelity=fidelity, repeat=repeat)
+                cases.append(dict(row, **result))
+                print(
+                    f"{num_students}x{num_subjects} {solver}"
+                    f"{'' if fidelity is None else f' @{fidelity}'}: "
+                    f"penalty {result['penalty']:.2f} in {result['time']:.2f}s"
+                )
+    return {"cases": cases, "fidelity": accuracy}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exam Scheduler solver benchmark")
+    parser.add_argument(
+        "--sizes",
+        type=parse_size,
+        nargs="+",
+        default=[(200, 20), (1000, 40), (5000, 80)],
+        help="Instance sizes as STUDENTSxSUBJECTS",
+    )
+    parser.add_argument(
+        "--solvers",
+        nargs="+",
+        choices=sorted(SOLVERS),
+        default=["sa", "ga", "tabu"],
+    )
+    parser.add_argument("--days", type=int, default=20)
+    parser.add_argument(
+        "--fidelity",
+        type=float,
+        nargs="*",
+        default=[],
+        help="Also run SA/GA with sampled evaluation at these fidelities",
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=60.0, help="Per-run limit in seconds"
+    )
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enrollment-mean", type=float, default=5.0)
+    parser.add_argument(
+        "--enrollment-distribution", choices=ENROLLMENT_DISTRIBUTIONS, default="uniform"
+    )
+    parser.add_argument("--clusters", type=int, default=4)
+    parser.add_argument("--overlap", type=float, default=0.2)
+    parser.add_argument("--holiday-fraction", type=float, default=0.0)
+    parser.add_argument(
+        "--output", default="benchmark_results.json", help="JSON results file"
+    )
+    args = parser.parse_args()
+
+    generator_kwargs = {
+        "enrollment_mean": args.enrollment_mean,
+        "enrollment_distribution": args.enrollment_distribution,
+        "clusters": args.clusters,
+        "overlap": args.overlap,
+        "holiday_fraction": args.holiday_fraction,
+    }
+    results = run_benchmark(
+        args.sizes,
+        args.solvers,
+        args.days,
+        args.fidelity,
+        args.time_limit,
+        args.repeats,
+        args.seed,
+        generator_kwargs,
+    )
+    report = {
+        "version": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": dict(vars(args), sizes=[f"{s}x{n}" for s, n in args.sizes]),
+        **results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
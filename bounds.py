@@ -0,0 +1,95 @@
+import heapq
+import math
+from typing import Sequence, Set
+
+from instance import ProblemInstance
+from scheduler import CONFLICT_PENALTY
+
+
+def student_lower_bound(
+    weights: Sequence[float],
+    last_day: int,
+    num_available: int,
+    initial_gap: int = 3,
+    a: float = 1.0,
+) -> float:
+    """
+    Lowest possible penalty of one student with exams of the given weights
+    (2^t * d^2) when the latest available day is last_day.
+
+    Exam k costs w_k * e^(-a * g_k). Whatever the days, the gaps add up to at
+    most last_day + initial_gap - (k - 1), so the bound spreads that many empty
+    days over the exams as well as possible, ignoring holidays and which exam
+    comes first. e^(-a * g) is convex, so handing out one day at a time to the
+    exam whose cost drops the most is optimal. A student with more exams than
+    available days adds the unavoidable same-day clashes.
+    """
+    k = len(weights)
+    if k == 0:
+        return 0.0
+    clashes = max(k - num_available, 0)
+    days_used = k - clashes
+    budget = max(last_day + initial_gap - (days_used - 1), 0)
+    if clashes:
+        # Exams beyond the available days share a day: their gap is 0
+        weights = sorted(weights, reverse=True)
+        bound = clashes * CONFLICT_PENALTY + sum(weights[days_used:])
+        weights = weights[:days_used]
+    else:
+        bound = 0.0
+
+    decay = math.exp(-a)
+    # Max-heap of (-saving of one more empty day, current cost)
+    heap = [(-(w - w * decay), w) for w in weights]
+    heapq.heapify(heap)
+    for _ in range(budget):
+        saving, cost = heapq.heappop(heap)
+        if saving == 0:
+            heapq.heappush(heap, (saving, cost))
+            break
+        cost *= decay
+        heapq.heappush(heap, (-(cost - cost * decay), cost))
+    return bound + sum(cost for _, cost in heap)
+
+
+def penalty_lower_bound(
+    instance: ProblemInstance,
+    num_days: int,
+    holidays: Set[int],
+    initial_gap: int = 3,
+    a: float = 1.0,
+) -> float:
+    """
+    Lower bound on the penalty of any schedule of the instance: the sum of the
+    per-student bounds (see student_lower_bound) over the scheduled subjects.
+    """
+    available_days = [d for d in range(num_days) if d not in holidays]
+    if not available_days:
+        raise ValueError("No available days to schedule exams.")
+    last_day = available_days[-1]
+
+    total = 0.0
+    for s in range(instance.num_students):
+        weights = [
+            instance.weights[k]
+            for k in range(instance.offsets[s], instance.offsets[s + 1])
+            if instance.subject_ids[k] < instance.num_scheduled
+        ]
+        total += instance.counts[s] * student_lower_bound(
+            weights, last_day, len(available_days), initial_gap, a
+        )
+    return total
+
+
+def optimality_gap(penalty: float, lower_bound: float) -> float:
+    """Relative gap (penalty - bound) / penalty, 0 for a zero penalty."""
+    if penalty <= 0:
+        return 0.0
+    return max(penalty - lower_bound, 0.0) / penalty
+
+
+def gap_target(lower_bound: float, tolerance: float) -> float:
+    """Largest penalty whose optimality gap is at most `tolerance`."""
+    if not 0 <= tolerance < 1:
+        raise ValueError("Gap tolerance must be in [0, 1).")
+    return lower_bound / (1.0 - tolerance)
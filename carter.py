@@ -0,0 +1,116 @@
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from instance import ProblemInstance
+from scheduler import Student, Subject
+
+# Periods of the Toronto benchmark instances (Carter et al. 1996, version I)
+TORONTO_PERIODS = {
+    "car91": 35,
+    "car92": 32,
+    "ear83": 24,
+    "hec92": 18,
+    "kfu93": 20,
+    "lse91": 18,
+    "pur93": 42,
+    "rye92": 23,
+    "sta83": 13,
+    "tre92": 23,
+    "uta92": 35,
+    "ute92": 10,
+    "yor83": 21,
+}
+
+# The datasets carry no difficulty or trials; every enrollment gets these
+DEFAULT_DIFFICULTY = 5
+DEFAULT_TRIALS = 0
+
+
+def dataset_paths(path: str) -> Tuple[str, str]:
+    """
+    Resolves a dataset given as its .crs file, its .stu file or the common
+    path without extension (e.g. data/car91) to (crs path, stu path).
+    """
+    base, ext = os.path.splitext(path)
+    if ext.lower() not in (".crs", ".stu"):
+        base = path
+    return base + ".crs", base + ".stu"
+
+
+def dataset_periods(path: str) -> Optional[int]:
+    """Published number of periods of a Toronto instance, by file name."""
+    name = os.path.splitext(os.path.basename(path))[0].lower()
+    return TORONTO_PERIODS.get(name)
+
+
+def read_courses(crs_path: str) -> List[Subject]:
+    """
+    Reads a .crs file ("<course id> <enrollment>" per line) into subjects
+    named by course id, in file order.
+    """
+    subjects = []
+    with open(crs_path) as f:
+        for line_no, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) != 2:
+                raise ValueError(f"{crs_path}:{line_no}: expected course and size")
+            subjects.append(Subject(fields[0]))
+    return subjects
+
+
+def iter_students(
+    stu_path: str,
+    subjects: List[Subject],
+    difficulty: int = DEFAULT_DIFFICULTY,
+    trials: int = DEFAULT_TRIALS,
+) -> Iterator[Student]:
+    """
+    Streams a .stu file (the course ids of one student per line) as Student
+    objects, numbered from 0 in file order. Only one line is held at a time.
+    Course ids are matched numerically, so "0012" and "12" are the same course.
+    """
+    by_id: Dict[int, Subject] = {int(subj.name): subj for subj in subjects}
+    student_id = 0
+    with open(stu_path) as f:
+        for line_no, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields:
+                continue
+            student = Student(id=student_id)
+            for course in fields:
+                subj = by_id.get(int(course))
+                if subj is None:
+                    raise ValueError(f"{stu_path}:{line_no}: unknown course {course}")
+                student.add_subject(subj, difficulty, trials)
+            yield student
+            student_id += 1
+
+
+def load_dataset(
+    path: str,
+    difficulty: int = DEFAULT_DIFFICULTY,
+    trials: int = DEFAULT_TRIALS,
+) -> Tuple[List[Subject], List[Student]]:
+    """Loads a Carter/Toronto dataset (see dataset_paths) as subjects, students."""
+    crs_path, stu_path = dataset_paths(path)
+    subjects = read_courses(crs_path)
+    return subjects, list(iter_students(stu_path, subjects, difficulty, trials))
+
+
+def load_instance(
+    path: str,
+    difficulty: int = DEFAULT_DIFFICULTY,
+    trials: int = DEFAULT_TRIALS,
+) -> ProblemInstance:
+    """
+    Loads a Carter/Toronto dataset straight into a ProblemInstance. Students
+    are streamed into the compact arrays and grouped by profile, so no Student
+    list is ever built. The subjects are instance.scheduled_subjects.
+    """
+    crs_path, stu_path = dataset_paths(path)
+    subjects = read_courses(crs_path)
+    return ProblemInstance.from_students(
+        subjects, iter_students(stu_path, subjects, difficulty, trials)
+    )
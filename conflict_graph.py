@@ -0,0 +1,152 @@
+import random
+from typing import Dict, List, Optional, Sequence, Set
+
+from instance import ProblemInstance
+
+
+class ConflictGraph:
+    """
+    Subject conflict graph of a ProblemInstance.
+
+    Nodes are the scheduled subject ids. Two subjects are adjacent when at
+    least one student takes both; the edge weight is the number of shared
+    students, i.e. the number of clashes created by putting them on the same day.
+    """
+
+    def __init__(self, num_subjects: int):
+        self.num_subjects = num_subjects
+        self.adjacency: List[Dict[int, int]] = [{} for _ in range(num_subjects)]
+
+    @classmethod
+    def from_instance(cls, instance: ProblemInstance) -> "ConflictGraph":
+        graph = cls(instance.num_scheduled)
+        adjacency = graph.adjacency
+        for s in range(instance.num_students):
+            start, end = instance.offsets[s], instance.offsets[s + 1]
+            count = round(instance.counts[s])
+            scheduled = [
+                i for i in instance.subject_ids[start:end] if i < instance.num_scheduled
+            ]
+            for x in range(len(scheduled)):
+                i = scheduled[x]
+                for y in range(x + 1, len(scheduled)):
+                    j = scheduled[y]
+                    if i == j:
+                        continue
+                    adjacency[i][j] = adjacency[i].get(j, 0) + count
+                    adjacency[j][i] = adjacency[j].get(i, 0) + count
+        return graph
+
+    def neighbors(self, subject_id: int) -> Dict[int, int]:
+        """Neighbor subject id -> number of shared students."""
+        return self.adjacency[subject_id]
+
+    def degree(self, subject_id: int) -> int:
+        return len(self.adjacency[subject_id])
+
+    def weighted_degree(self, subject_id: int) -> int:
+        return sum(self.adjacency[subject_id].values())
+
+    def components(self) -> List[List[int]]:
+        """
+        Connected components (lists of subject ids, largest first). Subjects in
+        different components share no students, so they can be scheduled
+        independently and their penalties add up.
+        """
+        seen = [False] * self.num_subjects
+        components = []
+        for root in range(self.num_subjects):
+            if seen[root]:
+                continue
+            seen[root] = True
+            component = [root]
+            stack = [root]
+            while stack:
+                u = stack.pop()
+                for v in self.adjacency[u]:
+                    if not seen[v]:
+                        seen[v] = True
+                        component.append(v)
+                        stack.append(v)
+            components.append(sorted(component))
+        components.sort(key=len, reverse=True)
+        return components
+
+    def clashes(self, days: Sequence[int]) -> int:
+        """Number of shared students over all same-day subject pairs."""
+        total = 0
+        for i, neighbors in enumerate(self.adjacency):
+            for j, weight in neighbors.items():
+                if i < j and days[i] == days[j]:
+                    total += weight
+        return total
+
+    def clash_delta(self, days: Sequence[int], changes: Dict[int, int]) -> int:
+        """Change of clashes() when `changes` (subject id -> day) are applied."""
+        changes = {i: d for i, d in changes.items() if days[i] != d}
+        delta = 0
+        for i, day in changes.items():
+            old_day = days[i]
+            for j, weight in self.adjacency[i].items():
+                if j in changes:
+                    # Pairs of moved subjects are counted once, from the lower id
+                    if j > i:
+                        delta += weight * (
+                            (day == changes[j]) - (old_day == days[j])
+                        )
+                else:
+                    delta += weight * ((day == days[j]) - (old_day == days[j]))
+        return delta
+
+
+def dsatur_days(
+    graph: ConflictGraph,
+    available_days: Sequence[int],
+    rng: Optional[random.Random] = None,
+) -> List[int]:
+    """
+    Saturation-degree (DSatur) coloring of the conflict graph with days as colors.
+
+    The next subject is the one whose neighbors already occupy the most distinct
+    days (ties: most shared students, then random). It gets a random day none of
+    its neighbors use; if every available day is taken, the day with the fewest
+    shared students is used instead, so a complete schedule is always returned.
+    """
+    if not available_days:
+        raise ValueError("No available days to schedule exams.")
+    rng = rng or random
+
+    n = graph.num_subjects
+    days: List[Optional[int]] = [None] * n
+    # Days used by already scheduled neighbors, with shared-student totals
+    neighbor_days: List[Dict[int, int]] = [{} for _ in range(n)]
+    weighted_degree = [graph.weighted_degree(i) for i in range(n)]
+    uncolored: Set[int] = set(range(n))
+
+    while uncolored:
+        best_key = None
+        candidates: List[int] = []
+        for i in uncolored:
+            key = (len(neighbor_days[i]), weighted_degree[i])
+            if best_key is None or key > best_key:
+                best_key = key
+                candidates = [i]
+            elif key == best_key:
+                candidates.append(i)
+        subject_id = rng.choice(candidates)
+
+        used = neighbor_days[subject_id]
+        free = [d for d in available_days if d not in used]
+        if free:
+            day = rng.choice(free)
+        else:
+            fewest = min(used[d] for d in available_days)
+            day = rng.choice([d for d in available_days if used[d] == fewest])
+
+        days[subject_id] = day
+        uncolored.discard(subject_id)
+        for j, weight in graph.neighbors(subject_id).items():
+            if j in uncolored:
+                neighbor_days[j][day] = neighbor_days[j].get(day, 0) + weight
+
+    return days
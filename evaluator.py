@@ -0,0 +1,195 @@
+import math
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence, Tuple
+
+from instance import UNSCHEDULED, ProblemInstance
+from scheduler import CONFLICT_PENALTY, gap_decay_table
+
+
+class DeltaEvaluator:
+    """
+    Incremental penalty evaluator for exam moves on a ProblemInstance.
+
+    Uses the instance's subject -> enrolled students index and keeps every
+    student's penalty contribution, so moving a subject only re-scores the
+    students enrolled in it. Moves are scored with evaluate_changes/evaluate_move
+    and applied with commit().
+    """
+
+    def __init__(
+        self,
+        instance: ProblemInstance,
+        days: Sequence[int],
+        num_days: int,
+        initial_gap: int = 3,
+        a: float = 1.0,
+        conflict_penalty: float = CONFLICT_PENALTY,
+    ):
+        self.instance = instance
+        self.initial_gap = initial_gap
+        self.a = a
+        self.conflict_penalty = conflict_penalty
+        # Shared gap -> e^(-a * gap) table, no exp() in the inner loop
+        self.decay = gap_decay_table(a, initial_gap, num_days)
+
+        self.days = list(days)  # Subject id -> Day Index
+        self.costs = [self._cost(s) for s in range(instance.num_students)]
+        self.total = sum(self.costs)
+
+        self._pending: Optional[Tuple[Dict[int, int], Dict[int, float], float]] = None
+
+    def _cost(self, s: int) -> float:
+        return self.instance.student_cost(
+            s, self.days, self.decay, self.initial_gap, self.a, self.conflict_penalty
+        )
+
+    def evaluate_changes(self, changes: Dict[int, int]) -> float:
+        """
+        Returns the penalty delta of reassigning several subjects at once
+        (subject id -> new day). The move is remembered until commit().
+        """
+        changes = {i: d for i, d in changes.items() if self.days[i] != d}
+        if not changes:
+            self._pending = ({}, {}, 0.0)
+            return 0.0
+
+        affected = set()
+        for i in changes:
+            affected.update(self.instance.students_of(i))
+
+        # Apply temporarily, score the affected students, then restore
+        old_days = {i: self.days[i] for i in changes}
+        for i, d in changes.items():
+            self.days[i] = d
+        new_costs = {s: self._cost(s) for s in affected}
+        for i, d in old_days.items():
+            self.days[i] = d
+
+        delta = sum(new_costs.values()) - sum(self.costs[s] for s in affected)
+        self._pending = (changes, new_costs, delta)
+        return delta
+
+    def evaluate_move(self, subject_id: int, new_day: int) -> float:
+        """Returns the penalty delta of moving one subject to new_day."""
+        return self.evaluate_changes({subject_id: new_day})
+
+    def commit(self):
+        """Applies the move last scored by evaluate_changes/evaluate_move."""
+        if self._pending is None:
+            raise ValueError("No evaluated move to commit.")
+        changes, new_costs, delta = self._pending
+        for i, d in changes.items():
+            self.days[i] = d
+        for s, cost in new_costs.items():
+            self.costs[s] = cost
+        self.total += delta
+        self._pending = None
+
+    def resync(self) -> float:
+        """Recomputes the total from scratch to drop accumulated float drift."""
+        self.total = sum(self.costs)
+        return self.total
+
+
+class MoveDeltaMatrix:
+    """
+    Subject x day matrix of move deltas for the evaluator's current schedule:
+    delta[i][d] is the penalty change of moving subject i to day d.
+
+    Each student contributes to the rows of its own subjects only, so after a
+    move only the students enrolled in the moved subject have their
+    contributions withdrawn and re-added; every other entry stays valid.
+    """
+
+    def __init__(self, evaluator: DeltaEvaluator, available_days: Sequence[int]):
+        self.evaluator = evaluator
+        self.available_days = list(available_days)
+        instance = evaluator.instance
+        num_days = max(self.available_days, default=-1) + 1
+        self.delta = [[0.0] * num_days for _ in range(instance.num_scheduled)]
+        for s in range(instance.num_students):
+            self._add_student(s, 1.0)
+
+    def _add_student(self, s: int, sign: float):
+        """
+        Adds (sign=1) or withdraws (sign=-1) student s's contribution to the rows
+        of its subjects. Instead of re-scoring the student for every (subject, day)
+        pair, each subject is removed from the student's sorted exam list once and
+        re-inserted at every day, adjusting only the neighbouring gaps.
+        """
+        ev = self.evaluator
+        instance = ev.instance
+        days = ev.days
+        decay = ev.decay
+        table_size = len(decay)
+        a = ev.a
+        conflict_penalty = ev.conflict_penalty
+        num_scheduled = instance.num_scheduled
+
+        def term(weight: float, gap: int) -> float:
+            if gap < 0:
+                gap = 0
+            if gap < table_size:
+                return weight * decay[gap]
+            return weight * math.exp(-a * gap)
+
+        # (day, position in the student's subject order, weight, subject id);
+        # sorting by (day, position) matches the stable sort in student_cost
+        exams = []
+        for k in range(instance.offsets[s], instance.offsets[s + 1]):
+            j = instance.subject_ids[k]
+            day = days[j]
+            if day != UNSCHEDULED:
+                exams.append((day, k, instance.weights[k], j))
+        exams.sort()
+        first_prev = -(ev.initial_gap + 1)
+
+        for x in range(len(exams)):
+            old_day, pos, weight, j = exams[x]
+            if j >= num_scheduled:
+                continue
+            rest = exams[:x] + exams[x + 1 :]
+
+            # Cost of the student without subject j
+            rest_cost = 0.0
+            last_day = first_prev
+            for day, _, w, _ in rest:
+                if day == last_day:
+                    rest_cost += conflict_penalty
+                rest_cost += term(w, day - last_day - 1)
+                last_day = day
+            keys = [(e[0], e[1]) for e in rest]
+
+            row = self.delta[j]
+            base = ev.costs[s]
+            count = instance.counts[s]
+            for d in self.available_days:
+                if d == old_day:
+                    continue
+                at = bisect_left(keys, (d, pos))
+                prev_day = rest[at - 1][0] if at > 0 else first_prev
+                cost = rest_cost + term(weight, d - prev_day - 1)
+                if prev_day == d:
+                    cost += conflict_penalty
+                if at < len(rest):
+                    next_day, _, next_weight, _ = rest[at]
+                    if next_day == d:
+                        cost += conflict_penalty
+                    if next_day == prev_day:
+                        cost -= conflict_penalty
+                    cost += term(next_weight, next_day - d - 1) - term(
+                        next_weight, next_day - prev_day - 1
+                    )
+                row[d] += sign * (cost * count - base)
+
+    def apply(self, subject_id: int, new_day: int) -> float:
+        """Moves subject_id to new_day, updating the evaluator and the matrix."""
+        ev = self.evaluator
+        affected = set(ev.instance.students_of(subject_id))
+        for s in affected:
+            self._add_student(s, -1.0)
+        delta = ev.evaluate_move(subject_id, new_day)
+        ev.commit()
+        for s in affected:
+            self._add_student(s, 1.0)
+        return delta
@@ -0,0 +1,211 @@
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+from instance import (
+    UNSCHEDULED,
+    CompactSchedule,
+    ProblemInstance,
+    SharedInstance,
+    get_worker_instance,
+    init_worker_instance,
+)
+from penalty_cache import PenaltyCache
+from sampling import StratifiedSample
+from scheduler import Schedule, Student, Subject
+from vector_penalty import VectorizedPenalty, np
+
+
+class FitnessEvaluator(ABC):
+    """
+    Scores a population of schedules (penalty, lower is better).
+
+    evaluate() only computes penalties for schedules that have no cached score
+    yet and stores the result on Schedule.penalty, so individuals that were
+    already scored (and the caller's final re-check) are not recomputed.
+    With a PenaltyCache, duplicate individuals (e.g. unchanged children) are
+    looked up by assignment vector instead of being scored again.
+    Evaluators compile (subjects, students) themselves unless given the
+    compiled `instance`, in which case students is not read.
+    Subclasses implement _score().
+    """
+
+    cache: Optional[PenaltyCache] = None
+
+    def evaluate(self, schedules: Sequence[Schedule]) -> List[float]:
+        pending = [s for s in schedules if s.penalty is None]
+        keys = []
+        if self.cache is not None:
+            unscored = []
+            for schedule in pending:
+                key = self.cache.key(schedule)
+                penalty = self.cache.lookup(key)
+                if penalty is None:
+                    unscored.append(schedule)
+                    keys.append(key)
+                else:
+                    schedule.penalty = penalty
+            pending = unscored
+
+        if pending:
+            for schedule, penalty in zip(pending, self._score(pending)):
+                schedule.penalty = penalty
+            for key, schedule in zip(keys, pending):
+                self.cache.store(key, schedule.penalty)
+        return [s.penalty for s in schedules]
+
+    @abstractmethod
+    def _score(self, schedules: List[Schedule]) -> List[float]:
+        """Penalties of schedules that have no cached score, in order."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SerialEvaluator(FitnessEvaluator):
+    """
+    Scores individuals one by one on the compiled instance, where students
+    with identical profiles are scored once per profile.
+    """
+
+    def __init__(
+        self,
+        subjects: List[Subject],
+        students: Optional[List[Student]],
+        cache: Optional[PenaltyCache] = None,
+        instance: Optional[ProblemInstance] = None,
+    ):
+        if instance is None:
+            instance = ProblemInstance.from_students(subjects, students)
+        self.instance = instance
+        self.cache = cache
+
+    def _score(self, schedules: List[Schedule]) -> List[float]:
+        instance = self.instance
+        return [
+            instance.penalty(CompactSchedule.from_schedule(s, instance))
+            for s in schedules
+        ]
+
+
+class BatchEvaluator(FitnessEvaluator):
+    """Scores the whole population in one vectorized NumPy call."""
+
+    def __init__(
+        self,
+        subjects: List[Subject],
+        students: Optional[List[Student]],
+        cache: Optional[PenaltyCache] = None,
+        instance: Optional[ProblemInstance] = None,
+    ):
+        self.engine = VectorizedPenalty(subjects, students, instance=instance)
+        self.cache = cache
+
+    def _score(self, schedules: List[Schedule]) -> List[float]:
+        return self.engine.evaluate_schedules(schedules)
+
+
+class SampledEvaluator(FitnessEvaluator):
+    """
+    Estimates penalties on a StratifiedSample of the students (sampled gap
+    penalty plus exact clashes, see StratifiedSample.estimate). Estimates are
+    not exact, so they are neither stored on Schedule.penalty nor cached; the
+    caller re-scores the candidates it keeps with an exact evaluator.
+    """
+
+    def __init__(
+        self,
+        subjects: List[Subject],
+        students: Optional[List[Student]],
+        fidelity: float,
+        instance: Optional[ProblemInstance] = None,
+    ):
+        if instance is None:
+            instance = ProblemInstance.from_students(subjects, students)
+        self.sample = StratifiedSample(instance, fidelity)
+
+    def evaluate(self, schedules: Sequence[Schedule]) -> List[float]:
+        return self._score(list(schedules))
+
+    def _score(self, schedules: List[Schedule]) -> List[float]:
+        self.sample.estimates += len(schedules)
+        instance = self.sample.instance
+        return [
+            self.sample.estimate(CompactSchedule.from_schedule(s, instance))
+            for s in schedules
+        ]
+
+
+def _score_days(days_batch: List[List[int]], num_days: int) -> List[float]:
+    instance = get_worker_instance()
+    return [
+        instance.penalty(CompactSchedule.from_days(days, num_days, instance))
+        for days in days_batch
+    ]
+
+
+class PoolEvaluator(FitnessEvaluator):
+    """
+    Fans the population out to a process pool. The compiled instance is shared
+    with the workers through shared memory; only day vectors are sent per call.
+    Call close() (or use as a context manager) to stop the pool.
+    """
+
+    def __init__(
+        self,
+        subjects: List[Subject],
+        students: Optional[List[Student]],
+        processes: Optional[int] = None,
+        cache: Optional[PenaltyCache] = None,
+        instance: Optional[ProblemInstance] = None,
+    ):
+        self.cache = cache
+        if instance is None:
+            instance = ProblemInstance.from_students(subjects, students)
+        self.instance = instance
+        self.processes = processes or os.cpu_count() or 1
+        self.shared = SharedInstance(self.instance)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=init_worker_instance,
+            initargs=(self.shared.handle(),),
+        )
+
+    def _score(self, schedules: List[Schedule]) -> List[float]:
+        subjects = self.instance.scheduled_subjects
+        days_batch = [
+            [s.assignments.get(subj, UNSCHEDULED) for subj in subjects]
+            for s in schedules
+        ]
+        num_days = schedules[0].num_days
+        # One chunk per worker keeps the per-task overhead low
+        size = -(-len(days_batch) // self.processes)
+        futures = [
+            self.pool.submit(_score_days, days_batch[i : i + size], num_days)
+            for i in range(0, len(days_batch), size)
+        ]
+        return [p for f in futures for p in f.result()]
+
+    def close(self):
+        self.pool.shutdown()
+        self.shared.close()
+
+
+def make_evaluator(
+    subjects: List[Subject],
+    students: Optional[List[Student]],
+    vectorized: bool = False,
+    cache: Optional[PenaltyCache] = None,
+    instance: Optional[ProblemInstance] = None,
+) -> FitnessEvaluator:
+    """BatchEvaluator if requested and numpy is installed, else SerialEvaluator."""
+    if vectorized and np is not None:
+        return BatchEvaluator(subjects, students, cache, instance)
+    return SerialEvaluator(subjects, students, cache, instance)
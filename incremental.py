@@ -0,0 +1,161 @@
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from evaluator import DeltaEvaluator
+from instance import ProblemInstance
+from penalty_cache import PenaltyCache
+from scheduler import Schedule, Student, Subject
+from solvers import get_warm_start_compact_solution, simulated_annealing_compact
+
+
+def _profile(student: Student) -> Tuple[Tuple[str, int, int], ...]:
+    return tuple(
+        sorted(
+            (subj.name, difficulty, student.trials.get(subj, 0))
+            for subj, difficulty in student.subjects.items()
+        )
+    )
+
+
+def changed_students(
+    previous: List[Student], current: List[Student]
+) -> Tuple[List[Student], List[Student]]:
+    """
+    Diffs two submission lists as multisets of profiles (subjects with their
+    difficulty and trials). Student ids are not compared: they are positions in
+    the submission list and shift when a submission is added or deleted.
+    Returns (students of `current` with no matching profile in `previous`,
+    students of `previous` with none in `current`); a changed submission shows
+    up in both, once as its new and once as its old version.
+    """
+    unmatched = Counter(_profile(s) for s in previous)
+    changed = []
+    for student in current:
+        profile = _profile(student)
+        if unmatched[profile] > 0:
+            unmatched[profile] -= 1
+        else:
+            changed.append(student)
+    removed = []
+    for student in previous:
+        profile = _profile(student)
+        if unmatched[profile] > 0:
+            unmatched[profile] -= 1
+            removed.append(student)
+    return changed, removed
+
+
+def repair(
+    evaluator: DeltaEvaluator,
+    subject_ids: Set[int],
+    available_days: List[int],
+    max_passes: int = 3,
+) -> int:
+    """
+    Greedy repair: moves each given subject to its best available day while
+    that lowers the penalty. Only the students of the moved subject are
+    re-scored per move. Returns the number of moves made.
+    """
+    moves = 0
+    for _ in range(max_passes):
+        improved = False
+        for i in sorted(subject_ids):
+            best_day, best_delta = None, 0.0
+            for d in available_days:
+                if d == evaluator.days[i]:
+                    continue
+                delta = evaluator.evaluate_move(i, d)
+                if delta < best_delta:
+                    best_day, best_delta = d, delta
+            if best_day is not None:
+                evaluator.evaluate_move(i, best_day)
+                evaluator.commit()
+                moves += 1
+                improved = True
+        if not improved:
+            break
+    return moves
+
+
+def reoptimize(
+    subjects: List[Subject],
+    students: List[Student],
+    num_days: int,
+    holidays: Set[int],
+    previous: Schedule,
+    previous_students: Optional[List[Student]] = None,
+    initial_temp: float = 10.0,
+    cooling_rate: float = 0.995,
+    max_iterations: int = 2000,
+    time_limit: Optional[float] = None,
+    cache: Optional[PenaltyCache] = None,
+) -> Tuple[Schedule, Dict[str, Any]]:
+    """
+    Warm-start re-solve after new submissions arrive.
+
+    Starts from the previous schedule (see get_warm_start_compact_solution),
+    greedily repairs only the subjects touched by new, changed or removed
+    students (plus new subjects and subjects on days that are no longer
+    available), then runs a short low-temperature SA from the repaired schedule.
+    Without previous_students every subject is treated as touched.
+    Returns (schedule, stats).
+    """
+    start_time = time.time()
+    available_days = [d for d in range(num_days) if d not in holidays]
+    instance = ProblemInstance.from_students(subjects, students)
+    warm = get_warm_start_compact_solution(instance, previous, num_days, holidays)
+    evaluator = DeltaEvaluator(instance, warm.days[: instance.num_scheduled], num_days)
+    start_penalty = evaluator.total
+
+    available = set(available_days)
+    dirty = {
+        i
+        for i, subj in enumerate(instance.scheduled_subjects)
+        if previous.assignments.get(subj) not in available
+    }
+    if previous_students is None:
+        changed, removed = students, []
+        dirty.update(range(instance.num_scheduled))
+    else:
+        # Old versions of changed students are in `removed`: a dropped subject
+        # frees up its day
+        changed, removed = changed_students(previous_students, students)
+        for student in changed + removed:
+            for subj in student.subjects:
+                i = instance.subject_index.get(subj)
+                if i is not None and i < instance.num_scheduled:
+                    dirty.add(i)
+
+    repairs = repair(evaluator, dirty, available_days)
+    repaired_penalty = evaluator.total
+
+    remaining = None
+    if time_limit is not None:
+        remaining = max(time_limit - (time.time() - start_time), 0.0)
+    best = simulated_annealing_compact(
+        instance,
+        num_days,
+        holidays,
+        initial_temp=initial_temp,
+        cooling_rate=cooling_rate,
+        max_iterations=max_iterations,
+        time_limit=remaining,
+        initial_days=evaluator.days,
+    )
+    schedule = best.to_schedule(instance)
+    schedule.penalty = instance.penalty(best)
+    if cache is not None:
+        cache.store(cache.key(schedule), schedule.penalty)
+
+    stats = {
+        "changed_students": len(changed),
+        "removed_students": len(removed),
+        "dirty_subjects": len(dirty),
+        "repair_moves": repairs,
+        "start_penalty": start_penalty,
+        "repaired_penalty": repaired_penalty,
+        "penalty": schedule.penalty,
+        "time": time.time() - start_time,
+    }
+    return schedule, stats
@@ -0,0 +1,467 @@
+import math
+import signal
+from array import array
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from scheduler import (
+    CONFLICT_PENALTY,
+    Schedule,
+    Student,
+    Subject,
+    gap_decay_table,
+)
+
+# Day value for subjects that are not part of a CompactSchedule
+UNSCHEDULED = -1
+
+
+class ProblemInstance:
+    """
+    Compiled, array-backed form of a list of students.
+
+    Subjects are interned to integer ids (the scheduled subjects first, in the
+    order given, followed by any other subject a student is enrolled in).
+    Enrollments are stored in CSR form: the enrollments of student s are the
+    positions offsets[s]:offsets[s + 1] of subject_ids/difficulty/trials, in
+    the order of the student's subject dict. weights holds the precomputed
+    2^t * d^2 factor of every enrollment. A reverse CSR index
+    (subject_offsets/subject_students) lists the students enrolled per subject.
+
+    Students with identical profiles (same subjects, difficulties and trials in
+    the same order) have identical penalties, so from_students collapses them
+    into one row: "student s" is then a profile shared by counts[s] students
+    (student_ids[s] is the first of them). student_cost and everything built on
+    it score each profile once and weight it by its count. A sampled instance
+    (see sampling.StratifiedSample) uses fractional counts as expansion weights.
+
+    The derived arrays (weights, subject_offsets, subject_students) are computed
+    when not passed in, e.g. when attaching to arrays held in shared memory.
+    """
+
+    # Array attributes and their typecodes, in a fixed order
+    ARRAY_FIELDS = (
+        ("student_ids", "q"),
+        ("offsets", "q"),
+        ("subject_ids", "i"),
+        ("difficulty", "i"),
+        ("trials", "i"),
+        ("weights", "d"),
+        ("subject_offsets", "q"),
+        ("subject_students", "i"),
+        ("counts", "d"),
+    )
+
+    def __init__(
+        self,
+        subjects: List[Subject],
+        num_scheduled: int,
+        student_ids: Sequence[int],
+        offsets: Sequence[int],
+        subject_ids: Sequence[int],
+        difficulty: Sequence[int],
+        trials: Sequence[int],
+        weights: Optional[Sequence[float]] = None,
+        subject_offsets: Optional[Sequence[int]] = None,
+        subject_students: Optional[Sequence[int]] = None,
+        counts: Optional[Sequence[float]] = None,
+    ):
+        self.subjects = subjects
+        self.subject_index: Dict[Subject, int] = {s: i for i, s in enumerate(subjects)}
+        self.num_scheduled = num_scheduled
+        self.student_ids = student_ids
+        self.offsets = offsets
+        self.subject_ids = subject_ids
+        self.difficulty = difficulty
+        self.trials = trials
+        # Per-enrollment 2^t * d^2, fixed for the whole solve
+        if weights is None:
+            weights = array(
+                "d", ((2**t) * (d**2) for d, t in zip(difficulty, trials))
+            )
+        self.weights = weights
+        if counts is None:
+            counts = array("d", [1.0]) * (len(offsets) - 1)
+        self.counts = counts
+        if subject_offsets is None or subject_students is None:
+            self._build_subject_index()
+        else:
+            self.subject_offsets = subject_offsets
+            self.subject_students = subject_students
+
+    @classmethod
+    def from_students(
+        cls, subjects: List[Subject], students: Iterable[Student], group: bool = True
+    ) -> "ProblemInstance":
+        """
+        group=False keeps one row per student (counts all 1). Students are read
+        in a single pass, so they may be streamed (e.g. carter.iter_students).
+        """
+        interned: Dict[Subject, int] = {}
+        for subj in subjects:
+            interned.setdefault(subj, len(interned))
+        num_scheduled = len(interned)
+
+        student_ids = array("q")
+        offsets = array("q", [0])
+        subject_ids = array("i")
+        difficulty = array("i")
+        trials = array("i")
+        counts = array("d")
+        # Profile -> row, for grouping identical students
+        rows: Dict[Tuple[Tuple[Subject, int, int], ...], int] = {}
+        for student in students:
+            profile = tuple(
+                (subj, diff, student.trials.get(subj, 0))
+                for subj, diff in student.subjects.items()
+            )
+            if group:
+                row = rows.get(profile)
+                if row is not None:
+                    counts[row] += 1
+                    continue
+                rows[profile] = len(counts)
+            student_ids.append(student.id)
+            counts.append(1)
+            for subj, diff, t in profile:
+                subject_ids.append(interned.setdefault(subj, len(interned)))
+                difficulty.append(diff)
+                trials.append(t)
+            offsets.append(len(subject_ids))
+
+        return cls(
+            list(interned),
+            num_scheduled,
+            student_ids,
+            offsets,
+            subject_ids,
+            difficulty,
+            trials,
+            counts=counts,
+        )
+
+    def _build_subject_index(self):
+        counts = [0] * len(self.subjects)
+        for i in self.subject_ids:
+            counts[i] += 1
+        subject_offsets = array("q", [0])
+        for c in counts:
+            subject_offsets.append(subject_offsets[-1] + c)
+
+        fill = list(subject_offsets[:-1])
+        subject_students = array("i", bytes(4 * len(self.subject_ids)))
+        for s in range(self.num_students):
+            for k in range(self.offsets[s], self.offsets[s + 1]):
+                i = self.subject_ids[k]
+                subject_students[fill[i]] = s
+                fill[i] += 1
+
+        self.subject_offsets = subject_offsets
+        self.subject_students = subject_students
+
+    @property
+    def num_students(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def total_students(self) -> int:
+        """Number of students, counting every member of a profile."""
+        return round(sum(self.counts))
+
+    @property
+    def num_subjects(self) -> int:
+        return len(self.subjects)
+
+    @property
+    def scheduled_subjects(self) -> List[Subject]:
+        return self.subjects[: self.num_scheduled]
+
+    def enrollments(self, s: int) -> Iterator[Tuple[int, int, int]]:
+        """Yields (subject id, difficulty, trials) for student s."""
+        for k in range(self.offsets[s], self.offsets[s + 1]):
+            yield self.subject_ids[k], self.difficulty[k], self.trials[k]
+
+    def students_of(self, subject_id: int) -> Sequence[int]:
+        """Indices of the students enrolled in the given subject."""
+        return self.subject_students[
+            self.subject_offsets[subject_id] : self.subject_offsets[subject_id + 1]
+        ]
+
+    def select(
+        self, rows: Sequence[int], counts: Sequence[float]
+    ) -> "ProblemInstance":
+        """Instance over the given student rows only, with new counts."""
+        student_ids = array("q")
+        offsets = array("q", [0])
+        subject_ids = array("i")
+        difficulty = array("i")
+        trials = array("i")
+        weights = array("d")
+        for s in rows:
+            start, end = self.offsets[s], self.offsets[s + 1]
+            student_ids.append(self.student_ids[s])
+            subject_ids.extend(self.subject_ids[start:end])
+            difficulty.extend(self.difficulty[start:end])
+            trials.extend(self.trials[start:end])
+            weights.extend(self.weights[start:end])
+            offsets.append(len(subject_ids))
+        return ProblemInstance(
+            self.subjects,
+            self.num_scheduled,
+            student_ids,
+            offsets,
+            subject_ids,
+            difficulty,
+            trials,
+            weights=weights,
+            counts=array("d", counts),
+        )
+
+    def restrict(
+        self, subject_ids: Sequence[int], rows: Sequence[int]
+    ) -> "ProblemInstance":
+        """
+        Instance that schedules only the given subjects (in that order), over
+        the given student rows and their counts. Any other subject becomes an
+        unscheduled one, so rows should only take scheduled subjects from
+        subject_ids (e.g. the rows of one conflict-graph component).
+        """
+        keep = set(subject_ids)
+        order = list(subject_ids) + [
+            i for i in range(self.num_subjects) if i not in keep
+        ]
+        new_id = [0] * self.num_subjects
+        for new, old in enumerate(order):
+            new_id[old] = new
+
+        student_ids = array("q")
+        offsets = array("q", [0])
+        subject_ids_out = array("i")
+        difficulty = array("i")
+        trials = array("i")
+        weights = array("d")
+        for s in rows:
+            start, end = self.offsets[s], self.offsets[s + 1]
+            student_ids.append(self.student_ids[s])
+            subject_ids_out.extend(new_id[i] for i in self.subject_ids[start:end])
+            difficulty.extend(self.difficulty[start:end])
+            trials.extend(self.trials[start:end])
+            weights.extend(self.weights[start:end])
+            offsets.append(len(subject_ids_out))
+        return ProblemInstance(
+            [self.subjects[i] for i in order],
+            len(subject_ids),
+            student_ids,
+            offsets,
+            subject_ids_out,
+            difficulty,
+            trials,
+            weights=weights,
+            counts=array("d", (self.counts[s] for s in rows)),
+        )
+
+    def to_students(self) -> List[Student]:
+        """
+        Rebuilds Student objects, e.g. for callers of calculate_penalty.
+        A profile shared by several students is repeated counts[s] times under
+        the id of its first student.
+        """
+        students = []
+        for s in range(self.num_students):
+            for _ in range(round(self.counts[s])):
+                student = Student(id=self.student_ids[s])
+                for i, diff, trials in self.enrollments(s):
+                    student.add_subject(self.subjects[i], diff, trials)
+                students.append(student)
+        return students
+
+    def student_cost(
+        self,
+        s: int,
+        days: Sequence[int],
+        decay: Sequence[float],
+        initial_gap: int = 3,
+        a: float = 1.0,
+        conflict_penalty: float = CONFLICT_PENALTY,
+    ) -> float:
+        """
+        Penalty contribution of student s, same formula as calculate_penalty,
+        times the number of students sharing the profile.
+        days: subject id -> day index (UNSCHEDULED subjects are ignored).
+        decay: gap_decay_table(a, initial_gap, num_days) of the schedule.
+        conflict_penalty: cost per same-day clash (0 scores the gaps only).
+        """
+        subject_ids = self.subject_ids
+        weights = self.weights
+        exams = []
+        for k in range(self.offsets[s], self.offsets[s + 1]):
+            day = days[subject_ids[k]]
+            if day != UNSCHEDULED:
+                exams.append((day, weights[k]))
+        # Stable sort keeps the student's subject order for same-day exams,
+        # exactly like calculate_penalty
+        exams.sort(key=lambda x: x[0])
+
+        cost = 0.0
+        conflicts = 0
+        for i in range(len(exams) - 1):
+            if exams[i][0] == exams[i + 1][0]:
+                conflicts += 1
+        if conflicts > 0:
+            cost += conflicts * conflict_penalty
+
+        table_size = len(decay)
+        last_day = -(initial_gap + 1)
+        for day, weight in exams:
+            gap = day - last_day - 1
+            if gap < 0:
+                gap = 0
+            if gap < table_size:
+                cost += weight * decay[gap]
+            else:
+                # Day outside the table's num_days
+                cost += weight * math.exp(-a * gap)
+            last_day = day
+
+        return cost * self.counts[s]
+
+    def penalty(
+        self,
+        schedule: "CompactSchedule",
+        initial_gap: int = 3,
+        a: float = 1.0,
+        conflict_penalty: float = CONFLICT_PENALTY,
+    ) -> float:
+        """calculate_penalty for a CompactSchedule."""
+        decay = gap_decay_table(a, initial_gap, schedule.num_days)
+        return sum(
+            self.student_cost(
+                s, schedule.days, decay, initial_gap, a, conflict_penalty
+            )
+            for s in range(self.num_students)
+        )
+
+
+@dataclass
+class CompactSchedule:
+    days: array  # Subject id -> Day Index (UNSCHEDULED if not assigned)
+    num_days: int
+
+    @classmethod
+    def from_schedule(
+        cls, schedule: Schedule, instance: ProblemInstance
+    ) -> "CompactSchedule":
+        days = array("i", [UNSCHEDULED]) * instance.num_subjects
+        for subj, day in schedule.assignments.items():
+            i = instance.subject_index.get(subj)
+            if i is not None:
+                days[i] = day
+        return cls(days, schedule.num_days)
+
+    @classmethod
+    def from_days(
+        cls, days: Sequence[int], num_days: int, instance: ProblemInstance
+    ) -> "CompactSchedule":
+        """Builds a schedule from days of the scheduled subjects (in id order)."""
+        compact = array("i", [UNSCHEDULED]) * instance.num_subjects
+        compact[: len(days)] = array("i", days)
+        return cls(compact, num_days)
+
+    def to_schedule(self, instance: ProblemInstance) -> Schedule:
+        assignments = {}
+        for i, day in enumerate(self.days):
+            if day != UNSCHEDULED:
+                assignments[instance.subjects[i]] = day
+        return Schedule(assignments, self.num_days)
+
+    def get_day(self, subject_id: int) -> Optional[int]:
+        day = self.days[subject_id]
+        return None if day == UNSCHEDULED else day
+
+    def copy(self) -> "CompactSchedule":
+        return CompactSchedule(array("i", self.days), self.num_days)
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the block with the resource tracker.
+        # Pool workers share the parent's tracker, so the parent's unlink()
+        # still releases it exactly once.
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedInstance:
+    """
+    ProblemInstance whose arrays live in shared memory.
+
+    The owning process creates it with SharedInstance(instance) and must call
+    close() when done. handle() is a small picklable description that worker
+    processes pass to attach() to get a read-only ProblemInstance backed by the
+    same memory, instead of receiving a pickled copy of the students.
+    """
+
+    def __init__(self, instance: ProblemInstance):
+        self.blocks: List[shared_memory.SharedMemory] = []
+        fields = []
+        for field_name, typecode in ProblemInstance.ARRAY_FIELDS:
+            data = memoryview(getattr(instance, field_name)).cast("B")
+            # Zero-sized blocks are not allowed
+            shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+            shm.buf[: data.nbytes] = data
+            self.blocks.append(shm)
+            fields.append((field_name, shm.name, typecode, data.nbytes))
+
+        self._handle = {
+            "subjects": instance.subjects,
+            "num_scheduled": instance.num_scheduled,
+            "fields": fields,
+        }
+
+    def handle(self) -> Dict[str, Any]:
+        return self._handle
+
+    @staticmethod
+    def attach(
+        handle: Dict[str, Any]
+    ) -> Tuple[ProblemInstance, List[shared_memory.SharedMemory]]:
+        """
+        Builds a ProblemInstance over the shared blocks. The returned blocks must
+        stay referenced for as long as the instance is used.
+        """
+        blocks = []
+        arrays = {}
+        for field_name, block_name, typecode, nbytes in handle["fields"]:
+            shm = _attach_block(block_name)
+            blocks.append(shm)
+            arrays[field_name] = shm.buf[:nbytes].cast(typecode)
+        instance = ProblemInstance(
+            handle["subjects"], handle["num_scheduled"], **arrays
+        )
+        return instance, blocks
+
+    def close(self):
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+        self.blocks = []
+
+
+# Per-worker state, set once by the pool initializer
+_WORKER: Dict[str, Any] = {}
+
+
+def init_worker_instance(handle: Dict[str, Any]):
+    """Process pool initializer: attaches the worker to a SharedInstance."""
+    # A forked worker inherits its parent's SIGTERM handler (see
+    # parallel._portfolio_worker); terminate() must kill it, not raise in a task
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    instance, blocks = SharedInstance.attach(handle)
+    _WORKER["instance"] = instance
+    _WORKER["blocks"] = blocks
+
+
+def get_worker_instance() -> ProblemInstance:
+    return _WORKER["instance"]
@@ -0,0 +1,201 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised by JobQueue.submit when the queue is at its depth limit."""
+
+
+class Job:
+    """
+    One background solve. The job function receives the Job and reports
+    progress through set_stage() and update(); long-running steps should
+    check `stopping` (or pass `stop_event` on) and return early once it is
+    set. A cancelled job returns None; one asked to finish early (`early`)
+    returns the best result it has so far.
+    """
+
+    def __init__(self, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.status = QUEUED
+        self.stage: Optional[str] = None
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.stop_event = threading.Event()
+        self.early = False
+        # Bumped on every progress change, so watchers can skip unchanged states
+        self.version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stopping(self) -> bool:
+        return self.stop_event.is_set()
+
+    def set_stage(self, stage: str, **progress):
+        with self._lock:
+            self.stage = stage
+            self.progress.update(progress)
+            self.version += 1
+
+    def update(self, **progress):
+        with self._lock:
+            self.progress.update(progress)
+            self.version += 1
+
+    def to_dict(self, position: Optional[int] = None) -> Dict[str, Any]:
+        """JSON-ready status; the result is left to the caller."""
+        now = self.finished or time.time()
+        with self._lock:
+            progress = dict(self.progress)
+            version = self.version
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": progress,
+            "queue_position": position,
+            "version": version,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed": now - self.started if self.started is not None else None,
+        }
+
+
+class JobQueue:
+    """
+    Bounded background worker pool for solve jobs.
+
+    `workers` threads run at most that many jobs at once; at most `max_queued`
+    more wait for a worker, beyond which submit() raises JobQueueFull. The
+    solvers run in their own processes (see parallel.run_portfolio), so the
+    threads mostly wait. The last `max_finished` finished jobs are kept for
+    status and result lookups; older ones are forgotten.
+    """
+
+    def __init__(self, workers: int = 1, max_queued: int = 10, max_finished: int = 50):
+        if workers < 1:
+            raise ValueError("A job queue needs at least one worker.")
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._waiting: List[Job] = []
+        self._ready = threading.Condition(self._lock)
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"solve-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Queues fn(job, *args, **kwargs); its return value becomes job.result."""
+        job = Job(fn, args, kwargs)
+        with self._lock:
+            if len(self._waiting) >= self.max_queued:
+                raise JobQueueFull(
+                    f"{len(self._waiting)} jobs are already waiting; try again later."
+                )
+            self._jobs[job.id] = job
+            self._waiting.append(job)
+            self._ready.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        """The jobs still known to the queue: waiting, running and recent."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def position(self, job: Job) -> Optional[int]:
+        """0-based place of a queued job in line, None once it has started."""
+        with self._lock:
+            try:
+                return self._waiting.index(job)
+            except ValueError:
+                return None
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a job: a queued one never runs, a running one is asked to stop
+        (see Job). Returns False for unknown or already finished jobs.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return False
+            job.stop_event.set()
+            if job.status == QUEUED:
+                self._waiting.remove(job)
+                self._finish(job, CANCELLED)
+            return True
+
+    def finish_early(self, job_id: str) -> bool:
+        """
+        Asks a running job to stop and keep its best result so far. Returns
+        False unless the job is running.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != RUNNING:
+                return False
+            job.early = True
+            job.stop_event.set()
+            return True
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while not self._waiting:
+                    self._ready.wait()
+                job = self._waiting.pop(0)
+                job.status = RUNNING
+                job.started = time.time()
+            try:
+                result = job.fn(job, *job.args, **job.kwargs)
+                cancelled = result is None and job.stopping
+                status, error = (CANCELLED if cancelled else DONE), None
+            except Exception as e:
+                result, status, error = None, FAILED, str(e)
+            with self._lock:
+                job.result = result
+                job.error = error
+                self._finish(job, status)
+
+    def _finish(self, job: Job, status: str):
+        # Called with the lock held
+        job.status = status
+        job.finished = time.time()
+        finished = [j for j in self._jobs.values() if j.status in FINISHED]
+        for old in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[old.id]
@@ -1,8 +1,12 @@
 import argparse
+import json
 import time
+from carter import dataset_periods, load_instance
 from test_solvers import generate_test_case
-from solvers import simulated_annealing, genetic_algorithm
-from scheduler import calculate_penalty, Subject
+from parallel import run_portfolio
+from scheduler import Subject
+from solvers import SOLVER_NAMES
+from telemetry import Telemetry
 
 
 def load_emails(file_path):
@@ -13,7 +17,10 @@ def load_emails(file_path):
 def main():
     parser = argparse.ArgumentParser(description="Exam Scheduler CLI")
     parser.add_argument(
-        "--days", type=int, default=20, help="Number of available slots"
+        "--days",
+        type=int,
+        default=None,
+        help="Number of available slots (default: the dataset's periods, else 20)",
     )
     parser.add_argument(
         "--holidays",
@@ -33,6 +40,11 @@ def main():
     parser.add_argument(
         "--emails", type=str, help="Path to file containing allowed emails"
     )
+    parser.add_argument(
+        "--dataset",
+        type=str,
+        help="Solve a Carter/Toronto dataset (.crs/.stu path, suffix optional)",
+    )
     parser.add_argument(
         "--subjects",
         type=str,
@@ -40,12 +52,97 @@ def main():
         default=["Math", "Physics", "Chemistry", "Biology", "History"],
         help="List of subjects (for form creation)",
     )
+    parser.add_argument(
+        "--chains",
+        type=int,
+        default=1,
+        help="Run N independent SA chains in parallel and keep the best",
+    )
+    parser.add_argument(
+        "--ga-workers",
+        type=int,
+        default=0,
+        help="Score GA populations on a pool of N worker processes",
+    )
+    parser.add_argument(
+        "--islands",
+        type=int,
+        default=1,
+        help="Evolve N GA populations in parallel with periodic migration",
+    )
+    parser.add_argument(
+        "--tabu-time",
+        type=float,
+        default=None,
+        help="Wall-clock limit in seconds for tabu search",
+    )
+    parser.add_argument(
+        "--decompose",
+        action="store_true",
+        help="Solve independent subject clusters separately and in parallel",
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Move clashing exams of SA moves and GA children to free days",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="Shared wall-clock budget in seconds for the concurrent solvers",
+    )
+    parser.add_argument(
+        "--target-penalty",
+        type=float,
+        default=None,
+        help="Stop the other solvers once one reaches this penalty",
+    )
+    parser.add_argument(
+        "--gap-tolerance",
+        type=float,
+        default=None,
+        help="Stop once a schedule is within this relative gap of the lower bound",
+    )
+    parser.add_argument(
+        "--stagnation",
+        type=int,
+        default=None,
+        help="Stop SA and tabu search after N moves without a new best",
+    )
+    parser.add_argument(
+        "--ga-stagnation",
+        type=int,
+        default=None,
+        help="Stop the GA after N generations without a new best",
+    )
+    parser.add_argument(
+        "--fidelity",
+        type=float,
+        default=None,
+        help="Score SA/GA moves on this fraction of students; results stay exact",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        help="Write each solver's progress trace (JSON) to this file",
+    )
+    parser.add_argument(
+        "--trace-interval",
+        type=int,
+        default=100,
+        help="Trace every N SA/tabu iterations (the GA traces every generation)",
+    )
 
     args = parser.parse_args()
 
     num_days = args.days
+    if num_days is None:
+        num_days = (dataset_periods(args.dataset) if args.dataset else None) or 20
     holidays = set(args.holidays)
 
+    instance = None
+
     # Check for Forms Logic
     if args.create_form:
         try:
@@ -94,43 +191,105 @@ def main():
         except Exception as e:
             print(f"Error polling form: {e}")
             return
+    elif args.dataset:
+        try:
+            # Streamed into the grouped instance; no Student list is built
+            instance = load_instance(args.dataset)
+        except (OSError, ValueError) as e:
+            print(f"Error loading dataset: {e}")
+            return
+        subjects, students = instance.scheduled_subjects, None
+        print(
+            f"Loaded {len(subjects)} subjects and {instance.total_students} "
+            f"students ({instance.num_students} distinct) "
+            f"from {args.dataset} ({num_days} days)."
+        )
     else:
         # Default Test Case
         print("Generating Test Case...")
         subjects, students = generate_test_case()
         print(f"Generated {len(subjects)} subjects and {len(students)} students.")
 
-    print("\n--- Running Simulated Annealing ---")
-    start_time = time.time()
-    sa_schedule = simulated_annealing(subjects, students, num_days, holidays)
-    sa_time = time.time() - start_time
-    sa_penalty = calculate_penalty(sa_schedule, students)
-    print(f"SA Finished in {sa_time:.4f}s. Penalty: {sa_penalty:.4f}")
-    if sa_penalty >= 1_000_000_000:
-        print("  WARNING: Constraint Violated (Schedule Invalid)")
-    else:
-        print("  Status: Valid")
+    options = {
+        "sa": {"decompose": args.decompose, "chains": args.chains},
+        "ga": {
+            "decompose": args.decompose,
+            "ga_workers": args.ga_workers,
+            "islands": args.islands,
+        },
+        "tabu": {"decompose": args.decompose},
+    }
+    if args.repair:
+        # Tabu search picks the best move by exact delta, so clashes are never
+        # preferred; only SA and GA take the repair operator
+        options["sa"]["repair"] = True
+        options["ga"]["repair"] = True
+    if args.tabu_time is not None:
+        options["tabu"]["time_limit"] = args.tabu_time
+    if args.stagnation is not None:
+        options["sa"]["stagnation"] = args.stagnation
+        options["tabu"]["stagnation"] = args.stagnation
+    if args.ga_stagnation is not None:
+        options["ga"]["stagnation"] = args.ga_stagnation
+    if args.fidelity is not None:
+        options["sa"]["fidelity"] = args.fidelity
+        options["ga"]["fidelity"] = args.fidelity
+    if args.trace:
+        options["sa"]["telemetry"] = Telemetry(interval=args.trace_interval)
+        options["tabu"]["telemetry"] = Telemetry(interval=args.trace_interval)
+        options["ga"]["telemetry"] = Telemetry(interval=1)
 
-    print("\n--- Running Genetic Algorithm ---")
+    print("\n--- Running SA, GA and Tabu Search concurrently ---")
     start_time = time.time()
-    ga_schedule = genetic_algorithm(subjects, students, num_days, holidays)
-    ga_time = time.time() - start_time
-    ga_penalty = calculate_penalty(ga_schedule, students)
-    print(f"GA Finished in {ga_time:.4f}s. Penalty: {ga_penalty:.4f}")
-    if ga_penalty >= 1_000_000_000:
-        print("  WARNING: Constraint Violated (Schedule Invalid)")
-    else:
-        print("  Status: Valid")
+    best_key, best_schedule, solver_stats = run_portfolio(
+        subjects,
+        students,
+        num_days,
+        holidays,
+        time_budget=args.time_budget,
+        target_penalty=args.target_penalty,
+        options=options,
+        gap_tolerance=args.gap_tolerance,
+        instance=instance,
+    )
+    print(f"Portfolio finished in {time.time() - start_time:.4f}s.")
+
+    for key, stats in solver_stats.items():
+        name = SOLVER_NAMES[key]
+        if stats["status"] != "done":
+            print(f"{name}: {stats['status']} after {stats['time']:.4f}s")
+            if stats.get("error"):
+                print(f"  Error: {stats['error']}")
+            continue
+        print(
+            f"{name} Finished in {stats['time']:.4f}s. "
+            f"Penalty: {stats['penalty']:.4f}"
+        )
+        print(
+            f"  Lower bound: {stats['lower_bound']:.4f}, gap: {stats['gap']:.1%}"
+        )
+        if stats["penalty"] >= 1_000_000_000:
+            print("  WARNING: Constraint Violated (Schedule Invalid)")
+        else:
+            print("  Status: Valid")
+        if "repairs" in stats:
+            print(f"  Repairs: {stats['repairs'].get('moves', 0)} exams moved")
+        cache = stats["cache"]
+        print(f"  Penalty cache: {cache['hits']} hits, {cache['misses']} misses")
+
+    if args.trace:
+        traces = {key: stats.get("trace", []) for key, stats in solver_stats.items()}
+        with open(args.trace, "w") as f:
+            json.dump(traces, f, indent=2)
+        print(f"\nTrace written to {args.trace}")
+
+    if best_schedule is None:
+        print("\nNo solver returned a schedule.")
+        return
 
     print("\n--- Comparison ---")
-    if sa_penalty < ga_penalty:
-        print("Simulated Annealing performed better.")
-        best_schedule = sa_schedule
-        best_solver = "Simulated Annealing"
-    else:
-        print("Genetic Algorithm performed better.")
-        best_schedule = ga_schedule
-        best_solver = "Genetic Algorithm"
+    best_solver = SOLVER_NAMES[best_key]
+    print(f"{best_solver} performed better.")
 
     print(f"\nBest Schedule ({best_solver}):")
     # Print schedule sorted by day
@@ -0,0 +1,141 @@
+import random
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from conflict_graph import ConflictGraph
+
+# A move proposes new days for some subjects: subject id -> new day.
+# It may return None when it cannot produce a change (e.g. a single day).
+Move = Callable[["NeighborhoodSet", Sequence[int]], Optional[Dict[int, int]]]
+
+
+def move_exam(
+    moves: "NeighborhoodSet", days: Sequence[int]
+) -> Optional[Dict[int, int]]:
+    """Move one random exam to a random available day."""
+    subject_id = moves.rng.randrange(moves.num_subjects)
+    return {subject_id: moves.rng.choice(moves.available_days)}
+
+
+def swap_exams(
+    moves: "NeighborhoodSet", days: Sequence[int]
+) -> Optional[Dict[int, int]]:
+    """Swap the days of two random exams."""
+    if moves.num_subjects < 2:
+        return None
+    i, j = moves.rng.sample(range(moves.num_subjects), 2)
+    if days[i] == days[j]:
+        return None
+    return {i: days[j], j: days[i]}
+
+
+def swap_days(
+    moves: "NeighborhoodSet", days: Sequence[int]
+) -> Optional[Dict[int, int]]:
+    """Swap the contents of two whole days."""
+    if len(moves.available_days) < 2:
+        return None
+    d1, d2 = moves.rng.sample(moves.available_days, 2)
+    changes = {}
+    for i in range(moves.num_subjects):
+        if days[i] == d1:
+            changes[i] = d2
+        elif days[i] == d2:
+            changes[i] = d1
+    return changes or None
+
+
+def kempe_chain(
+    moves: "NeighborhoodSet", days: Sequence[int]
+) -> Optional[Dict[int, int]]:
+    """
+    Kempe-chain move: take a random exam and a second day, collect the connected
+    component of the conflict graph restricted to both days, and swap the two
+    days within it. A conflict-free schedule stays conflict-free.
+    """
+    subject_id = moves.rng.randrange(moves.num_subjects)
+    d1 = days[subject_id]
+    others = [d for d in moves.available_days if d != d1]
+    if not others:
+        return None
+    d2 = moves.rng.choice(others)
+
+    graph = moves.graph
+    chain = {subject_id}
+    stack = [subject_id]
+    while stack:
+        u = stack.pop()
+        for v in graph.neighbors(u):
+            if v not in chain and days[v] in (d1, d2):
+                chain.add(v)
+                stack.append(v)
+
+    return {i: (d2 if days[i] == d1 else d1) for i in chain}
+
+
+NEIGHBORHOODS: Dict[str, Move] = {
+    "move": move_exam,
+    "swap": swap_exams,
+    "day_swap": swap_days,
+    "kempe": kempe_chain,
+}
+
+
+class NeighborhoodSet:
+    """
+    Set of SA neighborhoods selected adaptively by recent success rate.
+
+    Each neighborhood keeps an exponentially smoothed rate of improving moves;
+    propose() picks one with probability proportional to that rate (with a
+    floor so no neighborhood is starved) and record() updates it.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        num_subjects: int,
+        available_days: List[int],
+        graph: Optional[ConflictGraph] = None,
+        rng: Optional[random.Random] = None,
+        smoothing: float = 0.05,
+        min_weight: float = 0.05,
+    ):
+        unknown = [n for n in names if n not in NEIGHBORHOODS]
+        if unknown:
+            raise ValueError(f"Unknown neighborhoods: {', '.join(unknown)}")
+        if "kempe" in names and graph is None:
+            raise ValueError("Kempe-chain moves require the conflict graph.")
+
+        self.names = list(names)
+        self.num_subjects = num_subjects
+        self.available_days = available_days
+        self.graph = graph
+        self.rng = rng or random
+        self.smoothing = smoothing
+        self.min_weight = min_weight
+
+        # Optimistic start so every neighborhood gets tried early on
+        self.rates = {n: 1.0 for n in self.names}
+        self.proposed = {n: 0 for n in self.names}
+        self.improved = {n: 0 for n in self.names}
+
+    def propose(self, days: Sequence[int]) -> Tuple[str, Dict[int, int]]:
+        """Returns (neighborhood name, changes); changes may be empty."""
+        weights = [max(self.rates[n], self.min_weight) for n in self.names]
+        name = self.rng.choices(self.names, weights=weights, k=1)[0]
+        self.proposed[name] += 1
+        return name, NEIGHBORHOODS[name](self, days) or {}
+
+    def record(self, name: str, success: bool):
+        if success:
+            self.improved[name] += 1
+        self.rates[name] += self.smoothing * (float(success) - self.rates[name])
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            n: {
+                "proposed": self.proposed[n],
+                "improved": self.improved[n],
+                "rate": self.rates[n],
+            }
+            for n in self.names
+        }
@@ -0,0 +1,991 @@
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from bounds import gap_target, optimality_gap, penalty_lower_bound
+from conflict_graph import ConflictGraph
+from fitness import PoolEvaluator, make_evaluator
+from instance import (
+    CompactSchedule,
+    ProblemInstance,
+    SharedInstance,
+    get_worker_instance,
+    init_worker_instance,
+)
+from penalty_cache import PenaltyCache
+from repair import ConflictRepair
+from sampling import StratifiedSample
+from scheduler import Schedule, Student, Subject
+from solvers import (
+    SOLVERS,
+    evolve_population,
+    genetic_algorithm,
+    get_initial_solution,
+    simulated_annealing_compact,
+)
+from telemetry import Telemetry
+
+# Progress channel of a part worker (SA chain or component), see _PartProgress
+_PART_PROGRESS: Dict[str, Any] = {}
+
+
+def _init_part_progress(settings: Optional[Tuple[Any, int, bool]]):
+    _PART_PROGRESS.clear()
+    if settings is not None:
+        channel, interval, solutions = settings
+        _PART_PROGRESS.update(channel=channel, interval=interval, solutions=solutions)
+
+
+def _part_telemetry(part: int) -> Optional[Telemetry]:
+    """Telemetry of one part that sends its records to the parent's _PartProgress."""
+    if not _PART_PROGRESS:
+        return None
+    channel = _PART_PROGRESS["channel"]
+    return Telemetry(
+        callback=lambda record: channel.put((part, record)),
+        interval=_PART_PROGRESS["interval"],
+        keep=False,
+        solutions=_PART_PROGRESS["solutions"],
+    )
+
+
+class _PartProgress:
+    """
+    Turns the Telemetry records of a run's parallel parts into records of the
+    run's own Telemetry as they arrive (read from a queue on a thread).
+    Chains report the best chain so far. Components (merge=True) report once
+    all `parts` have a best: their costs are summed and their schedules merged
+    with the `fixed` days of the subjects nobody takes.
+    Part workers get settings() through their pool initializer.
+    """
+
+    def __init__(
+        self,
+        telemetry: Telemetry,
+        parts: int,
+        merge: bool = False,
+        fixed: Optional[Dict[str, int]] = None,
+    ):
+        self.telemetry = telemetry
+        self.parts = parts
+        self.merge = merge
+        self.fixed = fixed or {}
+        self.latest: Dict[int, Dict[str, Any]] = {}
+        self.channel = multiprocessing.Queue()
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+
+    def settings(self) -> Tuple[Any, int, bool]:
+        return self.channel, self.telemetry.interval, self.telemetry.solutions
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        # The workers have exited (and flushed their records) by now
+        self.channel.put(None)
+        self.thread.join()
+
+    def _drain(self):
+        while True:
+            message = self.channel.get()
+            if message is None:
+                return
+            part, record = message
+            self.latest[part] = record
+            self._report()
+
+    def _report(self):
+        records = list(self.latest.values())
+        if self.merge:
+            if len(records) < self.parts:
+                return
+            best = sum(r["best"] for r in records)
+            current = sum(r["current"] for r in records)
+            solution = None
+            if self.telemetry.solutions:
+                solution = dict(self.fixed)
+                for record in records:
+                    solution.update(record["schedule"])
+        else:
+            top = min(records, key=lambda r: r["best"])
+            best = top["best"]
+            current = min(r["current"] for r in records)
+            solution = top.get("schedule")
+        self.telemetry.sample(
+            sum(r["iteration"] for r in records),
+            sum(r["evaluations"] for r in records),
+            best,
+            current,
+            solution=solution,
+        )
+
+
+def _init_chain_worker(
+    handle: Dict[str, Any], progress: Optional[Tuple[Any, int, bool]]
+):
+    init_worker_instance(handle)
+    _init_part_progress(progress)
+
+
+def _run_sa_chain(
+    seed: int,
+    num_days: int,
+    holidays: Set[int],
+    sa_kwargs: Dict[str, Any],
+    part: int = 0,
+) -> Tuple[List[int], Dict[str, Any]]:
+    instance = get_worker_instance()
+    random.seed(seed)
+    start_time = time.time()
+    telemetry = _part_telemetry(part)
+    if telemetry is not None:
+        sa_kwargs = dict(sa_kwargs, telemetry=telemetry)
+    repairer = None
+    if sa_kwargs.get("repair"):
+        available_days = [d for d in range(num_days) if d not in holidays]
+        repairer = ConflictRepair.from_instance(instance, available_days)
+        sa_kwargs = dict(sa_kwargs, repair=repairer)
+    sample = None
+    fidelity = sa_kwargs.get("fidelity")
+    if fidelity is not None:
+        if fidelity < 1:
+            sample = StratifiedSample(instance, fidelity)
+        sa_kwargs = {k: v for k, v in sa_kwargs.items() if k != "fidelity"}
+        sa_kwargs["sample"] = sample
+    best = simulated_annealing_compact(instance, num_days, holidays, **sa_kwargs)
+    elapsed = time.time() - start_time
+    stats = {
+        "seed": seed,
+        "penalty": instance.penalty(best),
+        "time": elapsed,
+        "pid": os.getpid(),
+    }
+    if repairer is not None:
+        stats["repairs"] = repairer.stats()
+    if sample is not None:
+        stats["sampling"] = sample.stats()
+    return list(best.days), stats
+
+
+def parallel_simulated_annealing(
+    subjects: List[Subject],
+    students: Optional[List[Student]],
+    num_days: int,
+    holidays: Set[int],
+    num_chains: Optional[int] = None,
+    processes: Optional[int] = None,
+    seed: Optional[int] = None,
+    cache: Optional[PenaltyCache] = None,
+    telemetry: Optional[Telemetry] = None,
+    instance: Optional[ProblemInstance] = None,
+    **sa_kwargs,
+) -> Tuple[Schedule, List[Dict[str, Any]]]:
+    """
+    Multi-start simulated annealing: runs independent SA chains with different
+    seeds in a process pool and returns (best schedule, per-chain stats).
+    The compiled instance is placed in shared memory once and attached by every
+    worker. sa_kwargs are passed to simulated_annealing_compact (repair=True
+    gives every chain its own ConflictRepair, fidelity its own StratifiedSample;
+    their counters are in the chain's stats). Every chain's exact penalty is
+    stored in the optional PenaltyCache. A telemetry hook receives the best
+    chain's progress while the chains run. A compiled `instance` replaces
+    students.
+    """
+    num_chains = num_chains or os.cpu_count() or 1
+    processes = min(processes or os.cpu_count() or 1, num_chains)
+    rng = random.Random(seed)
+    seeds = [rng.randrange(2**31) for _ in range(num_chains)]
+    progress = None
+    if telemetry is not None:
+        telemetry.start("sa")
+        progress = _PartProgress(telemetry, num_chains)
+
+    if instance is None:
+        instance = ProblemInstance.from_students(subjects, students)
+    shared = SharedInstance(instance)
+    try:
+        with progress or nullcontext(), ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_chain_worker,
+            initargs=(shared.handle(), progress and progress.settings()),
+        ) as pool:
+            futures = [
+                pool.submit(_run_sa_chain, s, num_days, holidays, sa_kwargs, part)
+                for part, s in enumerate(seeds)
+            ]
+            results = [f.result() for f in futures]
+    finally:
+        shared.close()
+
+    schedules = []
+    for days, stats in results:
+        chain = CompactSchedule.from_days(
+            days[: instance.num_scheduled], num_days, instance
+        ).to_schedule(instance)
+        chain.penalty = stats["penalty"]
+        if cache is not None:
+            cache.store(cache.key(chain), chain.penalty)
+        schedules.append(chain)
+
+    best = min(schedules, key=lambda s: s.penalty)
+    return best, [stats for _, stats in results]
+
+
+def split_components(instance: ProblemInstance) -> List[ProblemInstance]:
+    """
+    Splits a compiled problem along the connected components of the subject
+    conflict graph, into instances that each schedule one component's subjects
+    (see ProblemInstance.restrict). Every student row lands in the component of
+    its subjects; rows with no scheduled subject are dropped (they add nothing
+    to the penalty).
+    """
+    components = ConflictGraph.from_instance(instance).components()
+    owner = [0] * instance.num_scheduled
+    for c, component in enumerate(components):
+        for i in component:
+            owner[i] = c
+
+    rows: List[List[int]] = [[] for _ in components]
+    for s in range(instance.num_students):
+        for i, _, _ in instance.enrollments(s):
+            if i < instance.num_scheduled:
+                rows[owner[i]].append(s)
+                break
+    return [
+        instance.restrict(component, part_rows)
+        for component, part_rows in zip(components, rows)
+    ]
+
+
+def _init_component_worker(progress: Optional[Tuple[Any, int, bool]] = None):
+    # Don't inherit a portfolio worker's SIGTERM handler (see init_worker_instance)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _init_part_progress(progress)
+
+
+def _solve_component(
+    solver: str,
+    instance: ProblemInstance,
+    num_days: int,
+    holidays: Set[int],
+    seed: int,
+    solver_kwargs: Dict[str, Any],
+    deadline: Optional[float] = None,
+    part: int = 0,
+) -> Tuple[Schedule, Dict[str, Any]]:
+    random.seed(seed)
+    start_time = time.time()
+    telemetry = _part_telemetry(part)
+    if telemetry is not None:
+        solver_kwargs = dict(solver_kwargs, telemetry=telemetry)
+    if deadline is not None:
+        # Components queued behind others only get what is left of the budget
+        solver_kwargs = dict(solver_kwargs, time_limit=max(deadline - start_time, 0.0))
+    repair_stats: Dict[str, int] = {}
+    if solver_kwargs.get("repair"):
+        solver_kwargs = dict(solver_kwargs, repair_stats=repair_stats)
+    subjects = instance.scheduled_subjects
+    schedule = SOLVERS[solver](
+        subjects, None, num_days, holidays, instance=instance, **solver_kwargs
+    )
+    stats = {
+        "subjects": len(subjects),
+        "students": instance.total_students,
+        "penalty": schedule.penalty,
+        "time": time.time() - start_time,
+    }
+    if repair_stats:
+        stats["repairs"] = repair_stats
+    return schedule, stats
+
+
+def solve_by_components(
+    subjects: List[Subject],
+    students: Optional[List[Student]],
+    num_days: int,
+    holidays: Set[int],
+    solver: str = "sa",
+    processes: Optional[int] = None,
+    seed: Optional[int] = None,
+    cache: Optional[PenaltyCache] = None,
+    telemetry: Optional[Telemetry] = None,
+    instance: Optional[ProblemInstance] = None,
+    **solver_kwargs,
+) -> Tuple[Schedule, List[Dict[str, Any]]]:
+    """
+    Solves every connected component of the conflict graph as its own smaller
+    problem, concurrently in a process pool, and merges the results into one
+    Schedule. Components share no students, so the merged penalty is the sum of
+    the component penalties. Returns (schedule, per-component stats).
+    solver is a key of solvers.SOLVERS; solver_kwargs are passed to it, except
+    that time_limit is one deadline shared by all components and
+    target_penalty, which only applies to the merged schedule, is dropped.
+    A telemetry hook receives the merged progress once every component has
+    reported a best. A compiled `instance` replaces students; the components
+    are split from it without building Student objects.
+    """
+    available_days = [d for d in range(num_days) if d not in holidays]
+    if not available_days:
+        raise ValueError("No available days to schedule exams.")
+    rng = random.Random(seed)
+    solver_kwargs = dict(solver_kwargs)
+    time_limit = solver_kwargs.pop("time_limit", None)
+    deadline = time.time() + time_limit if time_limit is not None else None
+    solver_kwargs.pop("target_penalty", None)
+
+    if instance is None:
+        instance = ProblemInstance.from_students(subjects, students)
+    assignments = {}
+    # Components come largest first, so the biggest start right away.
+    # Subjects nobody takes can go anywhere.
+    tasks = []
+    for part in split_components(instance):
+        if part.num_students:
+            tasks.append((part, rng.randrange(2**31)))
+        else:
+            for subj in part.scheduled_subjects:
+                assignments[subj] = rng.choice(available_days)
+
+    progress = None
+    if telemetry is not None:
+        telemetry.start(solver)
+        fixed = {subj.name: day for subj, day in assignments.items()}
+        progress = _PartProgress(telemetry, len(tasks), merge=True, fixed=fixed)
+    settings = progress and progress.settings()
+
+    processes = min(processes or os.cpu_count() or 1, max(len(tasks), 1))
+    if processes == 1:
+        with progress or nullcontext():
+            _init_part_progress(settings)
+            try:
+                results = [
+                    _solve_component(
+                        solver,
+                        part_instance,
+                        num_days,
+                        holidays,
+                        task_seed,
+                        solver_kwargs,
+                        deadline,
+                        part,
+                    )
+                    for part, (part_instance, task_seed) in enumerate(tasks)
+                ]
+            finally:
+                _init_part_progress(None)
+    else:
+        with progress or nullcontext(), ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_component_worker,
+            initargs=(settings,),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _solve_component,
+                    solver,
+                    part_instance,
+                    num_days,
+                    holidays,
+                    task_seed,
+                    solver_kwargs,
+                    deadline,
+                    part,
+                )
+                for part, (part_instance, task_seed) in enumerate(tasks)
+            ]
+            results = [f.result() for f in futures]
+
+    penalty = 0.0
+    for schedule, stats in results:
+        assignments.update(schedule.assignments)
+        penalty += stats["penalty"]
+
+    merged = Schedule(assignments, num_days, penalty=penalty)
+    if cache is not None:
+        cache.store(cache.key(merged), penalty)
+    return merged, [stats for _, stats in results]
+
+
+# Per-process island problem, set by _init_island_worker
+_ISLAND: Dict[str, Any] = {}
+
+
+def _init_island_worker(
+    subjects: List[Subject],
+    instance: ProblemInstance,
+    num_days: int,
+    holidays: Set[int],
+    repair: bool,
+):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _ISLAND["subjects"] = subjects
+    _ISLAND["num_days"] = num_days
+    _ISLAND["holidays"] = holidays
+    _ISLAND["evaluator"] = make_evaluator(subjects, None, instance=instance)
+    _ISLAND["repair"] = None
+    if repair:
+        available_days = [d for d in range(num_days) if d not in holidays]
+        _ISLAND["repair"] = ConflictRepair.from_instance(instance, available_days)
+
+
+def _evolve_island(
+    population: Optional[List[List[int]]],
+    penalties: Optional[List[float]],
+    population_size: int,
+    generations: int,
+    mutation_rate: float,
+    seed: int,
+    deadline: Optional[float],
+    target_penalty: Optional[float],
+) -> Tuple[List[List[int]], List[float], Dict[str, int]]:
+    """
+    Runs one migration interval of an island. Individuals travel as day vectors
+    (days of the subjects, in order) with their penalties, so nothing is
+    re-scored when an island continues. Also returns the counters of the
+    island's repair operator for this interval (empty without repair).
+    """
+    random.seed(seed)
+    subjects = _ISLAND["subjects"]
+    num_days = _ISLAND["num_days"]
+    holidays = _ISLAND["holidays"]
+    if population is None:
+        schedules = [
+            get_initial_solution(subjects, num_days, holidays)
+            for _ in range(population_size)
+        ]
+    else:
+        schedules = [
+            Schedule(dict(zip(subjects, days)), num_days, penalty=penalty)
+            for days, penalty in zip(population, penalties)
+        ]
+    repair = _ISLAND["repair"]
+    before = repair.stats() if repair is not None else {}
+    schedules = evolve_population(
+        schedules,
+        subjects,
+        num_days,
+        holidays,
+        generations,
+        mutation_rate,
+        _ISLAND["evaluator"],
+        deadline=deadline,
+        target_penalty=target_penalty,
+        repair=repair,
+    )
+    penalties = _ISLAND["evaluator"].evaluate(schedules)
+    days = [[s.assignments[subj] for subj in subjects] for s in schedules]
+    repairs = {}
+    if repair is not None:
+        repairs = {key: value - before[key] for key, value in repair.stats().items()}
+    return days, penalties, repairs
+
+
+MIGRATION_TOPOLOGIES = ("ring", "random", "complete")
+
+
+def _migration_targets(
+    topology: str, island: int, num_islands: int, rng: random.Random
+) -> List[int]:
+    """Islands that receive emigrants from `island`."""
+    others = [j for j in range(num_islands) if j != island]
+    if not others:
+        return []
+    if topology == "ring":
+        return [(island + 1) % num_islands]
+    if topology == "random":
+        return [rng.choice(others)]
+    return others
+
+
+def island_genetic_algorithm(
+    subjects: List[Subject],
+    students: Optional[List[Student]],
+    num_days: int,
+    holidays: Set[int],
+    num_islands: Optional[int] = None,
+    population_size: int = 50,
+    generations: int = 100,
+    mutation_rate: float = 0.1,
+    migration_interval: int = 10,
+    migrants: int = 2,
+    topology: str = "ring",
+    processes: Optional[int] = None,
+    seed: Optional[int] = None,
+    cache: Optional[PenaltyCache] = None,
+    time_limit: Optional[float] = None,
+    target_penalty: Optional[float] = None,
+    repair: bool = False,
+    stagnation: Optional[int] = None,
+    telemetry: Optional[Telemetry] = None,
+    instance: Optional[ProblemInstance] = None,
+) -> Tuple[Schedule, List[Dict[str, Any]]]:
+    """
+    Island-model GA: num_islands populations of population_size evolve in a
+    process pool and, every migration_interval generations, each island sends
+    copies of its `migrants` best individuals to its neighbours under
+    `topology` ("ring", "random" or "complete"), where they replace the worst.
+    Islands evolve independently in between, which keeps the total population
+    diverse. With repair=True children go through a ConflictRepair. Stops
+    early after time_limit seconds, once target_penalty is reached or once no
+    island found a new best for `stagnation` generations (checked at every
+    migration). A telemetry hook is sampled after every migration interval
+    with the best individual so far and the best of the interval. A compiled
+    `instance` replaces students; it is what the island workers receive.
+    Returns (best schedule, per-island stats) where each island's stats hold
+    its best and mean penalty after every interval and its repair counters
+    ("repairs", as ConflictRepair.stats).
+    """
+    num_islands = num_islands or os.cpu_count() or 1
+    processes = min(processes or os.cpu_count() or 1, num_islands)
+    if topology not in MIGRATION_TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology: {topology}")
+    rng = random.Random(seed)
+    deadline = time.time() + time_limit if time_limit is not None else None
+    if telemetry is not None:
+        telemetry.start("ga")
+    if instance is None:
+        instance = ProblemInstance.from_students(subjects, students)
+
+    populations: List[Optional[List[List[int]]]] = [None] * num_islands
+    penalties: List[Optional[List[float]]] = [None] * num_islands
+    stats = [
+        {"island": i, "best": [], "mean": [], "repairs": {}}
+        for i in range(num_islands)
+    ]
+    best_days, best_penalty = None, None
+    stale = 0
+
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_island_worker,
+        initargs=(subjects, instance, num_days, holidays, repair),
+    ) as pool:
+        remaining = generations
+        while True:
+            interval = min(migration_interval, remaining)
+            futures = [
+                pool.submit(
+                    _evolve_island,
+                    populations[i],
+                    penalties[i],
+                    population_size,
+                    interval,
+                    mutation_rate,
+                    rng.randrange(2**31),
+                    deadline,
+                    target_penalty,
+                )
+                for i in range(num_islands)
+            ]
+            improved = False
+            for i, future in enumerate(futures):
+                populations[i], penalties[i], repairs = future.result()
+                for key, value in repairs.items():
+                    stats[i]["repairs"][key] = stats[i]["repairs"].get(key, 0) + value
+                island_best = min(penalties[i])
+                stats[i]["best"].append(island_best)
+                stats[i]["mean"].append(sum(penalties[i]) / len(penalties[i]))
+                if best_penalty is None or island_best < best_penalty:
+                    best_penalty = island_best
+                    best_days = populations[i][penalties[i].index(island_best)]
+                    improved = True
+            remaining -= interval
+            stale = 0 if improved else stale + interval
+            if telemetry is not None:
+                done = generations - remaining
+                solution = None
+                if telemetry.solutions:
+                    solution = {s.name: d for s, d in zip(subjects, best_days)}
+                telemetry.sample(
+                    done,
+                    done * population_size * num_islands,
+                    best_penalty,
+                    min(island["best"][-1] for island in stats),
+                    solution=solution,
+                )
+
+            if remaining <= 0:
+                break
+            if stagnation is not None and stale >= stagnation:
+                break
+            if target_penalty is not None and best_penalty <= target_penalty:
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+
+            # Migration: emigrants are picked before any island is changed
+            emigrants = []
+            for i in range(num_islands):
+                order = sorted(range(len(penalties[i])), key=penalties[i].__getitem__)
+                emigrants.append([(populations[i][k], penalties[i][k]) for k in order])
+            for i in range(num_islands):
+                for j in _migration_targets(topology, i, num_islands, rng):
+                    worst = sorted(
+                        range(len(penalties[j])),
+                        key=penalties[j].__getitem__,
+                        reverse=True,
+                    )
+                    for k, (days, penalty) in zip(worst, emigrants[i][:migrants]):
+                        populations[j][k] = list(days)
+                        penalties[j][k] = penalty
+
+    best = Schedule(dict(zip(subjects, best_days)), num_days, penalty=best_penalty)
+    if cache is not None:
+        cache.store(cache.key(best), best_penalty)
+    return best, stats
+
+
+def run_solver(
+    solver: str,
+    subjects: List[Subject],
+    students: Optional[List[Student]],
+    num_days: int,
+    holidays: Set[int],
+    decompose: bool = False,
+    chains: int = 1,
+    ga_workers: int = 0,
+    islands: int = 1,
+    repair_stats: Optional[Dict[str, int]] = None,
+    **solver_kwargs,
+) -> Schedule:
+    """
+    Runs one solver from solvers.SOLVERS with the CLI/web execution options:
+    decompose (solve conflict-graph components separately), chains (multi-start
+    SA), ga_workers (GA fitness on a process pool) and islands (island-model GA).
+    With repair=True (SA and GA), the repair counters of every part of the run
+    are added to the optional repair_stats dict. A `telemetry` hook traces
+    single-process runs in full; parallel ones report the best chain, the
+    merged components or the best island as they progress, plus a final record.
+    A compiled `instance` is passed on to every solver, pool and part, so
+    students may be None.
+    """
+    if repair_stats is None:
+        repair_stats = {}
+    parallel = (
+        decompose
+        or (solver == "sa" and chains > 1)
+        or (solver == "ga" and islands > 1)
+    )
+    if not parallel:
+        if solver_kwargs.get("repair"):
+            solver_kwargs["repair_stats"] = repair_stats
+        if solver == "ga" and ga_workers > 0:
+            instance = solver_kwargs.get("instance")
+            with PoolEvaluator(
+                subjects, students, ga_workers, instance=instance
+            ) as evaluator:
+                return genetic_algorithm(
+                    subjects,
+                    students,
+                    num_days,
+                    holidays,
+                    evaluator=evaluator,
+                    **solver_kwargs,
+                )
+        return SOLVERS[solver](subjects, students, num_days, holidays, **solver_kwargs)
+
+    telemetry = solver_kwargs.pop("telemetry", None)
+    if decompose:
+        schedule, stats = solve_by_components(
+            subjects,
+            students,
+            num_days,
+            holidays,
+            solver,
+            telemetry=telemetry,
+            **solver_kwargs,
+        )
+        for part in stats:
+            for key, value in part.get("repairs", {}).items():
+                repair_stats[key] = repair_stats.get(key, 0) + value
+    elif solver == "sa":
+        schedule, stats = parallel_simulated_annealing(
+            subjects,
+            students,
+            num_days,
+            holidays,
+            num_chains=chains,
+            telemetry=telemetry,
+            **solver_kwargs,
+        )
+        for chain in stats:
+            for key, value in chain.get("repairs", {}).items():
+                repair_stats[key] = repair_stats.get(key, 0) + value
+    else:
+        if solver_kwargs.get("fidelity") is not None:
+            raise ValueError("Sampled evaluation is not supported by the island GA.")
+        schedule, stats = island_genetic_algorithm(
+            subjects,
+            students,
+            num_days,
+            holidays,
+            num_islands=islands,
+            telemetry=telemetry,
+            **solver_kwargs,
+        )
+        for island in stats:
+            for key, value in island["repairs"].items():
+                repair_stats[key] = repair_stats.get(key, 0) + value
+    if telemetry is not None:
+        solution = None
+        if telemetry.solutions:
+            solution = {s.name: d for s, d in schedule.assignments.items()}
+        telemetry.finish(0, 0, schedule.penalty, solution=solution)
+    return schedule
+
+
+# Seconds between cancellation checks while a portfolio waits for results
+CANCEL_POLL = 0.5
+
+# Telemetry interval of each solver when a portfolio streams progress (the
+# records are throttled by time on top of this)
+PROGRESS_INTERVALS = {"sa": 100, "ga": 1, "tabu": 5}
+
+
+class _ProgressForwarder:
+    """
+    Telemetry callback of a portfolio worker: sends the records to the parent
+    at most every `period` seconds, plus the final one.
+    """
+
+    def __init__(self, results, period: float, callback=None):
+        self.results = results
+        self.period = period
+        self.callback = callback
+        self.last: Optional[float] = None
+
+    def __call__(self, record: Dict[str, Any]):
+        if self.callback is not None:
+            self.callback(record)
+        now = time.perf_counter()
+        if record["final"] or self.last is None or now - self.last >= self.period:
+            self.last = now
+            self.results.put(("progress", record))
+
+
+def _stop_portfolio_worker(signum, frame):
+    # Take down pool workers started by this solver (multi-start SA, GA pool),
+    # then unwind so their shared memory blocks are released in finally clauses.
+    # Every pool initializer resets SIGTERM, so the workers die on the spot
+    # instead of running this handler themselves and picking up the next task.
+    for child in multiprocessing.active_children():
+        child.terminate()
+    raise SystemExit(1)
+
+
+def _portfolio_worker(
+    solver: str,
+    subjects: List[Subject],
+    instance: ProblemInstance,
+    num_days: int,
+    holidays: Set[int],
+    seed: int,
+    options: Dict[str, Any],
+    results,
+    progress_period: Optional[float] = None,
+):
+    signal.signal(signal.SIGTERM, _stop_portfolio_worker)
+    random.seed(seed)
+    start_time = time.time()
+    repair_stats: Dict[str, int] = {}
+    # The solver's own cache: a cache in the parent is never seen in here
+    cache = PenaltyCache(subjects)
+    options = dict(options, cache=cache)
+    # Per-run extras sent back with the result: repair counters, cache counters
+    # (filled in at the end) and the trace
+    extras: Dict[str, Any] = {"repairs": repair_stats}
+    telemetry = options.get("telemetry")
+    if telemetry is not None:
+        extras["trace"] = telemetry.trace
+    if progress_period is not None:
+        if telemetry is None:
+            interval = PROGRESS_INTERVALS.get(solver, 1)
+            telemetry = Telemetry(interval=interval, keep=False)
+            options = dict(options, telemetry=telemetry)
+        telemetry.callback = _ProgressForwarder(
+            results, progress_period, telemetry.callback
+        )
+        telemetry.solutions = True
+    try:
+        schedule = run_solver(
+            solver,
+            subjects,
+            None,
+            num_days,
+            holidays,
+            repair_stats=repair_stats,
+            instance=instance,
+            **options,
+        )
+        elapsed = time.time() - start_time
+        extras["cache"] = cache.stats()
+        results.put(("result", solver, schedule, elapsed, extras, None))
+    except Exception as e:
+        elapsed = time.time() - start_time
+        extras["cache"] = cache.stats()
+        results.put(("result", solver, None, elapsed, extras, str(e)))
+
+
+def run_portfolio(
+    subjects: List[Subject],
+    students: Optional[List[Student]],
+    num_days: int,
+    holidays: Set[int],
+    solvers: Sequence[str] = ("sa", "ga", "tabu"),
+    time_budget: Optional[float] = None,
+    target_penalty: Optional[float] = None,
+    options: Optional[Dict[str, Dict[str, Any]]] = None,
+    seed: Optional[int] = None,
+    cache: Optional[PenaltyCache] = None,
+    grace: float = 5.0,
+    gap_tolerance: Optional[float] = None,
+    trace_interval: Optional[int] = None,
+    cancel: Optional[threading.Event] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    progress_period: float = 1.0,
+    instance: Optional[ProblemInstance] = None,
+) -> Tuple[Optional[str], Optional[Schedule], Dict[str, Dict[str, Any]]]:
+    """
+    Races the given solvers concurrently, one process each, under a shared
+    wall-clock budget. Each solver gets time_budget as its time_limit; any
+    process still running `grace` seconds after the budget is stopped. With
+    target_penalty, the remaining solvers are stopped as soon as one returns a
+    schedule at or below it. gap_tolerance does the same for the relative gap
+    to bounds.penalty_lower_bound (e.g. 0.05 stops within 5% of the bound).
+
+    options: per-solver keyword arguments for run_solver, e.g.
+    {"sa": {"chains": 4}}.
+    Returns (best solver, best schedule, per-solver stats) where stats hold
+    "status" (done/stopped/timeout/error), "penalty", "time", the instance's
+    "lower_bound", the "gap" to it, the counters of the PenaltyCache the solver
+    ran with ("cache") and, for solvers run with repair, the "repairs" counters.
+    Solvers run with a Telemetry (an options entry, or one sampling every
+    trace_interval iterations) return its records in "trace". The returned
+    penalties are stored in the optional `cache`.
+    Setting the `cancel` event stops the solvers still running, like a reached
+    target does. `progress` is called in this process with the Telemetry
+    records of every solver (including the best schedule so far), at most
+    every progress_period seconds per solver.
+    The problem is compiled once, here, and the solver processes get the
+    grouped ProblemInstance; pass `instance` (e.g. carter.load_instance) to
+    skip the Student list altogether.
+    """
+    options = options or {}
+    if instance is None:
+        instance = ProblemInstance.from_students(subjects, students)
+    lower_bound = penalty_lower_bound(instance, num_days, holidays)
+    if gap_tolerance is not None:
+        target = gap_target(lower_bound, gap_tolerance)
+        if target_penalty is None or target > target_penalty:
+            target_penalty = target
+
+    rng = random.Random(seed)
+    ctx = multiprocessing.get_context()
+    results = ctx.Queue()
+
+    processes = {}
+    start_time = time.time()
+    for solver in solvers:
+        solver_options = dict(options.get(solver, {}))
+        if time_budget is not None:
+            solver_options.setdefault("time_limit", time_budget)
+        if target_penalty is not None:
+            solver_options.setdefault("target_penalty", target_penalty)
+        if trace_interval is not None:
+            solver_options.setdefault("telemetry", Telemetry(interval=trace_interval))
+        proc = ctx.Process(
+            target=_portfolio_worker,
+            args=(
+                solver,
+                subjects,
+                instance,
+                num_days,
+                holidays,
+                rng.randrange(2**31),
+                solver_options,
+                results,
+                progress_period if progress is not None else None,
+            ),
+        )
+        proc.start()
+        processes[solver] = proc
+
+    deadline = start_time + time_budget + grace if time_budget is not None else None
+    stats: Dict[str, Dict[str, Any]] = {}
+    schedules: Dict[str, Schedule] = {}
+    while len(stats) < len(processes):
+        if cancel is not None and cancel.is_set():
+            break
+        timeout = None if deadline is None else max(deadline - time.time(), 0.0)
+        if cancel is not None:
+            # Wake up regularly to notice a cancellation
+            timeout = CANCEL_POLL if timeout is None else min(timeout, CANCEL_POLL)
+        try:
+            message = results.get(timeout=timeout)
+        except queue.Empty:
+            if deadline is not None and time.time() >= deadline:
+                break
+            continue
+        if message[0] == "progress":
+            progress(message[1])
+            continue
+        _, solver, schedule, elapsed, extras, error = message
+
+        if schedule is None:
+            stats[solver] = {
+                "status": "error",
+                "penalty": None,
+                "time": elapsed,
+                "error": error,
+                "cache": extras["cache"],
+            }
+            if "trace" in extras:
+                stats[solver]["trace"] = extras["trace"]
+            continue
+
+        penalty = schedule.penalty
+        if cache is not None:
+            cache.store(cache.key(schedule), penalty)
+        schedules[solver] = schedule
+        stats[solver] = {
+            "status": "done",
+            "penalty": penalty,
+            "time": elapsed,
+            "lower_bound": lower_bound,
+            "gap": optimality_gap(penalty, lower_bound),
+            "cache": extras["cache"],
+        }
+        if extras["repairs"]:
+            stats[solver]["repairs"] = extras["repairs"]
+        if "trace" in extras:
+            stats[solver]["trace"] = extras["trace"]
+        if target_penalty is not None and penalty <= target_penalty:
+            break
+
+    # Stop whatever is still running (target reached or budget exhausted)
+    for solver, proc in processes.items():
+        if solver not in stats:
+            proc.terminate()
+            timed_out = deadline is not None and time.time() >= deadline
+            stats[solver] = {
+                "status": "timeout" if timed_out else "stopped",
+                "penalty": None,
+                "time": time.time() - start_time,
+            }
+        proc.join()
+
+    if not schedules:
+        return None, None, stats
+    # Ties go to the earlier solver in `solvers`
+    best_solver = min(
+        (s for s in solvers if s in schedules), key=lambda s: schedules[s].penalty
+    )
+    return best_solver, schedules[best_solver], stats
@@ -0,0 +1,72 @@
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+from instance import UNSCHEDULED
+from scheduler import Schedule, Student, Subject, schedule_penalty
+
+
+class PenaltyCache:
+    """
+    Bounded LRU cache of penalties for one problem (subjects, students and
+    penalty parameters are fixed for the cache's lifetime).
+
+    Keys are a 16-byte hash of the assignment vector, i.e. the days of
+    `subjects` in order, so compact day vectors and Schedule objects share
+    entries. Counts hits, misses and evictions.
+    """
+
+    def __init__(self, subjects: List[Subject], maxsize: int = 65536):
+        self.subjects = subjects
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_days(days: Sequence[int]) -> bytes:
+        """Key of an assignment vector (days of the cache's subjects, in order)."""
+        return hashlib.blake2b(array("i", days).tobytes(), digest_size=16).digest()
+
+    def key(self, schedule: Schedule) -> bytes:
+        assignments = schedule.assignments
+        return self.key_days([assignments.get(s, UNSCHEDULED) for s in self.subjects])
+
+    def lookup(self, key: bytes) -> Optional[float]:
+        penalty = self._entries.get(key)
+        if penalty is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return penalty
+
+    def store(self, key: bytes, penalty: float):
+        self._entries[key] = penalty
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def penalty(self, schedule: Schedule, students: List[Student]) -> float:
+        """Penalty of a Schedule, computed only on a cache miss."""
+        key = self.key(schedule)
+        penalty = self.lookup(key)
+        if penalty is None:
+            penalty = schedule_penalty(schedule, students)
+            self.store(key, penalty)
+        schedule.penalty = penalty
+        return penalty
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,130 @@
+import random
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from conflict_graph import ConflictGraph
+from instance import ProblemInstance
+from scheduler import Subject, gap_decay_table
+
+
+class ConflictRepair:
+    """
+    Feasibility-preserving repair operator on the subject conflict graph.
+
+    An exam that shares a day with a neighbouring exam is moved to the cheapest
+    available day none of its neighbours use. "Cheapest" is estimated from the
+    graph alone: every neighbour costs its shared-student count times
+    e^(-a * distance in days), so the exam lands away from the exams its
+    students also sit. If every day is used by a neighbour the exam is left
+    where it is. Counts calls, repaired calls, moves and unrepairable exams.
+    """
+
+    def __init__(
+        self,
+        graph: ConflictGraph,
+        available_days: Sequence[int],
+        subjects: Optional[List[Subject]] = None,
+        rng: Optional[random.Random] = None,
+        a: float = 1.0,
+    ):
+        if not available_days:
+            raise ValueError("No available days to schedule exams.")
+        self.graph = graph
+        self.available_days = list(available_days)
+        # Scheduled subjects in id order, for repair_assignments()
+        self.subjects = subjects
+        self.rng = rng or random
+        self.decay = gap_decay_table(a, 0, max(self.available_days) + 1)
+
+        self.calls = 0
+        self.repaired = 0
+        self.moves = 0
+        self.unrepairable = 0
+
+    @classmethod
+    def from_instance(
+        cls,
+        instance: ProblemInstance,
+        available_days: Sequence[int],
+        graph: Optional[ConflictGraph] = None,
+        rng: Optional[random.Random] = None,
+    ) -> "ConflictRepair":
+        if graph is None:
+            graph = ConflictGraph.from_instance(instance)
+        return cls(graph, available_days, instance.scheduled_subjects, rng)
+
+    def repair(
+        self,
+        days: Sequence[int],
+        changes: Dict[int, int],
+        subject_ids: Optional[Iterable[int]] = None,
+    ) -> Dict[int, int]:
+        """
+        Repairs `days` with `changes` (subject id -> new day) applied, without
+        modifying either. Only subject_ids are checked (default: the changed
+        subjects, the only ones a move can put into a new clash).
+        Returns the changes extended with the repair moves.
+        """
+        self.calls += 1
+        result = dict(changes)
+        if subject_ids is None:
+            subject_ids = list(changes)
+
+        moves = 0
+        for i in subject_ids:
+            neighbors = self.graph.neighbors(i)
+            day = result.get(i, days[i])
+            used = {result.get(j, days[j]) for j in neighbors}
+            if day not in used:
+                continue
+            free = [d for d in self.available_days if d not in used]
+            if not free:
+                self.unrepairable += 1
+                continue
+            result[i] = min(
+                free, key=lambda d: self._day_cost(d, neighbors, result, days)
+            )
+            moves += 1
+
+        if moves:
+            self.repaired += 1
+            self.moves += moves
+        return result
+
+    def _day_cost(
+        self,
+        day: int,
+        neighbors: Dict[int, int],
+        changes: Dict[int, int],
+        days: Sequence[int],
+    ) -> float:
+        decay = self.decay
+        return sum(
+            weight * decay[abs(day - changes.get(j, days[j]))]
+            for j, weight in neighbors.items()
+        )
+
+    def repair_assignments(self, assignments: Dict[Subject, int]) -> int:
+        """
+        Repairs a Schedule's assignments in place, checking every subject in
+        random order. Returns the number of exams moved.
+        """
+        days = [assignments[subj] for subj in self.subjects]
+        order = list(range(len(days)))
+        self.rng.shuffle(order)
+        changes = self.repair(days, {}, order)
+        for i, day in changes.items():
+            assignments[self.subjects[i]] = day
+        return len(changes)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "repaired": self.repaired,
+            "moves": self.moves,
+            "unrepairable": self.unrepairable,
+        }
+
+    def merge_stats(self, target: Dict[str, int]):
+        """Adds this operator's counters to `target` (a caller's stats dict)."""
+        for key, value in self.stats().items():
+            target[key] = target.get(key, 0) + value
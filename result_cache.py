@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from scheduler import Student, Subject
+
+# Bump when the key inputs or the cached payload change meaning
+FORMAT_VERSION = 1
+
+
+def result_key(
+    subjects: List[Subject],
+    students: Iterable[Student],
+    num_days: int,
+    holidays: Set[int],
+    params: Dict[str, Any],
+) -> str:
+    """
+    Content hash of a scheduling run: subject names, the students' enrollments
+    (subject, difficulty, trials; student ids and order do not matter),
+    num_days, holidays and the solver parameters (a JSON-able dict).
+    """
+    profiles = sorted(
+        sorted(
+            (subj.name, difficulty, student.trials.get(subj, 0))
+            for subj, difficulty in student.subjects.items()
+        )
+        for student in students
+    )
+    content = {
+        "version": FORMAT_VERSION,
+        "subjects": [subj.name for subj in subjects],
+        "students": profiles,
+        "num_days": num_days,
+        "holidays": sorted(holidays),
+        "params": params,
+    }
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent cache of run results (JSON-able dicts) keyed by result_key.
+
+    Every entry is one file in `directory`, written atomically, so the cache
+    survives restarts and can be shared by several processes. Reads refresh an
+    entry's modification time, and once the files exceed max_bytes the least
+    recently used ones are deleted. Counts hits, misses and evictions (of this
+    process).
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Missing, just evicted by another process, or unreadable
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._evict()
+
+    def _entries(self) -> List[os.DirEntry]:
+        return [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(".json") and entry.is_file()
+        ]
+
+    def _evict(self):
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for entry in self._entries():
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,150 @@
+import math
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from conflict_graph import ConflictGraph
+from instance import CompactSchedule, ProblemInstance
+from scheduler import CONFLICT_PENALTY
+
+
+class StratifiedSample:
+    """
+    Stratified random sample of an instance's students, for approximate
+    (surrogate) penalty evaluation of very large cohorts.
+
+    Students are stratified by their lowest scheduled subject id, so every
+    subject cluster is represented. Each stratum of N_h students contributes
+    n_h = max(min_per_stratum, round(fidelity * N_h)) students (at most N_h),
+    drawn without replacement. The sample is a smaller ProblemInstance whose
+    counts are expansion weights (sampled members of a profile * N_h / n_h),
+    so its penalty is an unbiased estimate of the full penalty and everything
+    that scores an instance (DeltaEvaluator, instance.penalty) works on it.
+    Students without scheduled subjects never cost anything and are left out.
+
+    Only the gap penalty should be estimated (conflict_penalty=0): a clash of
+    one unsampled student costs more than any gap, so clashes are counted
+    exactly on the full conflict graph instead (per shared student and subject
+    pair, which matches calculate_penalty unless a student has three or more
+    exams on one day). See estimate().
+
+    Also counts how far the estimates were off from the exact checks recorded
+    by the solvers (see record_move / record_checkpoint).
+    """
+
+    def __init__(
+        self,
+        instance: ProblemInstance,
+        fidelity: float,
+        rng: Optional[random.Random] = None,
+        min_per_stratum: int = 2,
+        graph: Optional[ConflictGraph] = None,
+    ):
+        if not 0 < fidelity <= 1:
+            raise ValueError("Fidelity must be in (0, 1].")
+        self.base = instance
+        self.fidelity = fidelity
+        self.graph = graph or ConflictGraph.from_instance(instance)
+        rng = rng or random
+
+        strata: Dict[int, List[int]] = {}
+        for s in range(instance.num_students):
+            scheduled = [
+                i
+                for i in instance.subject_ids[
+                    instance.offsets[s] : instance.offsets[s + 1]
+                ]
+                if i < instance.num_scheduled
+            ]
+            if scheduled:
+                strata.setdefault(min(scheduled), []).append(s)
+
+        rows: List[int] = []
+        counts: List[float] = []
+        # Per stratum: (rows of the sample, sampled students per row, N_h, n_h)
+        self.strata: List[Tuple[List[int], List[int], int, int]] = []
+        for _, members in sorted(strata.items()):
+            # Students of a profile row are interchangeable: sample student
+            # positions and map them back to rows through the cumulative counts
+            cumulative = list(accumulate(round(instance.counts[s]) for s in members))
+            size = cumulative[-1]
+            n = min(size, max(min_per_stratum, round(fidelity * size)))
+            picked: Dict[int, int] = {}
+            for position in rng.sample(range(size), n):
+                s = members[bisect_right(cumulative, position)]
+                picked[s] = picked.get(s, 0) + 1
+            sample_rows = list(range(len(rows), len(rows) + len(picked)))
+            for s, m in picked.items():
+                rows.append(s)
+                counts.append(m * size / n)
+            self.strata.append((sample_rows, list(picked.values()), size, n))
+
+        self.instance = instance.select(rows, counts)
+        self.total_students = sum(size for _, _, size, _ in self.strata)
+        self.sampled_students = sum(n for _, _, _, n in self.strata)
+
+        self.estimates = 0
+        self.exact_checks = 0
+        self.move_error = 0.0
+        self.checkpoints = 0
+        self.checkpoint_error = 0.0
+        self.max_relative_error = 0.0
+
+    def estimate(self, schedule: CompactSchedule) -> float:
+        """Estimated penalty: sampled gap penalty plus the exact clash count."""
+        gaps = self.instance.penalty(schedule, conflict_penalty=0)
+        return gaps + CONFLICT_PENALTY * self.graph.clashes(schedule.days)
+
+    def standard_error(self, costs: Sequence[float]) -> float:
+        """
+        Standard error of the estimate, from the sampled rows' gap costs (e.g.
+        DeltaEvaluator.costs on self.instance with conflict_penalty=0): the
+        stratified estimator Var = sum_h N_h^2 (1 - n_h / N_h) s_h^2 / n_h.
+        """
+        variance = 0.0
+        for rows, members, size, n in self.strata:
+            if n < 2 or n == size:
+                continue
+            # Per-student cost of each sampled row (costs are count-weighted)
+            values = [costs[r] / self.instance.counts[r] for r in rows]
+            mean = sum(m * v for m, v in zip(members, values)) / n
+            s2 = sum(m * (v - mean) ** 2 for m, v in zip(members, values)) / (n - 1)
+            variance += size * size * (1 - n / size) * s2 / n
+        return math.sqrt(variance)
+
+    def record_move(self, estimate: float, exact: float):
+        """Records an estimated move delta against its exact re-check."""
+        self.exact_checks += 1
+        self.move_error += abs(estimate - exact)
+
+    def record_checkpoint(self, estimate: float, exact: float):
+        """Records an estimated total penalty against the exact penalty."""
+        self.checkpoints += 1
+        error = abs(estimate - exact)
+        self.checkpoint_error += error
+        if exact > 0:
+            self.max_relative_error = max(self.max_relative_error, error / exact)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "sampled_students": self.sampled_students,
+            "total_students": self.total_students,
+            "estimates": self.estimates,
+            "exact_checks": self.exact_checks,
+            "move_error": self.move_error,
+            "checkpoints": self.checkpoints,
+            "checkpoint_error": self.checkpoint_error,
+            "max_relative_error": self.max_relative_error,
+        }
+
+    def merge_stats(self, target: Dict[str, float]):
+        """
+        Adds this sample's counters to `target` (a caller's stats dict); the
+        relative error is merged as a maximum.
+        """
+        for key, value in self.stats().items():
+            if key == "max_relative_error":
+                target[key] = max(target.get(key, 0.0), value)
+            else:
+                target[key] = target.get(key, 0) + value
@@ -1,7 +1,11 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 import math
 
+# Penalty added per same-day clash (hard constraint converted to soft constraint)
+CONFLICT_PENALTY = 1_000_000_000
+
 
 @dataclass(frozen=True)
 class Subject:
@@ -27,11 +31,23 @@ class Student:
 class Schedule:
     assignments: Dict[Subject, int]  # Subject -> Day Index
     num_days: int
+    # Penalty cached by the solver that scored this schedule (default params)
+    penalty: Optional[float] = field(default=None, compare=False, repr=False)
 
     def get_day(self, subject: Subject) -> Optional[int]:
         return self.assignments.get(subject)
 
 
+@lru_cache(maxsize=64)
+def gap_decay_table(a: float, initial_gap: int, num_days: int) -> Tuple[float, ...]:
+    """
+    Lookup table gap -> e^(-a * gap) for every gap possible within num_days.
+    The largest gap is an exam on the last day with no earlier exam:
+    (num_days - 1) + initial_gap. Cached, so all solver calls share one table.
+    """
+    return tuple(math.exp(-a * gap) for gap in range(num_days + initial_gap + 1))
+
+
 def calculate_penalty(
     schedule: Schedule, students: List[Student], initial_gap: int = 3, a: float = 1.0
 ) -> float:
@@ -41,6 +57,7 @@ def calculate_penalty(
     Constraint: Returns large penalty if any student has >1 exam on the same day.
     """
     total_penalty = 0.0
+    decay = gap_decay_table(a, initial_gap, schedule.num_days)
 
     for student in students:
         # Get days for this student's exams
@@ -60,7 +77,7 @@ def calculate_penalty(
                 conflicts += 1
 
         if conflicts > 0:
-            total_penalty += conflicts * 1_000_000_000  # 1 Billion penalty per conflict
+            total_penalty += conflicts * CONFLICT_PENALTY  # 1 Billion penalty per conflict
 
         # Calculate penalty for each exam
         last_day = -initial_gap - 1  # See logic below
@@ -84,9 +101,21 @@ def calculate_penalty(
                 gap = 0
 
             # Penalty formula: 2^t * d^2 * e^(-a * g)
-            term = (2**trials) * (difficulty**2) * math.exp(-a * gap)
+            term = (2**trials) * (difficulty**2) * (
+                decay[gap] if gap < len(decay) else math.exp(-a * gap)
+            )
             total_penalty += term
 
             last_day = day
 
     return total_penalty
+
+
+def schedule_penalty(schedule: Schedule, students: List[Student]) -> float:
+    """
+    calculate_penalty with the default parameters, reusing the penalty a solver
+    already cached on the schedule.
+    """
+    if schedule.penalty is None:
+        schedule.penalty = calculate_penalty(schedule, students)
+    return schedule.penalty
@@ -0,0 +1,352 @@
+import json
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from jobs import FINISHED
+from scheduler import Schedule, Student, Subject
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS config (
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (session_id, key)
+);
+CREATE TABLE IF NOT EXISTS students (
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    student_id INTEGER NOT NULL,
+    enrollments TEXT NOT NULL,
+    PRIMARY KEY (session_id, student_id)
+);
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    created REAL NOT NULL,
+    algo TEXT,
+    penalty REAL,
+    num_days INTEGER NOT NULL,
+    assignments TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS schedules_by_session ON schedules (session_id, id);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    status TEXT NOT NULL,
+    state TEXT NOT NULL,
+    result TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_session ON jobs (session_id, updated);
+CREATE TABLE IF NOT EXISTS job_flags (
+    job_id TEXT PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+    action TEXT NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+class SessionStore:
+    """
+    SQLite store of the web app's exam sessions, one per session (exam period)
+    ID: its config (one row per setting), the parsed students of its last run,
+    its schedules (the newest is the current one) and its solve jobs.
+
+    Every call uses its own connection and transaction, and the database runs
+    in WAL mode, so threads and worker processes can share one file; writers
+    wait up to `timeout` seconds for each other. Config values are anything
+    JSON can hold; settings a session never set fall back to `defaults`.
+
+    A job is stored as its JSON status (see jobs.Job.to_dict), its result once
+    done and the time of its last update; the last `max_jobs` finished jobs of
+    a session are kept. Requests to stop a job (job flags) are left for the
+    process running it, which collects them with pop_job_flags.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        defaults: Optional[Dict[str, Any]] = None,
+        max_schedules: int = 20,
+        max_jobs: int = 50,
+        timeout: float = 30.0,
+    ):
+        self.path = path
+        self.defaults = dict(defaults or {})
+        self.max_schedules = max_schedules
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        with self._transaction() as conn:
+            conn.executescript(SCHEMA)
+        with closing(sqlite3.connect(path, timeout=timeout)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with closing(sqlite3.connect(self.path, timeout=self.timeout)) as conn:
+            conn.execute("PRAGMA foreign_keys=ON")
+            with conn:
+                yield conn
+
+    def _touch(self, conn: sqlite3.Connection, session_id: str):
+        now = time.time()
+        conn.execute(
+            "INSERT INTO sessions (id, created, updated) VALUES (?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET updated = excluded.updated",
+            (session_id, now, now),
+        )
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, created, updated FROM sessions ORDER BY id"
+            ).fetchall()
+        return [{"id": i, "created": c, "updated": u} for i, c, u in rows]
+
+    def get_config(self, session_id: str) -> Dict[str, Any]:
+        """The session's settings on top of the defaults."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT key, value FROM config WHERE session_id = ?", (session_id,)
+            ).fetchall()
+        config = dict(self.defaults)
+        config.update((key, json.loads(value)) for key, value in rows)
+        return config
+
+    def update_config(self, session_id: str, changes: Dict[str, Any]):
+        """Sets the given settings only; the others are left as they are."""
+        with self._transaction() as conn:
+            self._touch(conn, session_id)
+            conn.executemany(
+                "INSERT INTO config (session_id, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id, key) DO UPDATE SET value = excluded.value",
+                [
+                    (session_id, key, json.dumps(value))
+                    for key, value in changes.items()
+                ],
+            )
+
+    def _save_students(
+        self, conn: sqlite3.Connection, session_id: str, students: List[Student]
+    ):
+        rows = [
+            (
+                session_id,
+                student.id,
+                json.dumps(
+                    [
+                        [subj.name, difficulty, student.trials.get(subj, 0)]
+                        for subj, difficulty in student.subjects.items()
+                    ]
+                ),
+            )
+            for student in students
+        ]
+        conn.execute("DELETE FROM students WHERE session_id = ?", (session_id,))
+        conn.executemany(
+            "INSERT INTO students (session_id, student_id, enrollments) "
+            "VALUES (?, ?, ?)",
+            rows,
+        )
+
+    def _save_schedule(
+        self,
+        conn: sqlite3.Connection,
+        session_id: str,
+        schedule: Schedule,
+        algo: Optional[str],
+        penalty: Optional[float],
+    ):
+        assignments = {subj.name: day for subj, day in schedule.assignments.items()}
+        conn.execute(
+            "INSERT INTO schedules "
+            "(session_id, created, algo, penalty, num_days, assignments) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                session_id,
+                time.time(),
+                algo,
+                penalty,
+                schedule.num_days,
+                json.dumps(assignments),
+            ),
+        )
+        conn.execute(
+            "DELETE FROM schedules WHERE session_id = ? AND id NOT IN "
+            "(SELECT id FROM schedules WHERE session_id = ? "
+            "ORDER BY id DESC LIMIT ?)",
+            (session_id, session_id, self.max_schedules),
+        )
+
+    def save_students(self, session_id: str, students: List[Student]):
+        """Replaces the session's parsed students."""
+        with self._transaction() as conn:
+            self._touch(conn, session_id)
+            self._save_students(conn, session_id, students)
+
+    def save_schedule(
+        self,
+        session_id: str,
+        schedule: Schedule,
+        algo: Optional[str] = None,
+        penalty: Optional[float] = None,
+    ):
+        """Adds the session's new current schedule; keeps the last max_schedules."""
+        with self._transaction() as conn:
+            self._touch(conn, session_id)
+            self._save_schedule(conn, session_id, schedule, algo, penalty)
+
+    def save_run(
+        self,
+        session_id: str,
+        students: List[Student],
+        schedule: Schedule,
+        algo: Optional[str] = None,
+        penalty: Optional[float] = None,
+    ):
+        """save_students and save_schedule in one transaction."""
+        with self._transaction() as conn:
+            self._touch(conn, session_id)
+            self._save_students(conn, session_id, students)
+            self._save_schedule(conn, session_id, schedule, algo, penalty)
+
+    def load_students(self, session_id: str) -> List[Student]:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT student_id, enrollments FROM students WHERE session_id = ? "
+                "ORDER BY student_id",
+                (session_id,),
+            ).fetchall()
+        students = []
+        for student_id, enrollments in rows:
+            student = Student(id=student_id)
+            for name, difficulty, trials in json.loads(enrollments):
+                student.add_subject(Subject(name), difficulty, trials)
+            students.append(student)
+        return students
+
+    def latest_schedule(self, session_id: str) -> Optional[Schedule]:
+        """The session's current schedule, with its penalty, or None."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT num_days, assignments, penalty FROM schedules "
+                "WHERE session_id = ? ORDER BY id DESC LIMIT 1",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        num_days, assignments, penalty = row
+        return Schedule(
+            {Subject(name): day for name, day in json.loads(assignments).items()},
+            num_days,
+            penalty=penalty,
+        )
+
+    def create_job(self, session_id: str, state: Dict[str, Any]):
+        """Records a new job of the session; state as returned by Job.to_dict."""
+        with self._transaction() as conn:
+            self._touch(conn, session_id)
+            conn.execute(
+                "INSERT INTO jobs (id, session_id, status, state, updated) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (id) DO NOTHING",
+                (
+                    state["id"],
+                    session_id,
+                    state["status"],
+                    json.dumps(state),
+                    time.time(),
+                ),
+            )
+
+    def update_job(self, state: Dict[str, Any], result: Any = None) -> bool:
+        """
+        Replaces a job's state and result. Returns False for unknown jobs (not
+        created yet, or deleted with their session).
+        """
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, state = ?, result = ?, updated = ? "
+                "WHERE id = ?",
+                (
+                    state["status"],
+                    json.dumps(state),
+                    json.dumps(result) if result is not None else None,
+                    time.time(),
+                    state["id"],
+                ),
+            )
+            if updated.rowcount == 0:
+                return False
+            if state["status"] in FINISHED:
+                (session_id,) = conn.execute(
+                    "SELECT session_id FROM jobs WHERE id = ?", (state["id"],)
+                ).fetchone()
+                marks = ", ".join("?" * len(FINISHED))
+                conn.execute(
+                    f"DELETE FROM jobs WHERE session_id = ? AND status IN ({marks}) "
+                    "AND id NOT IN (SELECT id FROM jobs WHERE session_id = ? "
+                    f"AND status IN ({marks}) ORDER BY updated DESC LIMIT ?)",
+                    (session_id, *FINISHED, session_id, *FINISHED, self.max_jobs),
+                )
+            return True
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A job's stored state plus its "session", its "result" (once done) and
+        the time it was "updated"; None for unknown jobs.
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT session_id, state, result, updated FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        session_id, state, result, updated = row
+        job = json.loads(state)
+        job["session"] = session_id
+        job["updated"] = updated
+        if result is not None:
+            job["result"] = json.loads(result)
+        return job
+
+    def flag_job(self, job_id: str, action: str, statuses: Sequence[str]) -> bool:
+        """
+        Leaves `action` (e.g. "cancel") for the process running a job whose
+        stored status is one of `statuses`; a pending "cancel" is never
+        replaced. Returns False if nothing was flagged.
+        """
+        marks = ", ".join("?" * len(statuses))
+        with self._transaction() as conn:
+            flagged = conn.execute(
+                "INSERT INTO job_flags (job_id, action, created) "
+                f"SELECT id, ?, ? FROM jobs WHERE id = ? AND status IN ({marks}) "
+                "ON CONFLICT (job_id) DO UPDATE SET action = excluded.action, "
+                "created = excluded.created WHERE job_flags.action != 'cancel'",
+                (action, time.time(), job_id, *statuses),
+            )
+            return flagged.rowcount > 0
+
+    def pop_job_flags(self, job_ids: Sequence[str]) -> Dict[str, str]:
+        """Removes and returns the pending flags of the given jobs (ID -> action)."""
+        if not job_ids:
+            return {}
+        marks = ", ".join("?" * len(job_ids))
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"DELETE FROM job_flags WHERE job_id IN ({marks}) "
+                "RETURNING job_id, action",
+                tuple(job_ids),
+            ).fetchall()
+        return dict(rows)
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            return deleted.rowcount > 0
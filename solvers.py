@@ -1,7 +1,18 @@
 import random
 import math
-from typing import List, Set
-from scheduler import Schedule, Student, Subject, calculate_penalty
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+from scheduler import CONFLICT_PENALTY, Schedule, Student, Subject
+from conflict_graph import ConflictGraph, dsatur_days
+from evaluator import DeltaEvaluator, MoveDeltaMatrix
+from fitness import FitnessEvaluator, SampledEvaluator, make_evaluator
+from instance import CompactSchedule, ProblemInstance
+from neighborhoods import NeighborhoodSet
+from penalty_cache import PenaltyCache
+from repair import ConflictRepair
+from sampling import StratifiedSample
+from telemetry import Telemetry
 
 
 def get_initial_solution(
@@ -18,74 +29,563 @@ def get_initial_solution(
     return Schedule(assignments, num_days)
 
 
-def simulated_annealing(
-    subjects: List[Subject],
-    students: List[Student],
+def get_initial_compact_solution(
+    instance: ProblemInstance, num_days: int, holidays: Set[int]
+) -> CompactSchedule:
+    """Random initial solution on the compact form, respecting holidays."""
+    available_days = [d for d in range(num_days) if d not in holidays]
+    if not available_days:
+        raise ValueError("No available days to schedule exams.")
+
+    days = [random.choice(available_days) for _ in range(instance.num_scheduled)]
+    return CompactSchedule.from_days(days, num_days, instance)
+
+
+def get_dsatur_compact_solution(
+    instance: ProblemInstance,
+    num_days: int,
+    holidays: Set[int],
+    graph: Optional[ConflictGraph] = None,
+) -> CompactSchedule:
+    """Conflict-free (when possible) initial solution by DSatur graph coloring."""
+    if graph is None:
+        graph = ConflictGraph.from_instance(instance)
+    available_days = [d for d in range(num_days) if d not in holidays]
+    return CompactSchedule.from_days(
+        dsatur_days(graph, available_days), num_days, instance
+    )
+
+
+def get_warm_start_compact_solution(
+    instance: ProblemInstance,
+    previous: Schedule,
+    num_days: int,
+    holidays: Set[int],
+) -> CompactSchedule:
+    """
+    Initial solution from a previous schedule. Subjects keep their previous day
+    while it is still available; new subjects and subjects on a day that is now
+    a holiday (or past num_days) get a random available day.
+    """
+    available_days = [d for d in range(num_days) if d not in holidays]
+    if not available_days:
+        raise ValueError("No available days to schedule exams.")
+
+    available = set(available_days)
+    days = []
+    for subj in instance.scheduled_subjects:
+        day = previous.assignments.get(subj)
+        days.append(day if day in available else random.choice(available_days))
+    return CompactSchedule.from_days(days, num_days, instance)
+
+
+def simulated_annealing_compact(
+    instance: ProblemInstance,
     num_days: int,
     holidays: Set[int],
     initial_temp: float = 1000.0,
     cooling_rate: float = 0.995,
     max_iterations: int = 10000,
-) -> Schedule:
-    current_schedule = get_initial_solution(subjects, num_days, holidays)
-    current_cost = calculate_penalty(current_schedule, students)
+    dsatur_init: bool = False,
+    neighborhoods: Optional[Sequence[str]] = None,
+    time_limit: Optional[float] = None,
+    target_penalty: Optional[float] = None,
+    initial_days: Optional[Sequence[int]] = None,
+    repair: Optional[ConflictRepair] = None,
+    stagnation: Optional[int] = None,
+    sample: Optional[StratifiedSample] = None,
+    checkpoint_interval: int = 500,
+    search_stats: Optional[Dict[str, Any]] = None,
+    telemetry: Optional[Telemetry] = None,
+) -> CompactSchedule:
+    """
+    Simulated annealing over the scheduled subjects of a ProblemInstance.
+    neighborhoods: names from neighborhoods.NEIGHBORHOODS (e.g. "swap", "kempe"),
+    selected adaptively; None keeps the single random-move neighborhood.
+    initial_days: days of the scheduled subjects to start from (warm start)
+    instead of a random or DSatur schedule.
+    repair: ConflictRepair for this instance; every move is repaired before it
+    is scored, so moves into a clash become moves to a conflict-free day.
+    Stops early after time_limit seconds, once target_penalty is reached or
+    after `stagnation` iterations without a new best.
+    sample: StratifiedSample of this instance; moves are screened by its
+    estimate (sampled gap penalty plus exact clashes) and only moves it accepts
+    are re-scored exactly and decided by the usual acceptance test on the
+    exact delta, so the current and best costs stay exact. Every
+    checkpoint_interval iterations the sampled total is compared with the
+    exact one and the exact total is resynced.
+    search_stats: optional dict that receives the run's iterations, scored
+    moves ("evaluations"), seconds until the best was first conflict-free
+    ("first_feasible", None if never) and "time".
+    telemetry: progress hook, sampled every telemetry.interval iterations
+    with the acceptance rate and temperature.
+    """
+    start_time = time.time()
+    deadline = start_time + time_limit if time_limit is not None else None
+    if telemetry is not None:
+        telemetry.start("sa")
+    available_days = [d for d in range(num_days) if d not in holidays]
+    graph = None
+    if repair is not None:
+        graph = repair.graph
+    elif dsatur_init or (neighborhoods and "kempe" in neighborhoods):
+        graph = ConflictGraph.from_instance(instance)
 
-    best_schedule = current_schedule
+    if initial_days is not None:
+        initial = CompactSchedule.from_days(initial_days, num_days, instance)
+    elif dsatur_init:
+        initial = get_dsatur_compact_solution(instance, num_days, holidays, graph)
+    else:
+        initial = get_initial_compact_solution(instance, num_days, holidays)
+    # Only the students enrolled in the moved subjects are re-scored per move
+    evaluator = DeltaEvaluator(instance, initial.days, num_days)
+    current_cost = evaluator.total
+    # Moves are scored by `scorer`: the exact evaluator or the sample's
+    scorer = evaluator
+    if sample is not None:
+        scorer = DeltaEvaluator(
+            sample.instance, initial.days, num_days, conflict_penalty=0
+        )
+    if telemetry is not None:
+        evaluator = telemetry.timed(evaluator)
+        scorer = evaluator if sample is None else telemetry.timed(scorer)
+
+    best_days = list(evaluator.days)
     best_cost = current_cost
+    first_feasible = None
+    if best_cost < CONFLICT_PENALTY:
+        first_feasible = time.time() - start_time
 
     temp = initial_temp
-    available_days = [d for d in range(num_days) if d not in holidays]
-
-    for _ in range(max_iterations):
-        # Neighbor: Move one exam to a random day
-        neighbor_assignments = current_schedule.assignments.copy()
-        subject_to_move = random.choice(subjects)
-        new_day = random.choice(available_days)
-        neighbor_assignments[subject_to_move] = new_day
-        neighbor_schedule = Schedule(neighbor_assignments, num_days)
+    stale = 0
+    iteration = 0
+    accepted_moves = 0
+    moves = None
+    if neighborhoods:
+        moves = NeighborhoodSet(
+            neighborhoods, instance.num_scheduled, available_days, graph
+        )
 
-        neighbor_cost = calculate_penalty(neighbor_schedule, students)
+    for iteration in range(1, max_iterations + 1):
+        if moves is None:
+            # Neighbor: Move one exam to a random day
+            subject_id = random.randrange(instance.num_scheduled)
+            changes = {subject_id: random.choice(available_days)}
+        else:
+            move_name, changes = moves.propose(evaluator.days)
+        if repair is not None:
+            changes = repair.repair(evaluator.days, changes)
+        delta = scorer.evaluate_changes(changes)
+        if sample is not None:
+            delta += CONFLICT_PENALTY * sample.graph.clash_delta(
+                evaluator.days, changes
+            )
 
         # Acceptance probability
-        delta = neighbor_cost - current_cost
-        if delta < 0 or random.random() < math.exp(-delta / temp):
-            current_schedule = neighbor_schedule
-            current_cost = neighbor_cost
+        accepted = delta < 0 or random.random() < math.exp(-delta / temp)
+        if moves is not None:
+            moves.record(move_name, delta < 0)
+        stale += 1
+        if sample is not None:
+            sample.estimates += 1
+            if accepted:
+                # The estimate only screens the move; the exact delta decides
+                exact = evaluator.evaluate_changes(changes)
+                sample.record_move(delta, exact)
+                accepted = exact < 0 or random.random() < math.exp(-exact / temp)
+                if accepted:
+                    scorer.commit()
+        if accepted:
+            evaluator.commit()
+            current_cost = evaluator.total
+            accepted_moves += 1
 
             if current_cost < best_cost:
-                best_schedule = current_schedule
+                best_days = list(evaluator.days)
                 best_cost = current_cost
+                stale = 0
+                if first_feasible is None and best_cost < CONFLICT_PENALTY:
+                    first_feasible = time.time() - start_time
+                if target_penalty is not None and best_cost <= target_penalty:
+                    break
 
+        if sample is not None and iteration % checkpoint_interval == 0:
+            estimate = scorer.resync()
+            estimate += CONFLICT_PENALTY * sample.graph.clashes(evaluator.days)
+            sample.record_checkpoint(estimate, evaluator.resync())
+            current_cost = evaluator.total
+        if telemetry is not None and iteration % telemetry.interval == 0:
+            telemetry.sample(
+                iteration,
+                iteration,
+                best_cost,
+                current_cost,
+                accepted_moves,
+                temp,
+                solution=_telemetry_solution(telemetry, instance, best_days),
+            )
+        if stagnation is not None and stale >= stagnation:
+            break
         temp *= cooling_rate
         if temp < 0.001:
             break
+        if deadline is not None and time.time() >= deadline:
+            break
 
-    return best_schedule
+    if search_stats is not None:
+        search_stats.update(
+            iterations=iteration,
+            evaluations=iteration,
+            first_feasible=first_feasible,
+            time=time.time() - start_time,
+        )
+    if telemetry is not None:
+        telemetry.finish(
+            iteration,
+            iteration,
+            best_cost,
+            current_cost,
+            accepted=accepted_moves,
+            temperature=temp,
+            solution=_telemetry_solution(telemetry, instance, best_days),
+        )
+    return CompactSchedule(array("i", best_days), num_days)
 
 
-def genetic_algorithm(
+def _telemetry_solution(
+    telemetry: Telemetry, instance: ProblemInstance, days: Sequence[int]
+) -> Optional[Dict[str, int]]:
+    """Days by subject name for a telemetry record, if it asks for schedules."""
+    if not telemetry.solutions:
+        return None
+    return {subj.name: day for subj, day in zip(instance.scheduled_subjects, days)}
+
+
+def _named_days(telemetry: Telemetry, schedule: Schedule) -> Optional[Dict[str, int]]:
+    """Schedule variant of _telemetry_solution."""
+    if not telemetry.solutions:
+        return None
+    return {subj.name: day for subj, day in schedule.assignments.items()}
+
+
+def _finish_compact(
+    best: CompactSchedule,
+    instance: ProblemInstance,
+    cache: Optional[PenaltyCache] = None,
+) -> Schedule:
+    """Converts a compact result back to a Schedule carrying its exact penalty."""
+    schedule = best.to_schedule(instance)
+    if cache is not None:
+        key = cache.key(schedule)
+        schedule.penalty = cache.lookup(key)
+        if schedule.penalty is None:
+            schedule.penalty = instance.penalty(best)
+            cache.store(key, schedule.penalty)
+    else:
+        schedule.penalty = instance.penalty(best)
+    return schedule
+
+
+def simulated_annealing(
     subjects: List[Subject],
-    students: List[Student],
+    students: Optional[List[Student]],
     num_days: int,
     holidays: Set[int],
-    population_size: int = 50,
-    generations: int = 100,
-    mutation_rate: float = 0.1,
+    initial_temp: float = 1000.0,
+    cooling_rate: float = 0.995,
+    max_iterations: int = 10000,
+    dsatur_init: bool = False,
+    neighborhoods: Optional[Sequence[str]] = None,
+    cache: Optional[PenaltyCache] = None,
+    time_limit: Optional[float] = None,
+    target_penalty: Optional[float] = None,
+    initial: Optional[Schedule] = None,
+    repair: bool = False,
+    repair_stats: Optional[Dict[str, int]] = None,
+    stagnation: Optional[int] = None,
+    fidelity: Optional[float] = None,
+    sampling_stats: Optional[Dict[str, float]] = None,
+    search_stats: Optional[Dict[str, Any]] = None,
+    telemetry: Optional[Telemetry] = None,
+    instance: Optional[ProblemInstance] = None,
 ) -> Schedule:
+    """
+    cache: shared PenaltyCache; the returned schedule's exact penalty is looked
+    up in / stored to it, so the caller's final comparison is a cache hit.
+    Moves themselves are scored by delta evaluation, which is cheaper than
+    hashing the full assignment vector.
+    initial: previous schedule to warm start from (see
+    get_warm_start_compact_solution).
+    repair: run every move through a ConflictRepair; its counters are added to
+    the optional repair_stats dict.
+    fidelity: fraction of students (0-1) moves are scored on, see
+    StratifiedSample; accepted moves are still re-scored exactly. Sampling
+    counters are added to the optional sampling_stats dict.
+    search_stats, telemetry: see simulated_annealing_compact.
+    instance: the problem already compiled from subjects and students (e.g.
+    by carter.load_instance); students is then not read.
+    """
+    if instance is None:
+        instance = ProblemInstance.from_students(subjects, students)
+    repairer = None
+    if repair:
+        available_days = [d for d in range(num_days) if d not in holidays]
+        repairer = ConflictRepair.from_instance(instance, available_days)
+    sample = None
+    if fidelity is not None and fidelity < 1:
+        sample = StratifiedSample(instance, fidelity)
+    initial_days = None
+    if initial is not None:
+        warm = get_warm_start_compact_solution(instance, initial, num_days, holidays)
+        initial_days = warm.days[: instance.num_scheduled]
+    best = simulated_annealing_compact(
+        instance,
+        num_days,
+        holidays,
+        initial_temp=initial_temp,
+        cooling_rate=cooling_rate,
+        max_iterations=max_iterations,
+        dsatur_init=dsatur_init,
+        neighborhoods=neighborhoods,
+        time_limit=time_limit,
+        target_penalty=target_penalty,
+        initial_days=initial_days,
+        repair=repairer,
+        stagnation=stagnation,
+        sample=sample,
+        search_stats=search_stats,
+        telemetry=telemetry,
+    )
+    if repairer is not None and repair_stats is not None:
+        repairer.merge_stats(repair_stats)
+    if sample is not None and sampling_stats is not None:
+        sample.merge_stats(sampling_stats)
+    return _finish_compact(best, instance, cache)
+
+
+def tabu_search_compact(
+    instance: ProblemInstance,
+    num_days: int,
+    holidays: Set[int],
+    max_iterations: int = 1000,
+    time_limit: Optional[float] = None,
+    tenure: int = 10,
+    dsatur_init: bool = False,
+    target_penalty: Optional[float] = None,
+    initial_days: Optional[Sequence[int]] = None,
+    stagnation: Optional[int] = None,
+    search_stats: Optional[Dict[str, Any]] = None,
+    telemetry: Optional[Telemetry] = None,
+) -> CompactSchedule:
+    """
+    Tabu search over single-exam moves.
+
+    A subject x day delta matrix is kept up to date incrementally, so each
+    iteration picks the best non-tabu move by scanning the matrix instead of
+    re-scoring schedules. Returning a subject to a day it just left is tabu for
+    `tenure` (plus a random 0..tenure/2) iterations, unless the move would beat
+    the best penalty found so far (aspiration). Stops after max_iterations or
+    time_limit seconds, whichever comes first, once target_penalty is reached or
+    after `stagnation` iterations without a new best.
+    initial_days: days of the scheduled subjects to start from (warm start).
+    search_stats: see simulated_annealing_compact; every iteration scans
+    (and counts as evaluations) all candidate moves of the delta matrix.
+    telemetry: progress hook, sampled every telemetry.interval iterations;
+    the evaluation time is the time spent updating the delta matrix.
+    """
+    start_time = time.time()
+    if telemetry is not None:
+        telemetry.start("tabu")
     available_days = [d for d in range(num_days) if d not in holidays]
+    if initial_days is not None:
+        initial = CompactSchedule.from_days(initial_days, num_days, instance)
+    elif dsatur_init:
+        initial = get_dsatur_compact_solution(instance, num_days, holidays)
+    else:
+        initial = get_initial_compact_solution(instance, num_days, holidays)
+    evaluator = DeltaEvaluator(instance, initial.days, num_days)
+    matrix = MoveDeltaMatrix(evaluator, available_days)
+    deltas = matrix.delta
+    if telemetry is not None:
+        matrix = telemetry.timed(matrix)
+    moves_per_iteration = instance.num_scheduled * max(len(available_days) - 1, 0)
 
-    # Initialize population
-    population = [
-        get_initial_solution(subjects, num_days, holidays)
-        for _ in range(population_size)
-    ]
+    best_days = list(evaluator.days)
+    best_cost = evaluator.total
+    # tabu_until[i][d]: first iteration at which subject i may move back to day d
+    tabu_until = [[0] * num_days for _ in range(instance.num_scheduled)]
+    deadline = start_time + time_limit if time_limit is not None else None
+    stale = 0
+    first_feasible = None
+    if best_cost < CONFLICT_PENALTY:
+        first_feasible = time.time() - start_time
+
+    iterations = 0
+    for iteration in range(max_iterations):
+        iterations += 1
+        current_cost = evaluator.total
+        best_delta = None
+        candidates = []
+        for i in range(instance.num_scheduled):
+            row = deltas[i]
+            current_day = evaluator.days[i]
+            for d in available_days:
+                if d == current_day:
+                    continue
+                delta = row[d]
+                if tabu_until[i][d] > iteration and current_cost + delta >= best_cost:
+                    continue
+                if best_delta is None or delta < best_delta:
+                    best_delta = delta
+                    candidates = [(i, d)]
+                elif delta == best_delta:
+                    candidates.append((i, d))
 
-    for _ in range(generations):
+        if not candidates:
+            break
+
+        subject_id, new_day = random.choice(candidates)
+        old_day = evaluator.days[subject_id]
+        matrix.apply(subject_id, new_day)
+        tabu_until[subject_id][old_day] = (
+            iteration + tenure + random.randint(0, tenure // 2) + 1
+        )
+
+        if evaluator.total < best_cost:
+            best_days = list(evaluator.days)
+            best_cost = evaluator.total
+            stale = 0
+            if first_feasible is None and best_cost < CONFLICT_PENALTY:
+                first_feasible = time.time() - start_time
+            if target_penalty is not None and best_cost <= target_penalty:
+                break
+        else:
+            stale += 1
+            if stagnation is not None and stale >= stagnation:
+                break
+
+        if telemetry is not None and iterations % telemetry.interval == 0:
+            telemetry.sample(
+                iterations,
+                iterations * moves_per_iteration,
+                best_cost,
+                evaluator.total,
+                solution=_telemetry_solution(telemetry, instance, best_days),
+            )
+        if deadline is not None and time.time() >= deadline:
+            break
+
+    if search_stats is not None:
+        search_stats.update(
+            iterations=iterations,
+            evaluations=iterations * moves_per_iteration,
+            first_feasible=first_feasible,
+            time=time.time() - start_time,
+        )
+    if telemetry is not None:
+        telemetry.finish(
+            iterations,
+            iterations * moves_per_iteration,
+            best_cost,
+            evaluator.total,
+            solution=_telemetry_solution(telemetry, instance, best_days),
+        )
+    return CompactSchedule(array("i", best_days), num_days)
+
+
+def tabu_search(
+    subjects: List[Subject],
+    students: Optional[List[Student]],
+    num_days: int,
+    holidays: Set[int],
+    max_iterations: int = 1000,
+    time_limit: Optional[float] = None,
+    tenure: int = 10,
+    dsatur_init: bool = False,
+    cache: Optional[PenaltyCache] = None,
+    target_penalty: Optional[float] = None,
+    initial: Optional[Schedule] = None,
+    stagnation: Optional[int] = None,
+    search_stats: Optional[Dict[str, Any]] = None,
+    telemetry: Optional[Telemetry] = None,
+    instance: Optional[ProblemInstance] = None,
+) -> Schedule:
+    """Schedule wrapper of tabu_search_compact; instance: see simulated_annealing."""
+    if instance is None:
+        instance = ProblemInstance.from_students(subjects, students)
+    initial_days = None
+    if initial is not None:
+        warm = get_warm_start_compact_solution(instance, initial, num_days, holidays)
+        initial_days = warm.days[: instance.num_scheduled]
+    best = tabu_search_compact(
+        instance,
+        num_days,
+        holidays,
+        max_iterations=max_iterations,
+        time_limit=time_limit,
+        tenure=tenure,
+        dsatur_init=dsatur_init,
+        target_penalty=target_penalty,
+        initial_days=initial_days,
+        stagnation=stagnation,
+        search_stats=search_stats,
+        telemetry=telemetry,
+    )
+    return _finish_compact(best, instance, cache)
+
+
+def evolve_population(
+    population: List[Schedule],
+    subjects: List[Subject],
+    num_days: int,
+    holidays: Set[int],
+    generations: int,
+    mutation_rate: float,
+    evaluator: FitnessEvaluator,
+    deadline: Optional[float] = None,
+    target_penalty: Optional[float] = None,
+    repair: Optional[ConflictRepair] = None,
+    stagnation: Optional[int] = None,
+    on_generation: Optional[
+        Callable[[int, List[Schedule], List[float]], None]
+    ] = None,
+    reached_target: Optional[Callable[[List[Schedule], List[float]], bool]] = None,
+) -> List[Schedule]:
+    """
+    Runs up to `generations` GA generations (fitness-proportional selection,
+    segment crossover, single-exam mutation) and returns the last population.
+    With a ConflictRepair every child is repaired after mutation.
+    Stops early at the `deadline` timestamp, once target_penalty is reached or
+    after `stagnation` generations without a new best.
+    on_generation(generation, population, penalties) is called after every
+    population is scored. reached_target(population, penalties) replaces the
+    target_penalty check when the penalties are only estimates.
+    """
+    available_days = [d for d in range(num_days) if d not in holidays]
+    best_penalty = None
+    stale = 0
+    for generation in range(generations):
         # Calculate fitness (minimize penalty)
         # Use 1 / (1 + penalty) as fitness score, avoiding division by zero
         scores = []
-        for ind in population:
-            penalty = calculate_penalty(ind, students)
+        penalties = evaluator.evaluate(population)
+        if on_generation is not None:
+            on_generation(generation, population, penalties)
+        if reached_target is not None:
+            if reached_target(population, penalties):
+                break
+        elif target_penalty is not None and min(penalties) <= target_penalty:
+            break
+        if deadline is not None and time.time() >= deadline:
+            break
+        if best_penalty is None or min(penalties) < best_penalty:
+            best_penalty = min(penalties)
+            stale = 0
+        else:
+            stale += 1
+            if stagnation is not None and stale >= stagnation:
+                break
+        for penalty in penalties:
             # Handle infinite penalty (hard constraints)
             if penalty == float("inf"):
                 scores.append(0.0)
@@ -102,7 +602,7 @@ def genetic_algorithm(
 
         # Selection (Tournament)
         new_population = []
-        for _ in range(population_size):
+        for _ in range(len(population)):
             # Select 2 parents
             parents = random.choices(
                 population, weights=scores if total_score > 0 else None, k=2
@@ -126,10 +626,228 @@ def genetic_algorithm(
                 subj_mut = random.choice(subjects)
                 child_assignments[subj_mut] = random.choice(available_days)
 
+            if repair is not None:
+                repair.repair_assignments(child_assignments)
+
             new_population.append(Schedule(child_assignments, num_days))
 
         population = new_population
 
-    # Return best
-    best_ind = min(population, key=lambda s: calculate_penalty(s, students))
+    return population
+
+
+def genetic_algorithm(
+    subjects: List[Subject],
+    students: Optional[List[Student]],
+    num_days: int,
+    holidays: Set[int],
+    population_size: int = 50,
+    generations: int = 100,
+    mutation_rate: float = 0.1,
+    vectorized: bool = False,
+    dsatur_init: bool = False,
+    evaluator: Optional[FitnessEvaluator] = None,
+    cache: Optional[PenaltyCache] = None,
+    time_limit: Optional[float] = None,
+    target_penalty: Optional[float] = None,
+    initial: Optional[Schedule] = None,
+    repair: bool = False,
+    repair_stats: Optional[Dict[str, int]] = None,
+    stagnation: Optional[int] = None,
+    fidelity: Optional[float] = None,
+    sampling_stats: Optional[Dict[str, float]] = None,
+    checkpoint_interval: int = 10,
+    exact_candidates: int = 3,
+    search_stats: Optional[Dict[str, Any]] = None,
+    telemetry: Optional[Telemetry] = None,
+    instance: Optional[ProblemInstance] = None,
+) -> Schedule:
+    """
+    evaluator: pluggable population scorer (serial, batched NumPy or process
+    pool). Defaults to a BatchEvaluator when vectorized=True and numpy is
+    installed, else a SerialEvaluator. Penalties are cached on the individuals,
+    so the returned schedule carries its penalty in Schedule.penalty.
+    cache: PenaltyCache used by the default evaluator, so duplicate children
+    are not scored twice.
+    Stops early after time_limit seconds, once target_penalty is reached or
+    after `stagnation` generations without a new best.
+    initial: previous schedule to warm start from. The population is seeded
+    with it and with copies where each exam is moved with mutation_rate.
+    repair: run every child through a ConflictRepair; its counters are added to
+    the optional repair_stats dict.
+    fidelity: fraction of students (0-1) the population is scored on, see
+    SampledEvaluator. Every checkpoint_interval generations and at the end,
+    the exact_candidates best estimates are re-scored exactly (with
+    `evaluator`, or the default one) and the best exact schedule is returned;
+    target_penalty is only met by such an exact penalty.
+    Sampling counters are added to the optional sampling_stats dict.
+    search_stats: optional dict that receives the generations run, scored
+    individuals ("evaluations"), seconds until the population first held a
+    conflict-free schedule ("first_feasible", None if never) and "time".
+    telemetry: progress hook, sampled every telemetry.interval generations
+    with the best penalty so far and the best of the current generation. With
+    fidelity the best is the best exact checkpoint (no samples before the
+    first one) and the current value is an estimate.
+    instance: see simulated_annealing.
+    """
+    start_time = time.time()
+    deadline = start_time + time_limit if time_limit is not None else None
+    if telemetry is not None:
+        telemetry.start("ga")
+    available_days = [d for d in range(num_days) if d not in holidays]
+    if instance is None:
+        instance = ProblemInstance.from_students(subjects, students)
+
+    # Initialize population
+    if initial is not None:
+        warm = get_warm_start_compact_solution(
+            instance, initial, num_days, holidays
+        ).to_schedule(instance)
+        population = [warm]
+        for _ in range(population_size - 1):
+            assignments = warm.assignments.copy()
+            for subj in subjects:
+                if random.random() < mutation_rate:
+                    assignments[subj] = random.choice(available_days)
+            population.append(Schedule(assignments, num_days))
+    elif dsatur_init:
+        # Conflict-free starts; randomized tie-breaking keeps them diverse
+        graph = ConflictGraph.from_instance(instance)
+        population = []
+        for _ in range(population_size):
+            start = get_dsatur_compact_solution(instance, num_days, holidays, graph)
+            population.append(start.to_schedule(instance))
+    else:
+        population = [
+            get_initial_solution(subjects, num_days, holidays)
+            for _ in range(population_size)
+        ]
+
+    if evaluator is None:
+        evaluator = make_evaluator(subjects, students, vectorized, cache, instance)
+
+    search = evaluator
+    sample = None
+    best_exact: Optional[Schedule] = None
+    if fidelity is not None and fidelity < 1:
+        search = SampledEvaluator(subjects, students, fidelity, instance)
+        sample = search.sample
+
+        def check_exact(candidates: List[Schedule], estimates: List[float]):
+            nonlocal best_exact
+            order = sorted(range(len(candidates)), key=estimates.__getitem__)
+            top = order[:exact_candidates]
+            exact = evaluator.evaluate([candidates[k] for k in top])
+            for k, penalty in zip(top, exact):
+                sample.record_checkpoint(estimates[k], penalty)
+                if best_exact is None or penalty < best_exact.penalty:
+                    best_exact = candidates[k]
+
+    reached_target = None
+    if sample is not None and target_penalty is not None:
+
+        def reached_target(candidates: List[Schedule], estimates: List[float]):
+            # Estimates can undershoot: only an exact penalty meets the target
+            if min(estimates) <= target_penalty:
+                check_exact(candidates, estimates)
+            return best_exact is not None and best_exact.penalty <= target_penalty
+
+    if telemetry is not None:
+        timed = telemetry.timed(evaluator)
+        search = timed if search is evaluator else telemetry.timed(search)
+        evaluator = timed
+
+    generations_run = 0
+    first_feasible = None
+    best_seen = None
+    best_seen_schedule: Optional[Schedule] = None
+
+    def on_generation(generation, candidates, penalties):
+        nonlocal generations_run, first_feasible, best_seen, best_seen_schedule
+        generations_run += 1
+        current = min(penalties)
+        if first_feasible is None and current < CONFLICT_PENALTY:
+            first_feasible = time.time() - start_time
+        if sample is not None and (generation + 1) % checkpoint_interval == 0:
+            check_exact(candidates, penalties)
+        if telemetry is not None:
+            if sample is not None:
+                # Only exactly re-scored candidates are reported as the best
+                best_seen_schedule = best_exact
+                best_seen = best_exact.penalty if best_exact is not None else None
+            elif best_seen is None or current < best_seen:
+                best_seen = current
+                best_seen_schedule = candidates[penalties.index(current)]
+            if best_seen is not None and generations_run % telemetry.interval == 0:
+                telemetry.sample(
+                    generations_run,
+                    generations_run * len(candidates),
+                    best_seen,
+                    current,
+                    solution=_named_days(telemetry, best_seen_schedule),
+                )
+
+    repairer = None
+    if repair:
+        repairer = ConflictRepair.from_instance(instance, available_days)
+
+    population = evolve_population(
+        population,
+        subjects,
+        num_days,
+        holidays,
+        generations,
+        mutation_rate,
+        search,
+        deadline=deadline,
+        target_penalty=target_penalty,
+        repair=repairer,
+        stagnation=stagnation,
+        on_generation=on_generation,
+        reached_target=reached_target,
+    )
+    if repairer is not None and repair_stats is not None:
+        repairer.merge_stats(repair_stats)
+
+    if sample is not None:
+        # The estimates only rank candidates; the result is picked exactly
+        check_exact(population, search.evaluate(population))
+        if sampling_stats is not None:
+            sample.merge_stats(sampling_stats)
+        best_ind = best_exact
+    else:
+        # Return best
+        penalties = evaluator.evaluate(population)
+        best_ind = population[penalties.index(min(penalties))]
+
+    evaluations = (generations_run + 1) * len(population)
+    if search_stats is not None:
+        search_stats.update(
+            iterations=generations_run,
+            evaluations=evaluations,
+            first_feasible=first_feasible,
+            time=time.time() - start_time,
+        )
+    if telemetry is not None:
+        telemetry.finish(
+            generations_run,
+            evaluations,
+            best_ind.penalty,
+            solution=_named_days(telemetry, best_ind),
+        )
     return best_ind
+
+
+# Solver name -> function(subjects, students, num_days, holidays, **kwargs)
+SOLVERS = {
+    "sa": simulated_annealing,
+    "ga": genetic_algorithm,
+    "tabu": tabu_search,
+}
+
+# Display names of the SOLVERS, for the CLI and web reports
+SOLVER_NAMES = {
+    "sa": "Simulated Annealing",
+    "ga": "Genetic Algorithm",
+    "tabu": "Tabu Search",
+}
@@ -1,8 +1,15 @@
 let holidays = new Set();
 let examOverlay = {}; // day -> subject string
+// Exam session (e.g. one per department), from ?session= in the page URL
+const sessionId = new URLSearchParams(window.location.search).get('session') || 'default';
+
+function withSession(url) {
+    return `${url}?session=${encodeURIComponent(sessionId)}`;
+}
 
 document.addEventListener('DOMContentLoaded', () => {
     renderCalendar();
+    document.getElementById('exportLink').href = withSession('/export/word');
 
     // Listeners for auto-save config
     document.getElementById('numDays').addEventListener('change', renderCalendar);
@@ -79,7 +86,7 @@ async function updateConfig() {
         start_date: document.getElementById('startDate').value
     };
 
-    await fetch('/api/config', {
+    await fetch(withSession('/api/config'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(data)
@@ -90,7 +97,7 @@ async function createForm() {
     await updateConfig();
     const title = document.getElementById('formTitle').value;
 
-    const res = await fetch('/api/create_form', {
+    const res = await fetch(withSession('/api/create_form'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ title })
@@ -108,31 +115,101 @@ async function createForm() {
     }
 }
 
-async function runSchedule() {
+let currentJob = null;
+
+async function runSchedule(force = false) {
     await updateConfig();
-    document.querySelector('#status-bar').innerText = "Running Scheduler...";
+    document.querySelector('#status-bar').innerText = "Queueing Scheduler...";
 
-    const res = await fetch('/api/run_schedule', {
+    const res = await fetch(withSession('/api/run_schedule'), {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' }
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ force })
     });
 
     const json = await res.json();
-    if (json.status === 'success') {
-        document.querySelector('#status-bar').innerText = "Done!";
-        document.getElementById('result-area').classList.remove('hidden');
-        document.getElementById('algoName').innerText = json.algo;
-        document.getElementById('penaltyVal').innerText = json.penalty.toFixed(2);
-
-        // Map Results
-        examOverlay = {};
-        json.schedule.forEach(item => {
-            if (!examOverlay[item.day]) examOverlay[item.day] = "";
-            examOverlay[item.day] += item.subject + "\n";
-        });
-        renderCalendar();
-    } else {
+    if (json.status !== 'queued') {
         document.querySelector('#status-bar').innerText = "Error!";
         alert('Error: ' + json.message);
+        return;
+    }
+    currentJob = json.job_id;
+    streamJob(json.job_id);
+}
+
+function streamJob(jobId) {
+    const statusBar = document.querySelector('#status-bar');
+    const source = new EventSource(`/api/jobs/${jobId}/events`);
+    let shownPenalty = null;
+
+    source.onmessage = (event) => {
+        const job = JSON.parse(event.data);
+        if (job.status === 'queued') {
+            statusBar.innerText = `Queued (position ${job.queue_position + 1})...`;
+        } else if (job.status === 'running') {
+            if (job.stage === 'fetching') {
+                statusBar.innerText = "Fetching responses...";
+            } else {
+                statusBar.innerText = `Running Scheduler... ${Math.round(job.elapsed)}s`
+                    + progressSummary(job.progress.solvers);
+            }
+            const best = job.progress.best;
+            if (best && best.penalty !== shownPenalty) {
+                // Live view of the best schedule so far
+                shownPenalty = best.penalty;
+                showResult(best, true);
+                document.getElementById('acceptBtn').classList.remove('hidden');
+            }
+        } else {
+            source.close();
+            currentJob = null;
+            document.getElementById('acceptBtn').classList.add('hidden');
+            if (job.status === 'done') {
+                showResult(job.result, false);
+            } else if (job.status === 'cancelled') {
+                statusBar.innerText = "Cancelled.";
+            } else {
+                statusBar.innerText = "Error!";
+                alert('Error: ' + job.error);
+            }
+        }
+    };
+    source.onerror = () => {
+        // The browser reconnects on its own; stop once the job is gone
+        if (currentJob !== jobId) source.close();
+    };
+}
+
+function progressSummary(solvers) {
+    if (!solvers) return "";
+    return " | " + Object.values(solvers)
+        .map(s => `${s.solver.toUpperCase()} it ${s.iteration}: ${s.best.toFixed(2)}`)
+        .join(", ");
+}
+
+async function acceptSchedule() {
+    if (!currentJob) return;
+    await fetch(`/api/jobs/${currentJob}/accept`, { method: 'POST' });
+}
+
+async function cancelSchedule() {
+    if (!currentJob) return;
+    await fetch(`/api/jobs/${currentJob}/cancel`, { method: 'POST' });
+}
+
+function showResult(result, live) {
+    if (!live) {
+        document.querySelector('#status-bar').innerText = result.cached ? "Done! (cached result)" : "Done!";
     }
+    document.getElementById('result-area').classList.remove('hidden');
+    document.getElementById('algoName').innerText = live ? `${result.algo} (so far)` : result.algo;
+    document.getElementById('penaltyVal').innerText = result.penalty.toFixed(2);
+
+    // Map Results
+    examOverlay = {};
+    result.schedule.forEach(item => {
+        if (!examOverlay[item.day]) examOverlay[item.day] = "";
+        examOverlay[item.day] += item.subject + "\n";
+    });
+    renderCalendar();
 }
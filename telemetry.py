@@ -0,0 +1,125 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Telemetry:
+    """
+    Progress and profiling hook for the solvers.
+
+    A solver given a Telemetry calls start() once, sample() every `interval`
+    iterations (generations for the GA) and finish() at the end. Each call
+    becomes one record: iteration, elapsed seconds, iterations/sec, scored
+    candidates ("evaluations"), acceptance rate, temperature, best and current
+    cost, and the time spent scoring candidates ("eval_time") versus
+    everything else ("other_time"). Records are appended to `trace` and passed
+    to `callback` as they are made. Evaluation time is measured by wrapping the
+    solver's evaluators with timed(), so a solver run without a Telemetry pays
+    nothing for it. With solutions=True the records also carry the best
+    schedule so far as {subject name: day} ("schedule").
+    """
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        interval: int = 100,
+        keep: bool = True,
+        solutions: bool = False,
+    ):
+        if interval < 1:
+            raise ValueError("Telemetry interval must be at least 1.")
+        self.callback = callback
+        self.interval = interval
+        self.keep = keep
+        self.solutions = solutions
+        self.trace: List[Dict[str, Any]] = []
+        self.solver: Optional[str] = None
+        self.start_time = 0.0
+        self.eval_time = 0.0
+
+    def start(self, solver: str):
+        self.solver = solver
+        self.start_time = time.perf_counter()
+        self.eval_time = 0.0
+
+    def timed(self, evaluator: Any) -> Any:
+        """Wraps an evaluator so its scoring calls add to eval_time."""
+        return _TimedEvaluator(evaluator, self)
+
+    def sample(
+        self,
+        iteration: int,
+        evaluations: int,
+        best: float,
+        current: float,
+        accepted: Optional[int] = None,
+        temperature: Optional[float] = None,
+        final: bool = False,
+        solution: Optional[Dict[str, int]] = None,
+    ):
+        elapsed = time.perf_counter() - self.start_time
+        eval_time = self.eval_time
+        record = {
+            "solver": self.solver,
+            "iteration": iteration,
+            "elapsed": elapsed,
+            "iterations_per_sec": iteration / elapsed if elapsed > 0 else None,
+            "evaluations": evaluations,
+            "acceptance_rate": (
+                accepted / iteration if accepted is not None and iteration else None
+            ),
+            "temperature": temperature,
+            "best": best,
+            "current": current,
+            "eval_time": eval_time,
+            "other_time": max(elapsed - eval_time, 0.0),
+            "final": final,
+        }
+        if solution is not None:
+            record["schedule"] = solution
+        if self.keep:
+            self.trace.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def finish(
+        self,
+        iteration: int,
+        evaluations: int,
+        best: float,
+        current: Optional[float] = None,
+        **kwargs,
+    ):
+        """Final record; current defaults to the best cost."""
+        if current is None:
+            current = best
+        self.sample(iteration, evaluations, best, current, final=True, **kwargs)
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.trace, f, indent=2)
+
+
+class _TimedEvaluator:
+    """Proxy that times the scoring methods of a solver's evaluator."""
+
+    TIMED = ("evaluate", "evaluate_changes", "evaluate_move", "apply")
+
+    def __init__(self, inner: Any, telemetry: Telemetry):
+        self._inner = inner
+        self._telemetry = telemetry
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._inner, name)
+        if name not in self.TIMED:
+            return value
+        telemetry = self._telemetry
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return value(*args, **kwargs)
+            finally:
+                telemetry.eval_time += time.perf_counter() - start
+
+        return timed
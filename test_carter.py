@@ -0,0 +1,76 @@
+import math
+import os
+
+from carter import (
+    dataset_paths,
+    dataset_periods,
+    iter_students,
+    load_dataset,
+    load_instance,
+    read_courses,
+)
+from instance import CompactSchedule
+from scheduler import Schedule, calculate_penalty
+
+
+def _write(tmp_path, name: str, text: str) -> str:
+    path = os.path.join(tmp_path, name)
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+
+def _dataset(tmp_path) -> str:
+    # Course ids are zero-padded in the .crs files but not always in .stu
+    _write(tmp_path, "toy.crs", "0001 3\n0002 2\n\n0010 2\n0011 0\n")
+    _write(tmp_path, "toy.stu", "1 2\n0001 10\n\n1 2\n10 1 2\n2\n")
+    return os.path.join(tmp_path, "toy")
+
+
+def test_dataset_paths_and_periods():
+    assert dataset_paths("data/car91") == ("data/car91.crs", "data/car91.stu")
+    assert dataset_paths("data/car91.stu") == ("data/car91.crs", "data/car91.stu")
+    assert dataset_paths("data/car91.CRS") == ("data/car91.crs", "data/car91.stu")
+    assert dataset_paths("data/v1.2") == ("data/v1.2.crs", "data/v1.2.stu")
+    assert dataset_periods("data/CAR91.stu") == 35
+    assert dataset_periods("data/toy") is None
+
+
+def test_read_courses_and_iter_students(tmp_path):
+    import pytest
+
+    base = _dataset(tmp_path)
+    subjects = read_courses(base + ".crs")
+    assert [subj.name for subj in subjects] == ["0001", "0002", "0010", "0011"]
+
+    students = list(iter_students(base + ".stu", subjects, difficulty=7, trials=1))
+    assert [s.id for s in students] == [0, 1, 2, 3, 4]
+    assert [sorted(subj.name for subj in s.subjects) for s in students[:2]] == [
+        ["0001", "0002"],
+        ["0001", "0010"],
+    ]
+    assert all(d == 7 for s in students for d in s.subjects.values())
+    assert all(t == 1 for s in students for t in s.trials.values())
+
+    bad_crs = _write(tmp_path, "bad.crs", "0001 3\n0002\n")
+    with pytest.raises(ValueError, match="bad.crs:2"):
+        read_courses(bad_crs)
+    bad_stu = _write(tmp_path, "bad.stu", "1 2\n1 99\n")
+    with pytest.raises(ValueError, match="bad.stu:2: unknown course 99"):
+        list(iter_students(bad_stu, subjects))
+
+
+def test_load_instance_matches_load_dataset(tmp_path):
+    base = _dataset(tmp_path)
+    subjects, students = load_dataset(base + ".crs")
+    instance = load_instance(base)
+    # Repeated profiles are grouped, but every student is still counted
+    assert instance.scheduled_subjects == subjects
+    assert instance.total_students == len(students) == 5
+    assert instance.num_students == 4
+
+    for days in ([0, 1, 2, 0], [0, 0, 3, 0]):
+        schedule = Schedule(dict(zip(subjects, days)), 4)
+        compact = CompactSchedule.from_schedule(schedule, instance)
+        expected = calculate_penalty(schedule, students)
+        assert math.isclose(instance.penalty(compact), expected)
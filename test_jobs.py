@@ -0,0 +1,92 @@
+import threading
+import time
+
+from jobs import CANCELLED, DONE, FINISHED, QUEUED, RUNNING, Job, JobQueue, JobQueueFull
+
+
+def _blocking(job: Job, release: threading.Event, ran: list):
+    # Runs until released or asked to stop; a stopped job returns its best so far
+    ran.append(job.id)
+    while not release.is_set() and not job.stopping:
+        time.sleep(0.01)
+    return "best so far" if job.early or not job.stopping else None
+
+
+def _wait(job: Job, statuses, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while job.status not in statuses:
+        assert time.time() < deadline, f"job stuck in {job.status}"
+        time.sleep(0.01)
+
+
+def test_submit_raises_when_max_queued_jobs_wait():
+    import pytest
+
+    queue = JobQueue(workers=1, max_queued=2)
+    release, ran = threading.Event(), []
+    running = queue.submit(_blocking, release, ran)
+    _wait(running, (RUNNING,))
+    waiting = [queue.submit(_blocking, release, ran) for _ in range(2)]
+    assert [queue.position(job) for job in waiting] == [0, 1]
+    assert queue.position(running) is None
+    with pytest.raises(JobQueueFull):
+        queue.submit(_blocking, release, ran)
+
+    release.set()
+    for job in [running] + waiting:
+        _wait(job, FINISHED)
+        assert job.status == DONE
+    assert queue.counts()[DONE] == 3
+
+
+def test_cancel_queued_and_running_jobs():
+    queue = JobQueue(workers=1, max_queued=5)
+    release, ran = threading.Event(), []
+    running = queue.submit(_blocking, release, ran)
+    _wait(running, (RUNNING,))
+    queued = queue.submit(_blocking, release, ran)
+
+    # A queued job is finished on the spot and never runs
+    assert queue.cancel(queued.id)
+    assert queued.status == CANCELLED and queue.position(queued) is None
+
+    # A running job is only asked to stop; it ends once its function returns
+    assert queue.cancel(running.id)
+    assert running.stopping
+    _wait(running, FINISHED)
+    assert running.status == CANCELLED and running.result is None
+    assert ran == [running.id]
+
+    assert not queue.cancel(running.id)
+    assert not queue.cancel("unknown")
+
+
+def test_finish_early_only_applies_to_running_jobs():
+    queue = JobQueue(workers=1, max_queued=5)
+    release, ran = threading.Event(), []
+    running = queue.submit(_blocking, release, ran)
+    _wait(running, (RUNNING,))
+    queued = queue.submit(_blocking, release, ran)
+
+    assert not queue.finish_early(queued.id)
+    assert queued.status == QUEUED and not queued.stopping
+    assert not queue.finish_early("unknown")
+
+    assert queue.finish_early(running.id)
+    _wait(running, FINISHED)
+    assert running.status == DONE and running.result == "best so far"
+    assert not queue.finish_early(running.id)
+
+    release.set()
+    _wait(queued, FINISHED)
+
+
+def test_finished_jobs_are_trimmed_to_max_finished():
+    queue = JobQueue(workers=1, max_queued=10, max_finished=2)
+    jobs = [queue.submit(lambda job, n: n * n, n) for n in range(5)]
+    for job in jobs:
+        _wait(job, FINISHED)
+    # The oldest are forgotten; the last max_finished stay for lookups
+    assert [job.id for job in queue.jobs()] == [job.id for job in jobs[-2:]]
+    assert queue.get(jobs[0].id) is None
+    assert queue.get(jobs[-1].id).result == 16
@@ -0,0 +1,74 @@
+import json
+import os
+import time
+
+from result_cache import ResultCache, result_key
+from scheduler import Student, Subject
+
+
+def _students(subjects, order=(0, 1)):
+    profiles = [
+        {subjects[0]: (5, 1), subjects[1]: (3, 0)},
+        {subjects[1]: (7, 2)},
+    ]
+    students = []
+    for n, i in enumerate(order):
+        student = Student(id=n + 10)
+        for subj, (difficulty, trials) in profiles[i].items():
+            student.add_subject(subj, difficulty, trials)
+        students.append(student)
+    return students
+
+
+def test_result_key_depends_only_on_content():
+    subjects = [Subject("Math"), Subject("Physics")]
+    key = result_key(subjects, _students(subjects), 10, {2, 5}, {"solver": "sa"})
+    assert len(key) == 64
+
+    # Student ids and order, and the order of holidays, do not matter
+    same = result_key(
+        [Subject("Math"), Subject("Physics")],
+        _students(subjects, order=(1, 0)),
+        10,
+        {5, 2},
+        {"solver": "sa"},
+    )
+    assert same == key
+
+    changed = _students(subjects)
+    changed[1].add_subject(subjects[0], 1, 0)
+    variants = [
+        result_key(subjects[::-1], _students(subjects), 10, {2, 5}, {"solver": "sa"}),
+        result_key(subjects, changed, 10, {2, 5}, {"solver": "sa"}),
+        result_key(subjects, _students(subjects), 11, {2, 5}, {"solver": "sa"}),
+        result_key(subjects, _students(subjects), 10, {2}, {"solver": "sa"}),
+        result_key(subjects, _students(subjects), 10, {2, 5}, {"solver": "ga"}),
+    ]
+    assert len(set(variants + [key])) == len(variants) + 1
+
+
+def test_result_cache_round_trip_and_lru_eviction(tmp_path):
+    value = {"penalty": 12.5, "schedule": {"Math": 0}, "pad": "x" * 100}
+    size = len(json.dumps(value))
+    cache = ResultCache(os.path.join(tmp_path, "results"), max_bytes=3 * size)
+    assert cache.get("a") is None
+
+    for n, key in enumerate("abc"):
+        cache.put(key, value)
+        # Spread the modification times so the LRU order is unambiguous
+        past = time.time() - 100 + n
+        os.utime(os.path.join(cache.directory, key + ".json"), (past, past))
+    assert len(cache) == 3
+    # Reading "a" makes it the most recently used; "b" is evicted first
+    assert cache.get("a") == value
+    cache.put("d", value)
+    assert cache.get("b") is None
+    assert all(cache.get(key) == value for key in "acd")
+    assert cache.stats() == {"size": 3, "hits": 4, "misses": 2, "evictions": 1}
+
+    # Entries survive a new cache on the same directory
+    reopened = ResultCache(cache.directory, max_bytes=3 * size)
+    assert reopened.get("d") == value
+    reopened.clear()
+    assert len(reopened) == 0 and cache.get("a") is None
+    assert not os.listdir(cache.directory)
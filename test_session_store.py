@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import time
+
+from jobs import DONE, QUEUED, RUNNING, Job
+from scheduler import Schedule, Student, Subject
+from session_store import SessionStore
+
+DEFAULTS = {"num_days": 20, "holidays": [], "form_id": ""}
+
+
+def _store(tmp_path, **kwargs) -> SessionStore:
+    return SessionStore(os.path.join(tmp_path, "sessions.db"), DEFAULTS, **kwargs)
+
+
+def _count(store: SessionStore, table: str) -> int:
+    with sqlite3.connect(store.path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def _job_state(status: str = QUEUED) -> dict:
+    state = Job(lambda job: None, (), {}).to_dict(0)
+    state["status"] = status
+    return state
+
+
+def test_config_and_runs_round_trip(tmp_path):
+    store = _store(tmp_path)
+    assert store.get_config("math") == DEFAULTS
+
+    # Settings are upserted one by one; unset ones keep their defaults
+    store.update_config("math", {"num_days": 8, "holidays": [2, 5]})
+    store.update_config("math", {"num_days": 10})
+    assert store.get_config("math") == dict(DEFAULTS, num_days=10, holidays=[2, 5])
+    assert store.get_config("bio") == DEFAULTS
+
+    subjects = [Subject("Math"), Subject("Physics")]
+    students = [Student(id=0), Student(id=1)]
+    students[0].add_subject(subjects[0], 5, 1)
+    students[1].add_subject(subjects[0], 3, 0)
+    students[1].add_subject(subjects[1], 7, 2)
+    schedule = Schedule(dict(zip(subjects, (0, 3))), 10)
+    store.save_run("math", students, schedule, "SA", 12.5)
+    assert store.load_students("math") == students
+    latest = store.latest_schedule("math")
+    assert latest.assignments == schedule.assignments
+    assert (latest.num_days, latest.penalty) == (10, 12.5)
+    assert [s["id"] for s in store.sessions()] == ["math"]
+
+
+def test_schedules_are_trimmed_to_max_schedules(tmp_path):
+    store = _store(tmp_path, max_schedules=3)
+    subject = Subject("Math")
+    for day in range(5):
+        store.save_schedule("math", Schedule({subject: day}, 5), penalty=day)
+    store.save_schedule("bio", Schedule({subject: 0}, 5))
+    assert _count(store, "schedules") == 3 + 1
+    assert store.latest_schedule("math").penalty == 4
+
+
+def test_jobs_round_trip_and_finished_ones_are_trimmed(tmp_path):
+    store = _store(tmp_path, max_jobs=2)
+    states = [_job_state() for _ in range(5)]
+    for state in states:
+        store.create_job("math", state)
+    # Creating a job twice keeps the first record
+    store.create_job("math", dict(states[0], stage="ignored"))
+    assert store.load_job(states[0]["id"])["stage"] is None
+
+    for n, state in enumerate(states[:4]):
+        time.sleep(0.01)
+        assert store.update_job(dict(state, status=DONE), {"penalty": n})
+    # Only the last max_jobs finished jobs stay; unfinished ones are never dropped
+    assert store.load_job(states[0]["id"]) is None
+    assert store.load_job(states[1]["id"]) is None
+    job = store.load_job(states[3]["id"])
+    assert job["status"] == DONE and job["result"] == {"penalty": 3}
+    assert job["session"] == "math"
+    assert store.load_job(states[4]["id"])["status"] == QUEUED
+
+    assert not store.update_job(_job_state(RUNNING))
+
+
+def test_job_flags(tmp_path):
+    store = _store(tmp_path)
+    queued, running, done = _job_state(QUEUED), _job_state(RUNNING), _job_state(DONE)
+    for state in (queued, running, done):
+        store.create_job("math", state)
+    active = (QUEUED, RUNNING)
+
+    # A pending cancel is never replaced by a later request
+    assert store.flag_job(queued["id"], "cancel", active)
+    assert not store.flag_job(queued["id"], "accept", active)
+    # Other requests are, e.g. accept followed by cancel
+    assert store.flag_job(running["id"], "accept", active)
+    assert store.flag_job(running["id"], "cancel", active)
+    assert not store.flag_job(done["id"], "cancel", active)
+    assert not store.flag_job("unknown", "cancel", active)
+
+    ids = [queued["id"], running["id"], done["id"]]
+    assert store.pop_job_flags(ids) == {queued["id"]: "cancel", running["id"]: "cancel"}
+    # Popping removes the flags
+    assert store.pop_job_flags(ids) == {}
+    assert store.pop_job_flags([]) == {}
+
+
+def test_delete_session_cascades(tmp_path):
+    store = _store(tmp_path)
+    subject = Subject("Math")
+    student = Student(id=0)
+    student.add_subject(subject, 5, 0)
+    for session_id in ("math", "bio"):
+        store.update_config(session_id, {"num_days": 8})
+        store.save_run(session_id, [student], Schedule({subject: 1}, 8))
+    job = _job_state(RUNNING)
+    store.create_job("math", job)
+    store.flag_job(job["id"], "cancel", (RUNNING,))
+
+    assert store.delete_session("math")
+    assert not store.delete_session("math")
+    assert store.get_config("math") == DEFAULTS
+    assert store.load_students("math") == []
+    assert store.latest_schedule("math") is None
+    assert store.load_job(job["id"]) is None
+    assert _count(store, "job_flags") == 0
+    # Other sessions are untouched
+    assert store.get_config("bio")["num_days"] == 8
+    assert store.load_students("bio") == [student]
+    assert [s["id"] for s in store.sessions()] == ["bio"]
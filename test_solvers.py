@@ -1,6 +1,11 @@
+import itertools
+import math
 import random
-from typing import List, Tuple
-from scheduler import Student, Subject
+from typing import List, Optional, Sequence, Set, Tuple
+from bounds import penalty_lower_bound
+from evaluator import DeltaEvaluator, MoveDeltaMatrix
+from instance import CompactSchedule, ProblemInstance
+from scheduler import CONFLICT_PENALTY, Schedule, Student, Subject, calculate_penalty
 
 
 def generate_test_case() -> Tuple[List[Subject], List[Student]]:
@@ -53,3 +58,588 @@ def generate_test_case() -> Tuple[List[Subject], List[Student]]:
         students.append(student)
 
     return all_subjects, students
+
+
+ENROLLMENT_DISTRIBUTIONS = ("uniform", "poisson", "fixed")
+
+
+def generate_instance(
+    num_students: int = 1000,
+    num_subjects: int = 40,
+    num_days: int = 20,
+    enrollment_mean: float = 5.0,
+    enrollment_max: int = 8,
+    enrollment_distribution: str = "uniform",
+    clusters: int = 4,
+    overlap: float = 0.2,
+    holiday_fraction: float = 0.0,
+    difficulty_range: Tuple[float, float] = (3.0, 8.0),
+    difficulty_std: float = 1.5,
+    trials_weights: Sequence[float] = (1.0, 1.0, 1.0, 1.0),
+    seed: Optional[int] = None,
+) -> Tuple[List[Subject], List[Student], Set[int]]:
+    """
+    Parametric version of generate_test_case for scaling experiments.
+
+    Subjects are split into `clusters` groups (like Set A / Set B above) and
+    each student belongs to one. Each enrollment is drawn from the student's
+    own cluster, or with probability `overlap` from all subjects, so overlap=0
+    gives independent clusters and overlap=1 a uniformly dense conflict graph.
+
+    enrollment_distribution: number of subjects per student, "uniform" on
+    1..2*mean-1, "poisson" with the given mean or "fixed"; always clipped to
+    1..enrollment_max (and the number of subjects).
+    Difficulty: per-subject mean drawn from difficulty_range, per-student
+    gaussian noise with difficulty_std, clipped to 1..10. Trials: 0, 1, ...
+    drawn with trials_weights.
+    holiday_fraction: share of the num_days that become (random) holidays.
+    Returns (subjects, students, holidays).
+    """
+    if enrollment_distribution not in ENROLLMENT_DISTRIBUTIONS:
+        raise ValueError(f"Unknown enrollment distribution: {enrollment_distribution}")
+    rng = random.Random(seed)
+
+    subjects = [Subject(f"Subj{i}") for i in range(1, num_subjects + 1)]
+    clusters = max(1, min(clusters, num_subjects))
+    groups = [subjects[c::clusters] for c in range(clusters)]
+    subject_means = {s: rng.uniform(*difficulty_range) for s in subjects}
+    max_size = max(1, min(enrollment_max, num_subjects))
+
+    students = []
+    for i in range(num_students):
+        if enrollment_distribution == "fixed":
+            size = round(enrollment_mean)
+        elif enrollment_distribution == "uniform":
+            size = rng.randint(1, max(1, round(2 * enrollment_mean) - 1))
+        else:
+            # Knuth's method; fine for the small means used here
+            limit, size, p = math.exp(-enrollment_mean), 0, rng.random()
+            while p > limit:
+                size += 1
+                p *= rng.random()
+        size = max(1, min(size, max_size))
+
+        group = groups[i % clusters]
+        student = Student(id=i)
+        while len(student.subjects) < size:
+            pool = subjects if rng.random() < overlap else group
+            if pool is group and len(group) <= len(student.subjects):
+                # Own cluster exhausted: fill up from all subjects
+                pool = subjects
+            subj = rng.choice(pool)
+            if subj in student.subjects:
+                continue
+            diff = int(rng.gauss(subject_means[subj], difficulty_std))
+            diff = max(1, min(10, diff))
+            trials = rng.choices(range(len(trials_weights)), trials_weights)[0]
+            student.add_subject(subj, diff, trials)
+        students.append(student)
+
+    num_holidays = min(round(holiday_fraction * num_days), max(num_days - 1, 0))
+    holidays = set(rng.sample(range(num_days), num_holidays))
+    return subjects, students, holidays
+
+
+# Penalty engines vs. calculate_penalty (run with pytest)
+
+
+def _random_case(
+    seed: int, num_students: int = 60, num_subjects: int = 10, num_days: int = 8
+) -> Tuple[List[Subject], List[Student], Set[int], Schedule]:
+    """
+    Small seeded instance with some repeated profiles (for grouping) and a
+    random schedule on the available days, clashes included.
+    """
+    subjects, students, holidays = generate_instance(
+        num_students,
+        num_subjects,
+        num_days,
+        enrollment_mean=3.0,
+        enrollment_max=5,
+        holiday_fraction=0.2,
+        seed=seed,
+    )
+    rng = random.Random(seed)
+    for student in rng.sample(students, num_students // 4):
+        copy = Student(id=len(students))
+        for subj, diff in student.subjects.items():
+            copy.add_subject(subj, diff, student.trials[subj])
+        students.append(copy)
+    available_days = [d for d in range(num_days) if d not in holidays]
+    schedule = Schedule(
+        {subj: rng.choice(available_days) for subj in subjects}, num_days
+    )
+    return subjects, students, holidays, schedule
+
+
+def _close(x: float, y: float, scale: float = 0.0) -> bool:
+    # Deltas are differences of totals up to `scale`: float error scales with it
+    return math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-6 + 1e-12 * scale)
+
+
+def test_delta_evaluator_matches_calculate_penalty():
+    for seed in range(5):
+        subjects, students, holidays, schedule = _random_case(seed)
+        available_days = [d for d in range(schedule.num_days) if d not in holidays]
+        instance = ProblemInstance.from_students(subjects, students)
+        days = [schedule.assignments[subj] for subj in subjects]
+        evaluator = DeltaEvaluator(instance, days, schedule.num_days)
+        assert _close(evaluator.total, calculate_penalty(schedule, students))
+
+        rng = random.Random(seed)
+        for _ in range(50):
+            i = rng.randrange(len(subjects))
+            day = rng.choice(available_days)
+            before = calculate_penalty(schedule, students)
+            delta = evaluator.evaluate_move(i, day)
+            evaluator.commit()
+            schedule.assignments[subjects[i]] = day
+            after = calculate_penalty(schedule, students)
+            assert _close(delta, after - before, max(before, after))
+            assert _close(evaluator.total, after)
+
+
+def test_vectorized_penalty_matches_calculate_penalty():
+    import pytest
+
+    from vector_penalty import VectorizedPenalty, np
+
+    if np is None:
+        # numpy is optional: the engine must refuse to build without it
+        with pytest.raises(ImportError):
+            VectorizedPenalty(*_random_case(0)[:2])
+        pytest.skip("numpy is not installed")
+
+    for seed in range(5):
+        subjects, students, holidays, schedule = _random_case(seed)
+        available_days = [d for d in range(schedule.num_days) if d not in holidays]
+        rng = random.Random(seed)
+        schedules = [schedule] + [
+            Schedule(
+                {subj: rng.choice(available_days) for subj in subjects},
+                schedule.num_days,
+            )
+            for _ in range(10)
+        ]
+        engine = VectorizedPenalty(subjects, students)
+        for penalty, s in zip(engine.evaluate_schedules(schedules), schedules):
+            assert _close(penalty, calculate_penalty(s, students))
+
+
+def test_compact_instance_matches_calculate_penalty():
+    for seed in range(5):
+        subjects, students, _, schedule = _random_case(seed)
+        instance = ProblemInstance.from_students(subjects, students, group=False)
+        assert instance.num_students == len(students)
+        compact = CompactSchedule.from_schedule(schedule, instance)
+        assert _close(instance.penalty(compact), calculate_penalty(schedule, students))
+
+
+def test_grouped_instance_matches_calculate_penalty():
+    for seed in range(5):
+        subjects, students, _, schedule = _random_case(seed)
+        instance = ProblemInstance.from_students(subjects, students)
+        # The copies made by _random_case always collapse
+        assert instance.num_students < instance.total_students == len(students)
+        compact = CompactSchedule.from_schedule(schedule, instance)
+        assert _close(instance.penalty(compact), calculate_penalty(schedule, students))
+
+
+def test_move_delta_matrix_matches_calculate_penalty():
+    for seed in range(3):
+        subjects, students, holidays, schedule = _random_case(seed, num_students=30)
+        available_days = [d for d in range(schedule.num_days) if d not in holidays]
+        instance = ProblemInstance.from_students(subjects, students)
+        days = [schedule.assignments[subj] for subj in subjects]
+        for conflict_penalty in (CONFLICT_PENALTY, 0.0):
+            evaluator = DeltaEvaluator(
+                instance, days, schedule.num_days, conflict_penalty=conflict_penalty
+            )
+            matrix = MoveDeltaMatrix(evaluator, available_days)
+            rng = random.Random(seed)
+            for _ in range(5):
+                current = CompactSchedule.from_days(
+                    evaluator.days, schedule.num_days, instance
+                )
+                base = instance.penalty(current, conflict_penalty=conflict_penalty)
+                if conflict_penalty == CONFLICT_PENALTY:
+                    assert _close(
+                        base, calculate_penalty(current.to_schedule(instance), students)
+                    )
+                for i in range(len(subjects)):
+                    for d in available_days:
+                        if d == evaluator.days[i]:
+                            continue
+                        moved = current.copy()
+                        moved.days[i] = d
+                        penalty = instance.penalty(
+                            moved, conflict_penalty=conflict_penalty
+                        )
+                        assert _close(
+                            matrix.delta[i][d], penalty - base, max(penalty, base)
+                        )
+                matrix.apply(rng.randrange(len(subjects)), rng.choice(available_days))
+
+
+def test_penalty_lower_bound_below_exhaustive_optimum():
+    # Fewer days than exams for some students exercises the clash branch
+    for seed, num_days in ((0, 6), (1, 5), (2, 4), (3, 3)):
+        subjects, students, holidays = generate_instance(
+            12,
+            4,
+            num_days,
+            enrollment_mean=3.0,
+            enrollment_max=4,
+            holiday_fraction=0.2,
+            seed=seed,
+        )
+        available_days = [d for d in range(num_days) if d not in holidays]
+        optimum = min(
+            calculate_penalty(Schedule(dict(zip(subjects, days)), num_days), students)
+            for days in itertools.product(available_days, repeat=len(subjects))
+        )
+        instance = ProblemInstance.from_students(subjects, students)
+        bound = penalty_lower_bound(instance, num_days, holidays)
+        assert 0 < bound <= optimum * (1 + 1e-9)
+
+
+def test_conflict_graph_counts_shared_students():
+    from conflict_graph import ConflictGraph
+
+    for seed in range(3):
+        subjects, students, holidays, schedule = _random_case(seed)
+        instance = ProblemInstance.from_students(subjects, students)
+        graph = ConflictGraph.from_instance(instance)
+        for i, j in itertools.combinations(range(len(subjects)), 2):
+            shared = sum(
+                subjects[i] in s.subjects and subjects[j] in s.subjects
+                for s in students
+            )
+            assert graph.neighbors(i).get(j, 0) == shared
+        # Components share no edge and cover every subject
+        components = graph.components()
+        assert sorted(i for c in components for i in c) == list(range(len(subjects)))
+        owner = {i: c for c, comp in enumerate(components) for i in comp}
+        for i in range(len(subjects)):
+            assert all(owner[j] == owner[i] for j in graph.neighbors(i))
+
+        available_days = [d for d in range(schedule.num_days) if d not in holidays]
+        days = [schedule.assignments[subj] for subj in subjects]
+        rng = random.Random(seed)
+        for _ in range(20):
+            changes = {
+                rng.randrange(len(subjects)): rng.choice(available_days)
+                for _ in range(rng.randint(1, 3))
+            }
+            moved = list(days)
+            for i, day in changes.items():
+                moved[i] = day
+            assert graph.clash_delta(days, changes) == (
+                graph.clashes(moved) - graph.clashes(days)
+            )
+            days = moved
+
+
+def test_dsatur_days_is_conflict_free_with_enough_days():
+    from conflict_graph import ConflictGraph, dsatur_days
+
+    for seed in range(3):
+        subjects, students, _, _ = _random_case(seed, num_subjects=12)
+        instance = ProblemInstance.from_students(subjects, students)
+        graph = ConflictGraph.from_instance(instance)
+        # More days than any subject has neighbors: a free day always exists
+        max_degree = max(graph.degree(i) for i in range(len(subjects)))
+        available_days = list(range(0, 2 * (max_degree + 1), 2))
+        days = dsatur_days(graph, available_days, random.Random(seed))
+        assert set(days) <= set(available_days)
+        assert graph.clashes(days) == 0
+
+        # Too few days: still a complete schedule on the available ones
+        days = dsatur_days(graph, [3], random.Random(seed))
+        assert days == [3] * len(subjects)
+
+
+def test_neighborhood_moves_stay_on_available_days():
+    import pytest
+
+    from conflict_graph import ConflictGraph, dsatur_days
+    from neighborhoods import NEIGHBORHOODS, NeighborhoodSet
+
+    subjects, students, holidays, schedule = _random_case(0, num_subjects=12)
+    available_days = [d for d in range(schedule.num_days) if d not in holidays]
+    instance = ProblemInstance.from_students(subjects, students)
+    graph = ConflictGraph.from_instance(instance)
+    with pytest.raises(ValueError):
+        NeighborhoodSet(["move", "teleport"], len(subjects), available_days, graph)
+    with pytest.raises(ValueError):
+        NeighborhoodSet(["kempe"], len(subjects), available_days)
+
+    rng = random.Random(0)
+    moves = NeighborhoodSet(
+        list(NEIGHBORHOODS), len(subjects), available_days, graph, rng
+    )
+    # Enough days for a conflict-free start, which Kempe chains must preserve
+    wide_days = list(range(len(subjects)))
+    wide = NeighborhoodSet(["kempe"], len(subjects), wide_days, graph, rng)
+    clash_free = dsatur_days(graph, wide_days, rng)
+    days = [schedule.assignments[subj] for subj in subjects]
+    for _ in range(200):
+        name, changes = moves.propose(days)
+        assert set(changes.values()) <= set(available_days)
+        moved = [changes.get(i, d) for i, d in enumerate(days)]
+        if name == "swap":
+            # Two exams trade days: the days keep their number of exams
+            assert sorted(moved) == sorted(days)
+        elif name == "day_swap":
+            # Two days trade exams: the day sizes are only permuted
+            sizes = sorted(moved.count(d) for d in available_days)
+            assert sizes == sorted(days.count(d) for d in available_days)
+        days = moved
+        moves.record(name, rng.random() < 0.5)
+
+        _, changes = wide.propose(clash_free)
+        for i, day in changes.items():
+            clash_free[i] = day
+        assert graph.clashes(clash_free) == 0
+    stats = moves.stats()
+    assert sum(s["proposed"] for s in stats.values()) == 200
+    assert all(0 <= s["rate"] <= 1 for s in stats.values())
+
+
+def test_penalty_cache_lru_and_shared_keys():
+    from fitness import SerialEvaluator
+    from penalty_cache import PenaltyCache
+
+    subjects, students, _, schedule = _random_case(0)
+    cache = PenaltyCache(subjects, maxsize=2)
+    days = [schedule.assignments[subj] for subj in subjects]
+    # Schedules and compact day vectors share keys
+    assert cache.key(schedule) == PenaltyCache.key_days(days)
+
+    penalty = cache.penalty(schedule, students)
+    assert _close(penalty, calculate_penalty(schedule, students))
+    copy = Schedule(dict(schedule.assignments), schedule.num_days)
+    assert cache.penalty(copy, students) == penalty == copy.penalty
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Least recently used entries go first
+    cache.store(b"a", 1.0)
+    cache.lookup(cache.key(schedule))
+    cache.store(b"b", 2.0)
+    assert cache.lookup(b"a") is None
+    assert cache.lookup(cache.key(schedule)) == penalty
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 2, "evictions": 1}
+
+    # Evaluators look individuals up before scoring them, e.g. unchanged children
+    evaluator = SerialEvaluator(subjects, students, PenaltyCache(subjects))
+    for _ in range(3):
+        child = Schedule(dict(schedule.assignments), schedule.num_days)
+        assert _close(evaluator.evaluate([child])[0], penalty)
+    assert evaluator.cache.stats()["hits"] == 2
+    assert len(evaluator.cache) == 1
+
+
+def test_incremental_reoptimize_from_previous_schedule():
+    from incremental import changed_students, reoptimize
+
+    subjects, students, holidays, schedule = _random_case(1)
+    # Ids are positions and may shift: only profiles are compared
+    shuffled = [Student(id=i) for i in range(len(students))]
+    for copy, student in zip(shuffled, reversed(students)):
+        for subj, diff in student.subjects.items():
+            copy.add_subject(subj, diff, student.trials[subj])
+    assert changed_students(students, shuffled) == ([], [])
+
+    newcomer = Student(id=len(students))
+    newcomer.add_subject(subjects[0], 9, 3)
+    newcomer.add_subject(subjects[1], 9, 3)
+    edited = Student(id=0)
+    edited.add_subject(subjects[2], 1, 0)
+    current = [edited] + students[1:] + [newcomer]
+    changed, removed = changed_students(students, current)
+    assert changed == [edited, newcomer] and removed == [students[0]]
+
+    # A day of the previous schedule becomes a holiday
+    closed = schedule.assignments[subjects[3]]
+    new_holidays = holidays | {closed}
+    result, stats = reoptimize(
+        subjects,
+        current,
+        schedule.num_days,
+        new_holidays,
+        schedule,
+        previous_students=students,
+        max_iterations=200,
+    )
+    assert not set(result.assignments.values()) & new_holidays
+    assert _close(result.penalty, calculate_penalty(result, current))
+    assert stats["changed_students"] == 2 and stats["removed_students"] == 1
+    assert stats["repaired_penalty"] <= stats["start_penalty"]
+    assert result.penalty <= stats["repaired_penalty"] * (1 + 1e-9)
+
+
+def test_conflict_repair_removes_clashes():
+    from conflict_graph import ConflictGraph
+    from repair import ConflictRepair
+
+    subjects, students, _, schedule = _random_case(2, num_subjects=12)
+    instance = ProblemInstance.from_students(subjects, students)
+    graph = ConflictGraph.from_instance(instance)
+    # More days than neighbours: every clashing exam has a free day
+    max_degree = max(graph.degree(i) for i in range(len(subjects)))
+    available_days = list(range(max_degree + 2))
+    rng = random.Random(2)
+    repairer = ConflictRepair.from_instance(instance, available_days, graph, rng)
+
+    assignments = {subj: rng.choice(available_days[:3]) for subj in subjects}
+    moved = repairer.repair_assignments(assignments)
+    days = [assignments[subj] for subj in subjects]
+    assert moved > 0 and graph.clashes(days) == 0
+
+    for _ in range(50):
+        i = rng.randrange(len(subjects))
+        changes = {i: rng.choice(available_days)}
+        before = list(days)
+        repaired = repairer.repair(days, changes)
+        # Inputs are left alone; the move itself is kept unless it clashed
+        assert days == before and changes.keys() <= repaired.keys()
+        days = [repaired.get(j, d) for j, d in enumerate(days)]
+        assert graph.clashes(days) == 0
+
+    # With a single day nothing can be repaired
+    single = ConflictRepair.from_instance(instance, [0], graph)
+    assert single.repair([0] * len(subjects), {}, range(len(subjects))) == {}
+    stats = {"calls": 1}
+    single.merge_stats(stats)
+    repairer.merge_stats(stats)
+    assert stats["calls"] == 1 + 1 + 51
+    clashing = sum(graph.degree(i) > 0 for i in range(len(subjects)))
+    assert stats["unrepairable"] == clashing
+
+
+def test_stratified_sample_estimates_the_full_penalty():
+    from fitness import SampledEvaluator
+    from sampling import StratifiedSample
+    from solvers import genetic_algorithm
+
+    subjects, students, holidays, schedule = _random_case(3, num_students=200)
+    instance = ProblemInstance.from_students(subjects, students)
+    compact = CompactSchedule.from_schedule(schedule, instance)
+    exact = instance.penalty(compact, conflict_penalty=0)
+
+    # Expansion weights add up to every stratum's size
+    for fidelity in (0.1, 0.5, 1.0):
+        sample = StratifiedSample(instance, fidelity, random.Random(0))
+        assert _close(sum(sample.instance.counts), sample.total_students)
+        assert sample.total_students == instance.total_students
+    full = StratifiedSample(instance, 1.0, random.Random(0))
+    assert full.sampled_students == full.total_students
+    assert _close(full.instance.penalty(compact, conflict_penalty=0), exact, exact)
+    assert full.estimate(compact) >= exact
+
+    # Unbiased: the mean over many samples is close to the exact gap penalty
+    estimates = []
+    for seed in range(200):
+        sample = StratifiedSample(instance, 0.3, random.Random(seed))
+        estimates.append(sample.instance.penalty(compact, conflict_penalty=0))
+    assert abs(sum(estimates) / len(estimates) - exact) < 0.05 * exact
+
+    sample.record_move(10.0, 12.0)
+    sample.record_checkpoint(90.0, 100.0)
+    totals = {"exact_checks": 1, "max_relative_error": 0.5}
+    sample.merge_stats(totals)
+    assert totals["exact_checks"] == 2 and totals["checkpoint_error"] == 10.0
+    assert totals["max_relative_error"] == 0.5
+    assert sample.stats()["max_relative_error"] == 0.1
+
+    # Estimates are never stored on the schedules
+    schedule.penalty = None
+    evaluator = SampledEvaluator(subjects, students, 0.3, instance=instance)
+    assert len(evaluator.evaluate([schedule, schedule])) == 2
+    assert schedule.penalty is None and evaluator.sample.estimates == 2
+
+    # The GA still returns an exactly scored schedule
+    sampling_stats = {}
+    result = genetic_algorithm(
+        subjects,
+        students,
+        schedule.num_days,
+        holidays,
+        population_size=10,
+        generations=20,
+        fidelity=0.3,
+        sampling_stats=sampling_stats,
+    )
+    assert _close(result.penalty, calculate_penalty(result, students))
+    assert sampling_stats["checkpoints"] > 0
+
+
+def test_telemetry_records_and_solver_traces():
+    import time
+
+    import pytest
+    from solvers import genetic_algorithm, simulated_annealing
+    from telemetry import Telemetry
+
+    with pytest.raises(ValueError):
+        Telemetry(interval=0)
+
+    class Slow:
+        size = 3
+
+        def evaluate(self, schedules):
+            time.sleep(0.01)
+            return [0.0] * len(schedules)
+
+    seen = []
+    telemetry = Telemetry(callback=seen.append, keep=False)
+    telemetry.start("test")
+    # Scoring calls are timed; other attributes pass straight through
+    timed = telemetry.timed(Slow())
+    assert timed.size == 3 and timed.evaluate([None]) == [0.0]
+    assert telemetry.eval_time >= 0.01
+    telemetry.sample(10, 20, best=5.0, current=7.0, accepted=4, temperature=1.5)
+    telemetry.finish(12, 24, best=4.0)
+    assert telemetry.trace == []
+    first, last = seen
+    assert first["solver"] == "test" and first["acceptance_rate"] == 0.4
+    assert (first["temperature"], first["final"]) == (1.5, False)
+    assert "schedule" not in first
+    assert last["final"] and last["current"] == last["best"] == 4.0
+    assert last["acceptance_rate"] is None
+    assert last["eval_time"] + last["other_time"] == pytest.approx(last["elapsed"])
+
+    subjects, students, holidays, schedule = _random_case(4)
+    names = {subj.name for subj in subjects}
+    telemetry = Telemetry(interval=100, solutions=True)
+    result = simulated_annealing(
+        subjects,
+        students,
+        schedule.num_days,
+        holidays,
+        max_iterations=500,
+        telemetry=telemetry,
+    )
+    *samples, final = telemetry.trace
+    assert samples and all(r["iteration"] % 100 == 0 for r in samples)
+    assert all(r["solver"] == "sa" for r in telemetry.trace)
+    bests = [r["best"] for r in telemetry.trace]
+    assert bests == sorted(bests, reverse=True)
+    assert final["final"] and _close(final["best"], result.penalty)
+    assert final["schedule"] == {s.name: d for s, d in result.assignments.items()}
+    assert all(r["schedule"].keys() == names for r in samples)
+
+    telemetry = Telemetry(interval=1)
+    result = genetic_algorithm(
+        subjects,
+        students,
+        schedule.num_days,
+        holidays,
+        population_size=10,
+        generations=5,
+        telemetry=telemetry,
+    )
+    assert [r["iteration"] for r in telemetry.trace[:-1]] == [1, 2, 3, 4, 5]
+    assert telemetry.trace[-1]["final"]
+    assert _close(telemetry.trace[-1]["best"], result.penalty)
+    assert all(r["evaluations"] > 0 for r in telemetry.trace)
@@ -0,0 +1,182 @@
+from typing import List, Optional, Sequence
+
+from instance import ProblemInstance
+from scheduler import (
+    CONFLICT_PENALTY,
+    Schedule,
+    Student,
+    Subject,
+    gap_decay_table,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class VectorizedPenalty:
+    """
+    NumPy penalty engine that scores a whole batch of schedules in one call.
+
+    Each student's enrollments are packed into a padded student x slot layout
+    (slot = position in the student's subject dict) holding the subject and its
+    2^t * d^2 weight, so memory and the work per schedule are proportional to
+    the number of enrollments rather than students * subjects. Students with
+    identical profiles share one row, weighted by counts. With a compiled
+    `instance` the rows come from its (grouped) profiles instead of students.
+
+    Returns the same values as calculate_penalty (within float tolerance).
+    """
+
+    def __init__(
+        self,
+        subjects: List[Subject],
+        students: Optional[List[Student]],
+        initial_gap: int = 3,
+        a: float = 1.0,
+        max_elements: int = 4_000_000,
+        instance: Optional[ProblemInstance] = None,
+    ):
+        if np is None:
+            raise ImportError(
+                "The vectorized penalty engine requires numpy. Install with: pip install numpy"
+            )
+
+        self.subjects = subjects
+        self.initial_gap = initial_gap
+        self.a = a
+        # Upper bound on batch x students x slots elements per chunk (memory cap)
+        self.max_elements = max_elements
+        self.index = {subj: i for i, subj in enumerate(subjects)}
+
+        # (subject, difficulty, trials) per enrollment, with a student count
+        if instance is not None:
+            interned = instance.subjects
+            enrollments = (
+                (
+                    [(interned[i], d, t) for i, d, t in instance.enrollments(s)],
+                    instance.counts[s],
+                )
+                for s in range(instance.num_students)
+            )
+        else:
+            enrollments = (
+                (
+                    [
+                        (subj, difficulty, student.trials.get(subj, 0))
+                        for subj, difficulty in student.subjects.items()
+                    ],
+                    1,
+                )
+                for student in students
+            )
+
+        # Profile (subject index, difficulty, trials per enrollment) -> row
+        profiles = {}
+        counts = []
+        for enrolled, count in enrollments:
+            profile = tuple(
+                (self.index[subj], difficulty, trials)
+                for subj, difficulty, trials in enrolled
+                if subj in self.index
+            )
+            row = profiles.get(profile)
+            if row is None:
+                row = profiles[profile] = len(counts)
+                counts.append(0)
+            counts[row] += count
+        self.counts = np.asarray(counts, dtype=np.float64)
+
+        num_students = len(profiles)
+        rows = [
+            [(i, (2**trials) * (difficulty**2)) for i, difficulty, trials in profile]
+            for profile in profiles
+        ]
+
+        slots = max((len(r) for r in rows), default=0)
+        self.slots = max(slots, 1)
+        self.slot_subject = np.zeros((num_students, self.slots), dtype=np.int64)
+        self.slot_weight = np.zeros((num_students, self.slots), dtype=np.float64)
+        self.slot_valid = np.zeros((num_students, self.slots), dtype=bool)
+        for s, row in enumerate(rows):
+            for k, (i, weight) in enumerate(row):
+                self.slot_subject[s, k] = i
+                self.slot_weight[s, k] = weight
+                self.slot_valid[s, k] = True
+
+    def day_matrix(self, schedules: Sequence[Schedule]) -> "np.ndarray":
+        """Converts schedules to a (batch x subject) day array, -1 = unscheduled."""
+        days = np.full((len(schedules), len(self.subjects)), -1, dtype=np.int64)
+        for b, schedule in enumerate(schedules):
+            for i, subj in enumerate(self.subjects):
+                day = schedule.get_day(subj)
+                if day is not None:
+                    days[b, i] = day
+        return days
+
+    def evaluate_batch(self, days: "np.ndarray") -> "np.ndarray":
+        """
+        Scores a (batch x subject) array of day indices.
+        Returns a float array with one penalty per schedule.
+        """
+        days = np.asarray(days, dtype=np.int64)
+        if days.ndim == 1:
+            days = days[None, :]
+        batch = days.shape[0]
+        num_students = self.slot_subject.shape[0]
+        totals = np.zeros(batch, dtype=np.float64)
+        if num_students == 0 or batch == 0:
+            return totals
+
+        chunk = max(1, self.max_elements // (batch * self.slots))
+        # Gaps never exceed max day + initial_gap, so the shared table covers them
+        decay = np.asarray(
+            gap_decay_table(self.a, self.initial_gap, max(int(days.max()), 0) + 1)
+        )
+        slot_order = np.arange(self.slots, dtype=np.int64)
+        # Keys past every real (day, slot) key push empty slots to the end
+        sentinel = (int(days.max()) + 2) * self.slots
+
+        for lo in range(0, num_students, chunk):
+            hi = min(lo + chunk, num_students)
+            subj = self.slot_subject[lo:hi]
+            valid = self.slot_valid[lo:hi][None, :, :] & (days[:, subj] >= 0)
+            exam_days = days[:, subj]  # batch x students x slots
+
+            # Sort by day, ties broken by the student's own subject order,
+            # matching the stable sort in calculate_penalty
+            keys = np.where(valid, exam_days * self.slots + slot_order, sentinel)
+            order = np.argsort(keys, axis=-1)
+            sorted_days = np.take_along_axis(exam_days, order, axis=-1)
+            sorted_valid = np.take_along_axis(valid, order, axis=-1)
+            weights = np.broadcast_to(self.slot_weight[lo:hi], exam_days.shape)
+            sorted_weights = np.take_along_axis(weights, order, axis=-1)
+
+            # Same-day clashes between consecutive (valid) exams
+            conflicts = (sorted_days[..., 1:] == sorted_days[..., :-1]) & sorted_valid[
+                ..., 1:
+            ]
+
+            prev = np.empty_like(sorted_days)
+            prev[..., 0] = -(self.initial_gap + 1)
+            prev[..., 1:] = sorted_days[..., :-1]
+            gaps = np.maximum(sorted_days - prev - 1, 0)
+            gaps = np.where(sorted_valid, gaps, 0)
+            terms = np.where(sorted_valid, sorted_weights * decay[gaps], 0.0)
+
+            counts = self.counts[lo:hi]
+            totals += (conflicts.sum(axis=2) @ counts) * float(CONFLICT_PENALTY)
+            totals += terms.sum(axis=2) @ counts
+
+        return totals
+
+    def evaluate_schedules(self, schedules: Sequence[Schedule]) -> List[float]:
+        """Scores a list of Schedule objects in one batched call."""
+        if not schedules:
+            return []
+        return [float(p) for p in self.evaluate_batch(self.day_matrix(schedules))]
+
+    def penalty(self, schedule: Schedule) -> float:
+        return self.evaluate_schedules([schedule])[0]
+